@@ -0,0 +1,36 @@
+"""SQL and JSON emission of a finished scene."""
+import os
+import shutil
+import tempfile
+
+from .common import SIZES, config, make_scene, tmp
+
+from faron.synthetic_polygons import name_scene_geometries
+
+class TimeEmission:
+    params = SIZES
+    param_names = ["geometries"]
+
+    def setup(self, n):
+        scene = make_scene(n)
+        self.named_polygons, self.named_lines, self.named_points, all_named_geoms = name_scene_geometries(scene)
+        self.output_dir = tempfile.mkdtemp(prefix="faron_bench_")
+        os.makedirs(os.path.join(self.output_dir, "scenes"))
+        self.record = {
+            "index": 0,
+            "image": None,
+            "named": (self.named_polygons, self.named_lines, self.named_points),
+            "relationships": {"relationships": [(a, b, "disjoint") for a, b in zip(all_named_geoms, list(all_named_geoms)[1:])]},
+            "question": None,
+        }
+
+    def teardown(self, n):
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def time_save_geometries_to_postgis(self, n):
+        # The per-geometry SQL is logged at DEBUG, i.e. dropped by default
+        tmp.save_geometries_to_postgis(self.named_polygons, self.named_points, self.named_lines,
+                                       config.CREATE_REGULAR_SHAPES, tmp.DB_CONFIG)
+
+    def time_stage_write(self, n):
+        tmp.stage_write(self.record, self.output_dir)
@@ -0,0 +1,33 @@
+"""Polygon, line and point generation, per-object and vectorized."""
+from .common import SIZES, config, seed, tmp
+
+from faron.synthetic_polygons import generate_random_lines, generate_random_points, generate_random_polygons
+
+class TimeGeneration:
+    params = SIZES
+    param_names = ["geometries"]
+
+    def setup(self, n):
+        self.rng = seed(n)
+        self.canvas_bounds = tmp.large_scene_canvas(n)
+
+    def time_generate_random_polygons(self, n):
+        generate_random_polygons(
+            self.canvas_bounds, n, config.VERTEX_RANGE[0], config.VERTEX_RANGE[1],
+            config.RADIUS_RANGE[0], config.RADIUS_RANGE[1], config.CREATE_REGULAR_SHAPES
+        )
+
+    def time_generate_polygon_array(self, n):
+        tmp.generate_polygon_array(self.canvas_bounds, n, config.VERTEX_RANGE, config.RADIUS_RANGE,
+                                   config.CREATE_REGULAR_SHAPES, self.rng)
+
+    def time_generate_random_lines(self, n):
+        generate_random_lines(self.canvas_bounds, n, config.STRAIGHT_LINES_ONLY,
+                              config.LINE_LENGTH_RANGE, config.LINE_SEGMENT_RANGE)
+
+    def time_generate_line_array(self, n):
+        tmp.generate_line_array(self.canvas_bounds, n, config.STRAIGHT_LINES_ONLY,
+                                config.LINE_LENGTH_RANGE, config.LINE_SEGMENT_RANGE, self.rng)
+
+    def time_generate_random_points(self, n):
+        generate_random_points(self.canvas_bounds, n)
@@ -0,0 +1,85 @@
+"""Pair constructors: polygon pair relations and line / point relations to polygons and lines."""
+import numpy as np
+
+from .common import SIZES, config, make_polygons, seed, skip_above, tmp
+
+from faron.synthetic_polygons import build_polygon_relations, generate_random_points, plan_polygon_relations
+from faron.synthetic_polygons._objects import (
+    classify_points, create_crossing_lines, create_line_through_poly, create_lines_on_poly_borders,
+    move_lines_into_polys, move_point_onto_line, move_point_onto_poly_border, move_points_into_polys,
+)
+from faron.synthetic_polygons._pairs import (
+    POLYGON_PAIR_BUILDERS, create_aligned_edges, create_contained_pairs, create_overlapping_pairs,
+    create_touching_polygons,
+)
+
+class TimePolygonPairs:
+    """Every constructor builds n / 2 pairs out of n polygons."""
+    params = SIZES
+    param_names = ["geometries"]
+
+    def setup(self, n):
+        rng = seed(n)
+        self.canvas_bounds = tmp.large_scene_canvas(n)
+        self.polygons = list(make_polygons(self.canvas_bounds, n, rng))
+        self.indices = list(range(n - n % 2))
+
+    def time_aligned(self, n):
+        create_aligned_edges(self.polygons, self.indices)
+
+    def time_overlapping(self, n):
+        create_overlapping_pairs(self.polygons, self.indices)
+
+    def time_contained(self, n):
+        create_contained_pairs(self.polygons, self.indices)
+
+    def time_touching(self, n):
+        create_touching_polygons(self.polygons, self.indices)
+
+    def time_build_polygon_relations(self, n):
+        # Pairs are separated against a growing union of the earlier pairs
+        skip_above(n, 100)
+        plan = plan_polygon_relations(len(self.polygons), {relation: n // 8 for relation in POLYGON_PAIR_BUILDERS})
+        build_polygon_relations(self.polygons, plan, self.canvas_bounds, config.MAX_ATTEMPTS_PER_PLACEMENT)
+
+class TimeLinePointPairs:
+    """One line or point per polygon (or per line)."""
+    params = SIZES
+    param_names = ["geometries"]
+
+    def setup(self, n):
+        rng = seed(n)
+        self.canvas_bounds = tmp.large_scene_canvas(n)
+        self.polygons = list(make_polygons(self.canvas_bounds, n, rng))
+        self.lines = list(tmp.generate_line_array(self.canvas_bounds, n, config.STRAIGHT_LINES_ONLY,
+                                                  config.LINE_LENGTH_RANGE, config.LINE_SEGMENT_RANGE, rng))
+        self.points = generate_random_points(self.canvas_bounds, n)
+
+    def time_lines_into_polys(self, n):
+        move_lines_into_polys(self.polygons, self.lines)
+
+    def time_lines_on_poly_borders(self, n):
+        create_lines_on_poly_borders(self.polygons)
+
+    def time_lines_through_polys(self, n):
+        for poly in self.polygons:
+            create_line_through_poly(poly)
+
+    def time_crossing_lines(self, n):
+        for line_a, line_b in zip(self.lines[0::2], self.lines[1::2]):
+            create_crossing_lines(line_a, line_b)
+
+    def time_points_into_polys(self, n):
+        move_points_into_polys(self.polygons, self.points)
+
+    def time_points_onto_poly_borders(self, n):
+        for poly, point in zip(self.polygons, self.points):
+            move_point_onto_poly_border(poly, point)
+
+    def time_points_onto_lines(self, n):
+        for line, point in zip(self.lines, self.points):
+            move_point_onto_line(line, point)
+
+    def time_classify_points(self, n):
+        skip_above(n, 1000) # Dense n x n predicate matrix
+        classify_points(np.asarray(self.points, dtype=object), np.asarray(self.polygons, dtype=object))
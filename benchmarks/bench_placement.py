@@ -0,0 +1,51 @@
+"""Disjoint placement and whole-scene generation."""
+import os
+import contextlib
+
+from .common import SIZES, config, make_scene, seed, skip_above, tmp, type_counts
+
+from faron.synthetic_polygons import generate_scene
+from faron.synthetic_polygons._objects import place_free_points
+
+class TimeDisjointPlacement:
+    params = SIZES
+    param_names = ["geometries"]
+
+    def setup(self, n):
+        self.rng = seed(n)
+        self.canvas_bounds = tmp.large_scene_canvas(n)
+        self.num_polygons, _, self.num_points = type_counts(n)
+        scene = make_scene(n)
+        self.placed = scene["polygons"] + [d["geom"] for d in scene["lines"]]
+
+    def time_place_free_points(self, n):
+        place_free_points(self.num_points, self.placed, self.canvas_bounds, config.MAX_ATTEMPTS_PER_PLACEMENT)
+
+    def time_place_disjoint_array(self, n):
+        tmp.place_disjoint_array(
+            lambda k: tmp.generate_polygon_array(self.canvas_bounds, k, config.VERTEX_RANGE, config.RADIUS_RANGE,
+                                                 config.CREATE_REGULAR_SHAPES, self.rng),
+            self.num_polygons, tmp.LARGE_SCENE_PLACEMENT_ROUNDS
+        )
+
+class TimeGenerateScene:
+    """generate_scene end to end, with the scene configuration scaled to n geometries."""
+    params = SIZES
+    param_names = ["geometries"]
+
+    def setup(self, n):
+        # Free polygons are placed one at a time against all earlier ones
+        skip_above(n, 1000)
+        seed(n)
+        self.config = {key: getattr(config, key) for key in ("CANVAS_BOUNDS", "NUM_POLYGONS", "NUM_LINES", "NUM_POINTS")}
+        canvas_bounds = tmp.large_scene_canvas(n)
+        config.NUM_POLYGONS, config.NUM_LINES, config.NUM_POINTS = type_counts(n)
+        config.CANVAS_BOUNDS = canvas_bounds
+
+    def teardown(self, n):
+        for key, value in self.config.items():
+            setattr(config, key, value)
+
+    def time_generate_scene(self, n):
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            generate_scene()
@@ -0,0 +1,26 @@
+"""Question generation from a scene's relationships."""
+from .common import SIZES, make_scene, scene_tile_size, seed
+
+from faron.synthetic_polygons import (
+    entity_table, find_all_relationships_tiled, generate_spatial_question_from_data_with_postgis, name_scene_geometries,
+)
+
+class TimeQuestions:
+    params = SIZES
+    param_names = ["geometries"]
+
+    def setup(self, n):
+        scene = make_scene(n)
+        _, _, _, all_named_geoms = name_scene_geometries(scene)
+        self.relationships = find_all_relationships_tiled(
+            all_named_geoms, scene_tile_size(scene["canvas_bounds"], n), workers=1,
+            canvas_bounds=scene["canvas_bounds"]
+        )["relationships"]
+        self.entity_types = entity_table(all_named_geoms)
+        seed(n)
+
+    def time_generate_question(self, n):
+        generate_spatial_question_from_data_with_postgis(
+            self.relationships, table_name="generated_geometries", name_col="name", geom_col="geom",
+            entity_types=self.entity_types
+        )
@@ -0,0 +1,32 @@
+"""Relationship extraction: pairwise, tiled and incremental."""
+from .common import SIZES, config, make_scene, scene_tile_size, seed, skip_above
+
+from faron.synthetic_polygons import (
+    RelationTracker, find_all_relationships, find_all_relationships_tiled, name_scene_geometries,
+)
+
+class TimeRelationships:
+    params = SIZES
+    param_names = ["geometries"]
+
+    def setup(self, n):
+        self.scene = make_scene(n)
+        self.canvas_bounds = self.scene["canvas_bounds"]
+        self.tile_size = scene_tile_size(self.canvas_bounds, n)
+        _, _, _, self.all_named_geoms = name_scene_geometries(self.scene)
+        seed(n)
+
+    def time_find_all_relationships(self, n):
+        skip_above(n, 1000) # One relate_pair per geometry pair
+        find_all_relationships(self.all_named_geoms)
+
+    def time_find_all_relationships_tiled(self, n):
+        # In-process, so the number reflects the algorithm rather than pool startup
+        find_all_relationships_tiled(self.all_named_geoms, self.tile_size, workers=1,
+                                     canvas_bounds=self.canvas_bounds)
+
+    def time_relation_tracker(self, n):
+        tracker = RelationTracker(self.canvas_bounds, cell_size=max(config.RADIUS_RANGE[1], 1))
+        for name, geom in self.all_named_geoms.items():
+            tracker.commit(name, geom)
+        tracker.finalize()
@@ -0,0 +1,23 @@
+"""Scene rendering with plot_geometries."""
+import os
+import shutil
+import tempfile
+
+from .common import SIZES, make_scene, seed, tmp
+
+class TimeRender:
+    params = SIZES
+    param_names = ["geometries"]
+
+    def setup(self, n):
+        scene = make_scene(n)
+        self.canvas_bounds = scene["canvas_bounds"]
+        self.wrappers = tmp.build_geom_wrappers(scene)
+        self.output_dir = tempfile.mkdtemp(prefix="faron_bench_")
+        seed(n)
+
+    def teardown(self, n):
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def time_plot_geometries(self, n):
+        tmp.plot_geometries(self.wrappers, self.canvas_bounds, save_path=os.path.join(self.output_dir, "scene.png"))
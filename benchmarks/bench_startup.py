@@ -0,0 +1,30 @@
+"""Start-up cost of the faron package, paid by every CLI call and DataLoader worker."""
+import sys
+import subprocess
+
+from .common import ROOT
+
+# Heavy dependencies `import faron` must not load; only the features using them import them
+HEAVY_MODULES = ["torch", "matplotlib", "psycopg2", "dotenv"]
+
+def run_python(code):
+    """Runs `code` in a fresh interpreter from the repository root and returns its stdout."""
+    return subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, capture_output=True, text=True).stdout
+
+class TimeStartup:
+    def setup(self):
+        # Guard: an eager import of a heavy dependency fails the benchmark instead of only slowing it
+        loaded = {name.split(".")[0] for name in run_python("import sys, faron; print(*sys.modules)").split()}
+        heavy = sorted(loaded.intersection(HEAVY_MODULES))
+        if heavy:
+            raise AssertionError(f"'import faron' loads {', '.join(heavy)}")
+
+    def time_interpreter(self):
+        # Baseline: interpreter start-up alone
+        run_python("pass")
+
+    def time_import_faron(self):
+        run_python("import faron")
+
+    def time_import_synthetic_maps(self):
+        run_python("import faron.synthetic_maps")
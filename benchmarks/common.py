@@ -0,0 +1,89 @@
+"""
+Shared fixtures of the benchmark suite.
+
+Puts the repository root on the import path, selects a non-interactive
+matplotlib backend before tmp.py imports pyplot, and builds scenes of a
+given number of geometries at the regular scene density, so that every
+size exercises the pipeline under the same conditions.
+"""
+import os
+import sys
+import random
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import numpy as np
+import shapely
+
+import tmp
+from faron.synthetic_polygons import _config as config
+
+# Scene sizes (total number of geometries) every benchmark runs at
+SIZES = [10, 100, 1000, 10000]
+
+def seed(num_geometries):
+    """Seeds the global generator so every size sees the same scene on every run."""
+    random.seed(num_geometries)
+    return np.random.default_rng(num_geometries)
+
+def skip_above(num_geometries, limit):
+    """Skips (asv convention) sizes a quadratic stage cannot reach in reasonable time."""
+    if num_geometries > limit:
+        raise NotImplementedError(f"skipped above {limit} geometries")
+
+def type_counts(num_geometries):
+    """Splits a geometry count into polygons, lines and points with the regular scene's mix."""
+    base_count = config.NUM_POLYGONS + config.NUM_LINES + config.NUM_POINTS
+    num_polygons = max(1, round(num_geometries * config.NUM_POLYGONS / base_count))
+    num_lines = max(1, round(num_geometries * config.NUM_LINES / base_count))
+    return num_polygons, num_lines, num_geometries - num_polygons - num_lines
+
+def make_polygons(canvas_bounds, num_polygons, rng):
+    """Exactly `num_polygons` valid polygons, overlapping freely."""
+    polygons = np.empty(0, dtype=object)
+    while len(polygons) < num_polygons:
+        polygons = np.concatenate([polygons, tmp.generate_polygon_array(
+            canvas_bounds, num_polygons - len(polygons),
+            config.VERTEX_RANGE, config.RADIUS_RANGE, config.CREATE_REGULAR_SHAPES, rng
+        )])
+    return polygons
+
+def make_scene(num_geometries):
+    """
+    A scene of `num_geometries` geometries in the shape generate_scene
+    returns: disjoint polygons, lines and points scattered over them, on a
+    canvas grown to the regular scene density. Relationships are left out.
+    """
+    rng = seed(num_geometries)
+    canvas_bounds = tmp.large_scene_canvas(num_geometries)
+    num_polygons, num_lines, num_points = type_counts(num_geometries)
+
+    polygons = tmp.place_disjoint_array(
+        lambda n: tmp.generate_polygon_array(canvas_bounds, n, config.VERTEX_RANGE, config.RADIUS_RANGE,
+                                             config.CREATE_REGULAR_SHAPES, rng),
+        num_polygons, tmp.LARGE_SCENE_PLACEMENT_ROUNDS
+    )
+    lines = tmp.generate_line_array(canvas_bounds, num_lines, config.STRAIGHT_LINES_ONLY,
+                                    config.LINE_LENGTH_RANGE, config.LINE_SEGMENT_RANGE, rng)
+    min_x, min_y, max_x, max_y = canvas_bounds
+    points = shapely.points(rng.uniform(min_x, max_x, num_points), rng.uniform(min_y, max_y, num_points))
+
+    return {
+        "canvas_bounds": canvas_bounds,
+        "polygons": list(polygons),
+        "lines": [
+            {"geom": line, "style": "straight" if len(line.coords) == 2 else "curly"}
+            for line in lines
+        ],
+        "points": [{"geom": point, "style": "point"} for point in points],
+    }
+
+def scene_tile_size(canvas_bounds, num_geometries):
+    """Tile size holding about LARGE_SCENE_TILE_GEOMETRIES geometries, as generate_large_scene picks it."""
+    min_x, min_y, max_x, max_y = canvas_bounds
+    tiles_per_side = max(1, round(np.sqrt(num_geometries / tmp.LARGE_SCENE_TILE_GEOMETRIES)))
+    return max(max_x - min_x, max_y - min_y) / tiles_per_side
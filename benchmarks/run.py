@@ -0,0 +1,205 @@
+"""
+Runs the benchmark suite and writes machine-readable results.
+
+Benchmarks follow the asv layout (`bench_*.py` modules, `Time*` classes with
+`params`, `setup` / `teardown` and `time_*` methods; NotImplementedError
+skips a size, any other exception fails the benchmark), so they also run
+under asv, but this runner needs nothing beyond the pipeline's own
+dependencies:
+
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --sizes 10 100 --filter relationships
+    python benchmarks/run.py --output new.json --compare results.json
+
+Every benchmark is called once to calibrate, then `--repeat` times in
+batches of enough calls to last `--min_time` seconds. With `--compare`,
+benchmarks whose median grew by more than `--threshold` are listed and
+the exit code is 1, as it is when a benchmark fails.
+"""
+import os
+import re
+import sys
+import json
+import time
+import inspect
+import argparse
+import contextlib
+import platform
+import importlib
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.common import SIZES
+
+def discover():
+    """Yields (name, class) of every Time* class in benchmarks/bench_*.py."""
+    bench_dir = os.path.join(ROOT, "benchmarks")
+    for filename in sorted(os.listdir(bench_dir)):
+        if not (filename.startswith("bench_") and filename.endswith(".py")):
+            continue
+        module = importlib.import_module(f"benchmarks.{filename[:-3]}")
+        for class_name, cls in inspect.getmembers(module, inspect.isclass):
+            if class_name.startswith("Time") and cls.__module__ == module.__name__:
+                yield f"{filename[:-3]}.{class_name}", cls
+
+def time_call(fn, repeat, min_time):
+    """Timing statistics of fn in seconds per call."""
+    start = time.perf_counter()
+    fn()
+    first = time.perf_counter() - start
+    number = max(1, int(min_time / first)) if first > 0 else 1
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "number": number,
+        "repeat": repeat,
+    }
+
+def run_benchmarks(sizes, name_filter=None, repeat=5, min_time=0.2):
+    """Runs every matching benchmark at every size and returns the result records."""
+    results = []
+    report = sys.stdout
+    devnull = open(os.devnull, "w")
+    for class_name, cls in discover():
+        methods = [name for name, _ in inspect.getmembers(cls, inspect.isfunction) if name.startswith("time_")]
+        methods = [name for name in methods if not name_filter or re.search(name_filter, f"{class_name}.{name}")]
+        if not methods:
+            continue
+
+        param_name = getattr(cls, "param_names", ["geometries"])[0]
+        # Classes without params (e.g. start-up time) run once, without arguments
+        param_sets = [(size,) for size in cls.params if size in sizes] if hasattr(cls, "params") else [()]
+        for args in param_sets:
+            params = {param_name: args[0]} if args else {}
+            label = f" [{param_name}={args[0]}]" if args else ""
+            instance = cls()
+            try:
+                # Progress output and warnings of the pipeline would swamp the report
+                with contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+                    if hasattr(instance, "setup"):
+                        instance.setup(*args)
+            except Exception as error:
+                status = "skipped" if isinstance(error, NotImplementedError) else "failed"
+                for name in methods:
+                    results.append({"name": f"{class_name}.{name}", "params": params, "status": status, "reason": str(error)})
+                    print(f"{status:>15}  {class_name}.{name}{label}: {error}", file=report, flush=True)
+                continue
+
+            try:
+                for name in methods:
+                    record = {"name": f"{class_name}.{name}", "params": params}
+                    try:
+                        with contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+                            stats = time_call(lambda: getattr(instance, name)(*args), repeat, min_time)
+                        record.update(status="ok", **stats)
+                    except NotImplementedError as skip:
+                        record.update(status="skipped", reason=str(skip))
+                    except Exception as error:
+                        record.update(status="failed", reason=repr(error))
+                    results.append(record)
+                    summary = f"{record['median'] * 1e3:12.3f} ms" if record["status"] == "ok" else f"{record['status']:>15}"
+                    print(f"{summary}  {record['name']}{label}", file=report, flush=True)
+            finally:
+                if hasattr(instance, "teardown"):
+                    instance.teardown(*args)
+    devnull.close()
+    return results
+
+def environment():
+    """Versions and commit the results were measured with."""
+    import numpy
+    import shapely
+    import matplotlib
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "versions": {
+            "numpy": numpy.__version__,
+            "shapely": shapely.__version__,
+            "geos": shapely.geos_version_string,
+            "matplotlib": matplotlib.__version__,
+        },
+    }
+
+def compare(results, baseline, threshold):
+    """Results whose median is more than `threshold` times the baseline's."""
+    def key(record):
+        return record["name"], json.dumps(record["params"], sort_keys=True)
+
+    baseline_medians = {key(record): record["median"] for record in baseline["results"] if record["status"] == "ok"}
+    regressions = []
+    for record in results:
+        old = baseline_medians.get(key(record))
+        if record["status"] == "ok" and old and record["median"] > threshold * old:
+            regressions.append((record, record["median"] / old))
+    return regressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="FARON pipeline benchmarks")
+
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES,
+                        help="Scene sizes (number of geometries) to run")
+
+    parser.add_argument("--filter", default=None,
+                        help="Only run benchmarks whose 'module.Class.method' name matches this regex")
+
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Timed samples per benchmark")
+
+    parser.add_argument("--min_time", type=float, default=0.2,
+                        help="Minimum duration of one sample in seconds (fast calls are batched)")
+
+    parser.add_argument("--output", default=None,
+                        help="Write the results as JSON to this file")
+
+    parser.add_argument("--compare", default=None,
+                        help="Baseline results JSON to check for regressions")
+
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Slowdown factor over the baseline median reported as a regression")
+
+    args = parser.parse_args()
+
+    report = {
+        "environment": environment(),
+        "config": {"sizes": args.sizes, "repeat": args.repeat, "min_time": args.min_time},
+        "results": run_benchmarks(args.sizes, args.filter, args.repeat, args.min_time),
+    }
+
+    if args.output:
+        with open(args.output, "w") as outfile:
+            json.dump(report, outfile, indent=4)
+
+    if args.compare:
+        with open(args.compare) as infile:
+            regressions = compare(report["results"], json.load(infile), args.threshold)
+        for record, ratio in regressions:
+            print(f"[REGRESSION] {record['name']} {record['params']}: {ratio:.2f}x slower")
+        if regressions:
+            raise SystemExit(1)
+
+    if any(record["status"] == "failed" for record in report["results"]):
+        raise SystemExit(1)
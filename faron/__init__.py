@@ -1,5 +1,25 @@
-from .faron import FARON
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .faron import FARON
 
 __all__ = [
     "FARON"
-]
\ No newline at end of file
+]
+
+# FARON is a torch Dataset: it (and torch) is imported on first access, so
+# `import faron` and the torch-free subpackages load without it
+_LAZY_ATTRIBUTES = {
+    "FARON": ".faron",
+}
+
+def __getattr__(name:str):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
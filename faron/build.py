@@ -0,0 +1,439 @@
+import os
+import json
+import glob
+import hashlib
+import logging
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from faron.dedup import SceneDeduplicator
+
+logger = logging.getLogger(__name__)
+
+# Grid steps per axis of the stored map topology: a millionth of the map
+# extent, far below any parcel border or POI clearance
+MAP_QUANTIZATION = 10**6
+
+MANIFEST_FILE = 'manifest.json'
+MANIFEST_VERSION = 1
+
+# Manifests of the nodes of a sharded build, merged into MANIFEST_FILE by merge_manifests
+NODE_MANIFEST_DIR = 'manifests'
+
+# Scenes per shard file. A shard is the unit of work that is checkpointed:
+# a build that dies loses at most the shard it was writing.
+SHARD_SIZE = 1000
+
+def map_scene(idx:int) -> Dict:
+    """
+    Map scene `idx`. Relationships come from the map generator itself;
+    parcels and roads are stored as a quantized TopoJSON topology (every
+    shared border once, delta encoded) together with the POIs. Images are
+    left to render-on-read.
+
+    Args:
+        idx (int): Scene index, which is also the generator seed, so any
+            process rebuilds the same scene for the same index
+    """
+    from faron.synthetic_maps import generate_map
+
+    scene_map = generate_map(seed=idx)
+    num_parcels, num_roads = len(scene_map['parcels']), len(scene_map['roads'])
+    styles = ['parcel'] * num_parcels + ['road'] * num_roads + ['poi'] * len(scene_map['pois'])
+    properties = [{'name': name, 'style': style} for name, style in zip(scene_map['names'], styles)]
+
+    return {
+        'index': idx,
+        'canvas_bounds': list(scene_map['canvas_bounds']),
+        'image': None,
+        'topology': scene_map['topology'].to_topojson(properties, scene_map['pois'], quantization=MAP_QUANTIZATION),
+        'relationships': scene_map['relationships'],
+        'question': None,
+    }
+
+def polygon_scene(idx:int) -> Dict:
+    """
+    Polygon scene `idx`: a scene of faron.synthetic_polygons with its
+    relationships and question, in the format of the tmp.py pipeline's scene
+    files. Images are left to render-on-read.
+
+    Args:
+        idx (int): Scene index, which seeds the generator (the random
+            module, from which the generator draws every numpy generator), so
+            any process rebuilds the same scene for the same index
+    """
+    import random
+    from faron.synthetic_polygons import generate_scene, scene_json, stage_questions, stage_relate
+
+    random.seed(idx)
+    record = {'index': idx, 'scene': generate_scene(), 'image': None}
+    return scene_json(stage_questions(stage_relate(record)))
+
+# Dataset modes that can be built, with their index -> scene function.
+# 'mix' has no builder: FARON only loads mixed scenes that were built elsewhere.
+SCENE_BUILDERS = {
+    'polygon': polygon_scene,
+    'map': map_scene,
+}
+
+def node_fingerprint_prefix(shard_index:int, num_shards:int) -> str:
+    """Prefix of the fingerprint files of a node, which are kept next to its manifest (none for a single node)."""
+    if num_shards == 1:
+        return ''
+    return f'node_{shard_index:04d}_of_{num_shards:04d}_'
+
+def node_manifest_name(shard_index:int, num_shards:int) -> str:
+    """Manifest of node `shard_index` of a `num_shards`-node build (the global one for a single node)."""
+    if num_shards == 1:
+        return MANIFEST_FILE
+    return os.path.join(NODE_MANIFEST_DIR, f'manifest_{shard_index:04d}_of_{num_shards:04d}.json')
+
+class BuildManifest:
+    """
+    Progress record of a dataset build: every shard file written so far,
+    with the range of scene indices it holds and its SHA-256 checksum.
+
+    The manifest is rewritten atomically after every finished shard, so it
+    never lists a shard that is not completely on disk. Shard boundaries are
+    multiples of the shard size of the first build, so extending a build to
+    more scenes only adds shards.
+    """
+    def __init__(self,
+                 save_dir:str,
+                 mode:str,
+                 shard_size:int=SHARD_SIZE,
+                 name:str=MANIFEST_FILE) -> None:
+        """
+        Args:
+            save_dir (str): Dataset directory holding the manifest and `scenes/`
+            mode (str): Dataset mode the build is for
+            shard_size (int): Scenes per shard (ignored when resuming: the stored size is kept)
+            name (str): Manifest path relative to `save_dir` (see node_manifest_name)
+        """
+        self.save_dir = save_dir
+        self.path = os.path.join(save_dir, name)
+        self.mode = mode
+        self.shard_size = shard_size
+        self.shards = {}    # file -> shard record
+
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as file:
+                manifest = json.load(file)
+            if manifest['mode'] != mode:
+                raise ValueError(f"{self.path} records a '{manifest['mode']}' build, not '{mode}'")
+            if manifest['shard_size'] != shard_size:
+                logger.info("Resuming with the stored shard size %d", manifest['shard_size'])
+            self.shard_size = manifest['shard_size']
+            self.shards = {shard['file']: shard for shard in manifest['shards']}
+
+    def completed(self) -> List[Tuple[int, int]]:
+        """Sorted [start, end) scene index ranges of the finished shards."""
+        return sorted((shard['start'], shard['end']) for shard in self.shards.values())
+
+    def num_scenes(self) -> int:
+        return sum(shard['scenes'] for shard in self.shards.values())
+
+    def missing(self,
+                img_count:int,
+                shard_index:int=0,
+                num_shards:int=1,
+                completed_elsewhere:List[Tuple[int, int]]=()) -> List[Tuple[int, int]]:
+        """
+        [start, end) ranges of the scenes below `img_count` that no shard
+        holds yet, split at the shard boundaries.
+
+        Args:
+            img_count (int): Number of scenes the dataset should hold
+            shard_index (int): Only ranges of the chunks c (shard-size blocks
+                of the index space) with c % num_shards == shard_index
+            num_shards (int): Number of nodes sharing the build
+            completed_elsewhere (list): Further finished ranges, e.g. those of the global manifest
+        """
+        completed = sorted(self.completed() + [tuple(r) for r in completed_elsewhere])
+        missing = []
+        i = 0
+        for chunk_start in range(shard_index * self.shard_size, img_count, num_shards * self.shard_size):
+            start, end = chunk_start, min(chunk_start + self.shard_size, img_count)
+            while i < len(completed) and completed[i][1] <= start:
+                i += 1
+            j = i
+            while j < len(completed) and completed[j][0] < end:
+                if completed[j][0] > start:
+                    missing.append((start, completed[j][0]))
+                start = max(start, completed[j][1])
+                j += 1
+            if start < end:
+                missing.append((start, end))
+        return missing
+
+    def verify(self, checksums:bool=False) -> List[str]:
+        """
+        Forgets the shards whose file is missing or has another size (or,
+        with `checksums`, another SHA-256), so they are rebuilt.
+
+        Returns:
+            list: Files of the dropped shards
+        """
+        dropped = []
+        for name, shard in list(self.shards.items()):
+            path = os.path.join(self.save_dir, name)
+            if not os.path.exists(path) or os.path.getsize(path) != shard['bytes']:
+                dropped.append(name)
+            elif checksums and file_sha256(path) != shard['sha256']:
+                dropped.append(name)
+
+        for name in dropped:
+            del self.shards[name]
+        if dropped:
+            self.save()
+        return dropped
+
+    def add(self, shard:Dict) -> None:
+        """Records a finished shard and saves the manifest."""
+        self.shards[shard['file']] = shard
+        self.save()
+
+    def to_dict(self) -> Dict:
+        return {
+            'version': MANIFEST_VERSION,
+            'mode': self.mode,
+            'shard_size': self.shard_size,
+            'scenes': self.num_scenes(),
+            'completed': self.completed(),
+            'shards': sorted(self.shards.values(), key=lambda shard: shard['start']),
+        }
+
+    def save(self) -> None:
+        write_atomic(self.path, json.dumps(self.to_dict(), indent=4).encode())
+
+def write_atomic(path:str, data:bytes) -> None:
+    """Writes `data` to a temporary file next to `path` and renames it into place."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+def file_sha256(path:str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def write_shard(save_dir:str,
+                start:int,
+                end:int,
+                make_scene:Callable[[int], Dict],
+                dedup:Optional['SceneDeduplicator']=None) -> Dict:
+    """
+    Builds scenes [start, end) into one JSON Lines shard file. The file only
+    appears under its final name once it is complete.
+
+    Args:
+        dedup (SceneDeduplicator): Leave out the scenes (and questions) it has
+            seen before; the kept scenes carry their fingerprints (default: keep all)
+
+    Returns:
+        dict: Shard record for the manifest
+    """
+    name = os.path.join('scenes', f'shard_{start:09d}_{end:09d}.jsonl')
+    path = os.path.join(save_dir, name)
+    tmp_path = f"{path}.tmp"
+
+    digest = hashlib.sha256()
+    size = 0
+    kept = 0
+    with open(tmp_path, 'wb') as file:
+        for idx in range(start, end):
+            scene = make_scene(idx)
+            if dedup is not None and dedup.check_stored(scene) is not None:
+                continue
+            line = (json.dumps(scene) + '\n').encode()
+            digest.update(line)
+            size += len(line)
+            kept += 1
+            file.write(line)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+    return {
+        'file': name,
+        'start': start,
+        'end': end,
+        'scenes': kept,
+        'duplicates': end - start - kept,
+        'bytes': size,
+        'sha256': digest.hexdigest(),
+    }
+
+def build_dataset(save_dir:str,
+                  mode:str,
+                  img_count:int,
+                  shard_size:int=SHARD_SIZE,
+                  verify:bool=False,
+                  shard_index:int=0,
+                  num_shards:int=1,
+                  dedup:bool=False) -> BuildManifest:
+    """
+    Builds scenes 0 .. img_count - 1 of a dataset into shard files, skipping
+    everything the manifest records as done. Re-running a finished build is
+    a no-op, re-running a crashed one resumes it, and raising `img_count`
+    extends it without rebuilding the existing scenes.
+
+    With `num_shards` > 1 this process is one node of a build sharing
+    `save_dir` (or later merged into one directory): it builds only every
+    `num_shards`-th shard-size chunk of the index space, starting at chunk
+    `shard_index`, and keeps its own manifest under `manifests/`, so nodes
+    need no coordination. merge_manifests() then builds the global manifest.
+
+    With `dedup` a scene whose geometry and relationships (or whose
+    question) repeat an earlier scene of the build is left out, so the
+    shards may hold fewer scenes than their index range. The fingerprints
+    of the kept scenes are kept next to the manifest and saved after every
+    finished shard; the nodes of a sharded build each deduplicate their
+    own scenes.
+
+    Args:
+        save_dir (str): Dataset directory
+        mode (str): Dataset mode (a key of SCENE_BUILDERS)
+        img_count (int): Number of scenes the dataset should hold
+        shard_size (int): Scenes per shard file of a new build
+        verify (bool): Re-hash the recorded shards instead of only checking their size
+        shard_index (int): Index of this node, 0 <= shard_index < num_shards
+        num_shards (int): Number of nodes sharing the build
+        dedup (bool): Leave out repeated scenes (see faron.dedup)
+
+    Returns:
+        BuildManifest: The manifest of this node
+    """
+    if mode not in SCENE_BUILDERS:
+        raise ValueError(f"No scene builder for mode '{mode}' (available: {', '.join(SCENE_BUILDERS)})")
+    if not 0 <= shard_index < num_shards:
+        raise ValueError(f"Shard index {shard_index} is not in [0, {num_shards})")
+
+    os.makedirs(os.path.join(save_dir, 'scenes'), exist_ok=True)
+
+    # Scenes of an earlier (merged) build are not rebuilt by the nodes, and
+    # its shard size fixes the chunk boundaries every node agrees on
+    completed_elsewhere = []
+    if num_shards > 1:
+        os.makedirs(os.path.join(save_dir, NODE_MANIFEST_DIR), exist_ok=True)
+        if os.path.exists(os.path.join(save_dir, MANIFEST_FILE)):
+            merged = BuildManifest(save_dir, mode, shard_size)
+            shard_size, completed_elsewhere = merged.shard_size, merged.completed()
+
+    manifest = BuildManifest(save_dir, mode, shard_size, name=node_manifest_name(shard_index, num_shards))
+
+    dropped = manifest.verify(checksums=verify)
+    if dropped:
+        logger.warning("Rebuilding %d missing or corrupt shard(s)", len(dropped))
+
+    deduplicator = None
+    if dedup:
+        from faron.dedup import SceneDeduplicator
+
+        # Saved by hand only, after the manifest records a shard: a shard that
+        # is never finished must not leave its fingerprints behind
+        deduplicator = SceneDeduplicator(os.path.dirname(manifest.path),
+                                         prefix=node_fingerprint_prefix(shard_index, num_shards), flush_every=None)
+        if dropped:
+            # The rebuilt shards would otherwise be duplicates of themselves
+            stored = iter_shard_scenes(save_dir, list(manifest.shards.values()))
+            deduplicator.reset(scene.get('fingerprints') for scene in stored)
+            deduplicator.flush()
+
+    missing = manifest.missing(img_count, shard_index, num_shards, completed_elsewhere)
+    todo = sum(end - start for start, end in missing)
+    logger.info("Building %d of %d scenes in %d shard(s)", todo, img_count, len(missing))
+
+    built = 0
+    for start, end in missing:
+        manifest.add(write_shard(save_dir, start, end, SCENE_BUILDERS[mode], deduplicator))
+        if deduplicator is not None:
+            deduplicator.flush()
+        built += end - start
+        logger.info("Wrote scenes %d-%d (%d/%d)", start, end - 1, built, todo)
+
+    if deduplicator is not None:
+        summary = deduplicator.summary()
+        logger.info("Dropped %d duplicate scene(s) and %d duplicate question(s) of %d (%.1f%%)",
+                    summary['duplicate_scenes'], summary['duplicate_questions'], summary['checked'],
+                    100 * summary['duplicate_rate'])
+
+    return manifest
+
+def merge_manifests(save_dir:str) -> BuildManifest:
+    """
+    Merge step of a sharded build: adds the shards of every node manifest
+    under `manifests/` to the global manifest, which is the index datasets
+    are loaded from. The nodes' shard files must all be in `save_dir/scenes`.
+
+    Returns:
+        BuildManifest: The global manifest
+    """
+    node_paths = sorted(glob.glob(os.path.join(save_dir, NODE_MANIFEST_DIR, '*.json')))
+    if not node_paths:
+        raise FileNotFoundError(f"No node manifests in {os.path.join(save_dir, NODE_MANIFEST_DIR)}")
+
+    nodes = []
+    for path in node_paths:
+        with open(path, 'r') as file:
+            nodes.append(json.load(file))
+    modes = {node['mode'] for node in nodes}
+    shard_sizes = {node['shard_size'] for node in nodes}
+    if len(modes) > 1 or len(shard_sizes) > 1:
+        raise ValueError(f"Node manifests disagree on the build: modes {sorted(modes)}, shard sizes {sorted(shard_sizes)}")
+
+    merged = BuildManifest(save_dir, modes.pop(), shard_sizes.pop())
+    for node in nodes:
+        for shard in node['shards']:
+            merged.shards[shard['file']] = shard
+
+    # Nodes own disjoint chunks, so overlapping shards mean mixed-up builds
+    completed = merged.completed()
+    for (_, end), (next_start, _) in zip(completed, completed[1:]):
+        if next_start < end:
+            raise ValueError(f"Shards overlap at scene {next_start}")
+
+    gaps = merged.missing(completed[-1][1] if completed else 0)
+    if gaps:
+        logger.warning("Merged build has %d gap(s), first at scenes %d-%d: not every node has finished",
+                       len(gaps), gaps[0][0], gaps[0][1] - 1)
+
+    merged.save()
+    logger.info("Merged %d node manifest(s): %d scenes in %d shard(s)", len(nodes), merged.num_scenes(), len(merged.shards))
+    return merged
+
+def iter_shard_scenes(save_dir:str, shards:List[Dict], img_count:int=None) -> Iterator[Dict]:
+    """
+    Yields the stored scenes of the given shard records in index order.
+
+    Args:
+        save_dir (str): Dataset directory the shard files are relative to
+        shards (list): Shard records of a manifest
+        img_count (int): Stop after the scenes with index below this (default: all)
+    """
+    for shard in sorted(shards, key=lambda shard: shard['start']):
+        if img_count is not None and shard['start'] >= img_count:
+            break
+        with open(os.path.join(save_dir, shard['file']), 'r') as file:
+            for line in file:
+                scene = json.loads(line)
+                if img_count is not None and scene['index'] >= img_count:
+                    break
+                yield scene
+
+def iter_built_scenes(save_dir:str, img_count:int=None) -> Iterator[Dict]:
+    """
+    Yields the stored scenes of a sharded build in index order.
+
+    Args:
+        save_dir (str): Dataset directory holding the manifest
+        img_count (int): Stop after the scenes with index below this (default: all)
+    """
+    with open(os.path.join(save_dir, MANIFEST_FILE), 'r') as file:
+        shards = json.load(file)['shards']
+    yield from iter_shard_scenes(save_dir, shards, img_count)
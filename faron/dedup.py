@@ -0,0 +1,233 @@
+"""
+Duplicate filter of the scene pipelines.
+
+Random generation repeats itself at scale. A scene fingerprint hashes the
+sorted hashes of its geometries, each snapped to a grid of DEDUP_GRID x the
+canvas extent and normalized (so names, ordering, ring start and tiny
+offsets do not matter), together with the multiset of its relationships
+by geometry type. A question fingerprint hashes the normalized question
+text with every geometry name replaced by that geometry's hash. Both go
+into FingerprintSets that a SceneDeduplicator consults scene by scene,
+either on the records of tmp.py's pipeline (check) or on stored scenes, as
+faron.build writes them (check_stored).
+"""
+import os
+import re
+import json
+import hashlib
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import shapely
+
+from faron.stats import count
+from faron.synthetic_polygons import relation_key, scene_canvas
+
+DEDUP_GRID = 1e-3              # Fingerprint quantization step, as a fraction of the canvas extent
+DEDUP_FLUSH_EVERY = 100000     # New fingerprints kept in memory before they are merged into the sorted array
+
+_GEOMETRY_NAME = re.compile(r"\b(?:POLYGON|LINE|POINT)_\d+\b")
+
+def _hash64(data:bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+def geometry_hashes(geoms:Sequence, canvas_bounds:Tuple[float], grid:float=DEDUP_GRID) -> List[int]:
+    """64-bit hash of every geometry after snapping it to the fingerprint grid and normalizing it."""
+    min_x, min_y, max_x, max_y = canvas_bounds
+    step = grid * max(max_x - min_x, max_y - min_y)
+    snapped = shapely.transform(np.asarray(geoms, dtype=object), lambda coords: np.round(coords / step))
+    return [_hash64(wkb) for wkb in shapely.to_wkb(shapely.normalize(snapped))]
+
+def scene_fingerprints(named_geoms:Dict,
+                       relationships:List,
+                       question:Optional[Dict],
+                       canvas_bounds:Tuple[float],
+                       grid:float=DEDUP_GRID) -> Tuple[int, Optional[int]]:
+    """
+    Fingerprints of a scene and of its question.
+
+    Args:
+        named_geoms (dict): Geometry name -> geometry
+        relationships (list): (name_a, name_b, relation) tuples ('disjoint' and 'contains' are left out)
+        question (dict): Question record with a "question" text (None or an error record for no question)
+        canvas_bounds (tuple): Canvas the quantization grid is relative to
+
+    Returns:
+        tuple: (scene fingerprint, question fingerprint or None) as 64-bit ints
+    """
+    hashes = dict(zip(named_geoms, geometry_hashes(list(named_geoms.values()), canvas_bounds, grid)))
+    kinds = {name: geom.geom_type for name, geom in named_geoms.items()}
+    # Sampled 'disjoint' pairs differ between runs and 'contains' only mirrors 'within'
+    relation_multiset = sorted(Counter(
+        relation_key(kinds[a], kinds[b], relation)
+        for a, b, relation in relationships if relation not in ("contains", "disjoint")
+    ).items())
+
+    scene = _hash64(
+        np.sort(np.array(list(hashes.values()), dtype=np.uint64)).tobytes()
+        + json.dumps(relation_multiset).encode()
+    )
+
+    if not question or "error" in question:
+        return scene, None
+    text = _GEOMETRY_NAME.sub(lambda match: f"{hashes.get(match.group(0), match.group(0))}", question["question"])
+    return scene, _hash64(" ".join(text.lower().split()).encode())
+
+def stored_geometries(scene:Dict) -> Dict:
+    """Geometry name -> geometry of a stored scene: WKT geometries, or the TopoJSON topology of a map scene."""
+    if "topology" in scene:
+        from faron.synthetic_maps import decode_topojson
+
+        geoms, properties = decode_topojson(scene["topology"])
+        return {props["name"]: geom for props, geom in zip(properties, geoms)}
+    geometries = scene["geometries"]
+    return dict(zip((g["name"] for g in geometries), shapely.from_wkt([g["wkt"] for g in geometries])))
+
+class FingerprintSet:
+    """
+    Set of 64-bit fingerprints, stored as a sorted uint64 array (`path`, a
+    .npy file) that is binary searched, plus the fingerprints added since
+    the last flush() in memory. A set without a path lives in memory only.
+    """
+    def __init__(self, path:Optional[str]=None, flush_every:Optional[int]=DEDUP_FLUSH_EVERY) -> None:
+        """
+        Args:
+            path (str): .npy file of the sorted array (default: in memory only)
+            flush_every (int): Pending fingerprints that trigger a flush (None: only explicit flushes)
+        """
+        self.path = path
+        self.flush_every = flush_every
+        self.sorted = np.load(path) if path and os.path.exists(path) else np.empty(0, dtype=np.uint64)
+        self.pending = set()
+
+    def __len__(self) -> int:
+        return len(self.sorted) + len(self.pending)
+
+    def __contains__(self, fingerprint:int) -> bool:
+        if fingerprint in self.pending:
+            return True
+        i = np.searchsorted(self.sorted, np.uint64(fingerprint))
+        return i < len(self.sorted) and int(self.sorted[i]) == fingerprint
+
+    def add(self, fingerprint:int) -> bool:
+        """Adds a fingerprint; returns False if it was already present."""
+        if fingerprint in self:
+            return False
+        self.pending.add(fingerprint)
+        if self.flush_every is not None and len(self.pending) >= self.flush_every:
+            self.flush()
+        return True
+
+    def clear(self) -> None:
+        """Forgets every fingerprint (on disk too, at the next flush)."""
+        self.sorted = np.empty(0, dtype=np.uint64)
+        self.pending.clear()
+
+    def flush(self) -> None:
+        """Merges the new fingerprints into the sorted array and saves it."""
+        if self.pending:
+            self.sorted = np.union1d(self.sorted, np.fromiter(self.pending, dtype=np.uint64, count=len(self.pending)))
+            self.pending.clear()
+        if self.path:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "wb") as outfile:
+                np.save(outfile, self.sorted)
+            os.replace(tmp_path, self.path)
+
+class SceneDeduplicator:
+    """Streaming duplicate filter: drops scenes, then questions, seen before."""
+    def __init__(self,
+                 directory:Optional[str]=None,
+                 grid:float=DEDUP_GRID,
+                 prefix:str="",
+                 flush_every:Optional[int]=DEDUP_FLUSH_EVERY) -> None:
+        """
+        Args:
+            directory (str): Where the fingerprint sets are kept, so that later
+                runs into the same directory are deduplicated against this one
+                (default: in memory only)
+            grid (float): Quantization step as a fraction of the canvas extent
+            prefix (str): Prefix of the fingerprint file names, for several sets in one directory
+            flush_every (int): See FingerprintSet
+        """
+        self.grid = grid
+        self.scenes = FingerprintSet(directory and os.path.join(directory, f"{prefix}scene_fingerprints.npy"), flush_every)
+        self.questions = FingerprintSet(directory and os.path.join(directory, f"{prefix}question_fingerprints.npy"), flush_every)
+        self.stats = Counter()
+
+    def check(self, record:Dict) -> Optional[str]:
+        """
+        Fingerprints a related and questioned pipeline record (stored as
+        record["fingerprints"]) and returns "scene" or "question" for a
+        duplicate, None for a scene to keep.
+        """
+        named_polygons, named_lines, named_points = record["named"]
+        named_geoms = {
+            **named_polygons,
+            **{name: d["geom"] for name, d in named_lines.items()},
+            **{name: d["geom"] for name, d in named_points.items()},
+        }
+        return self._check(record, named_geoms, record["relationships"]["relationships"],
+                           record["question"], scene_canvas(record["scene"]))
+
+    def check_stored(self, scene:Dict) -> Optional[str]:
+        """check() for a stored scene of faron.build (a polygon or a map scene)."""
+        return self._check(scene, stored_geometries(scene), scene["relationships"],
+                           scene.get("question"), scene["canvas_bounds"])
+
+    def _check(self,
+               record:Dict,
+               named_geoms:Dict,
+               relationships:List,
+               question:Optional[Dict],
+               canvas_bounds:Tuple[float]) -> Optional[str]:
+        scene_fp, question_fp = scene_fingerprints(named_geoms, relationships, question, canvas_bounds, self.grid)
+        record["fingerprints"] = {
+            "scene": f"{scene_fp:016x}",
+            "question": None if question_fp is None else f"{question_fp:016x}",
+        }
+
+        self.stats["checked"] += 1
+        duplicate = None
+        if scene_fp in self.scenes:
+            duplicate = "scene"
+        elif question_fp is not None and question_fp in self.questions:
+            duplicate = "question"
+
+        if duplicate is None:
+            self.scenes.add(scene_fp)
+            if question_fp is not None:
+                self.questions.add(question_fp)
+            self.stats["kept"] += 1
+        else:
+            self.stats[f"duplicate_{duplicate}s"] += 1
+            count("duplicates", kind=duplicate)
+        return duplicate
+
+    def reset(self, stored_fingerprints:Iterable[Dict]) -> None:
+        """Replaces the known fingerprints by those of kept scenes, as check() stored them (None for unchecked ones)."""
+        self.scenes.clear()
+        self.questions.clear()
+        for fingerprints in stored_fingerprints:
+            if fingerprints is None:
+                continue
+            self.scenes.add(int(fingerprints["scene"], 16))
+            if fingerprints["question"] is not None:
+                self.questions.add(int(fingerprints["question"], 16))
+
+    def flush(self) -> None:
+        self.scenes.flush()
+        self.questions.flush()
+
+    def summary(self) -> Dict:
+        checked = self.stats["checked"]
+        return {
+            "checked": checked,
+            "kept": self.stats["kept"],
+            "duplicate_scenes": self.stats["duplicate_scenes"],
+            "duplicate_questions": self.stats["duplicate_questions"],
+            "duplicate_rate": round(1 - self.stats["kept"] / checked, 4) if checked else 0.0,
+            "known_scenes": len(self.scenes),
+            "known_questions": len(self.questions),
+        }
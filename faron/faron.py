@@ -1,32 +1,171 @@
 import os
+import json
+import logging
+from collections import OrderedDict
 
+import shapely
 from torch.utils.data import Dataset
 from faron.utils import *
+from faron.synthetic_maps import decode_topojson
+from faron.build import MANIFEST_FILE, build_dataset, iter_built_scenes
+
+logger = logging.getLogger(__name__)
 
 class FARON(Dataset):
     def __init__(self,
                  save_dir:str,
                  mode:str,
-                 img_count:int) -> None:
-        
+                 img_count:int,
+                 render_on_read:bool=False,
+                 resolution:int=512,
+                 cache_size:int=256,
+                 transform=None) -> None:
+        """
+        Args:
+            save_dir (str): Dataset directory holding `scenes/*.json` (and `images/*.png`)
+            mode (str): Dataset mode ('polygon', 'map' or 'mix'); 'polygon' and 'map'
+                datasets are built (or resumed) on construction, 'mix' only loads existing scenes
+            img_count (int): Number of scenes in the dataset
+            render_on_read (bool): Rasterize images from the stored geometry in
+                __getitem__ instead of reading the stored PNGs
+            resolution (int): Output image size in pixels when rendering on read
+            cache_size (int): Number of decoded images kept in the LRU cache (0 disables it)
+            transform (callable): Optional transform applied to every image after the cache
+        """
+
         self.save_dir = save_dir
         self.img_count = img_count
+        self.render_on_read = render_on_read
+        self.resolution = resolution
+        self.cache_size = cache_size
+        self.transform = transform
 
         self.data = []
+        self._image_cache = OrderedDict()
+        # A manifest-tracked build resumes; per-scene datasets of older builds are used as they are
+        build = os.path.exists(os.path.join(save_dir, MANIFEST_FILE)) or not os.path.isdir(os.path.join(save_dir, 'scenes'))
         if mode == 'polygon':
-            print("[INFO] Polygon")
+            logger.info("Polygon")
+            if build:
+                self.create_ds_polygon(img_count)
 
         elif mode == 'map':
-            print("[INFO] Maps")
+            logger.info("Maps")
+            if build:
+                self.create_ds_map(img_count)
+
+        else:
+            logger.info("Mix")
+
+        self.load_scenes()
 
+    def load_scenes(self) -> None:
+        """
+        Load the scenes from the shard files of the build manifest, or from
+        the per-scene files in `save_dir/scenes`. Geometry is kept as one
+        packed WKB array per scene, which is all render-on-read needs.
+        """
+        scene_dir = os.path.join(self.save_dir, 'scenes')
+        if os.path.exists(os.path.join(self.save_dir, MANIFEST_FILE)):
+            scenes = iter_built_scenes(self.save_dir, self.img_count)
+        elif os.path.isdir(scene_dir):
+            scene_files = sorted(f for f in os.listdir(scene_dir) if f.endswith('.json'))
+            scenes = (self._read_scene_file(os.path.join(scene_dir, f)) for f in scene_files[:self.img_count])
         else:
-            print("[INFO] Mix")
+            return
+
+        for scene in scenes:
+            if 'topology' in scene:
+                # Map scenes store their shared borders once, as a TopoJSON topology
+                geoms, properties = decode_topojson(scene.pop('topology'))
+                scene['names'] = [p['name'] for p in properties]
+                scene['styles'] = [p['style'] for p in properties]
+                scene['wkb'] = shapely.to_wkb(geoms)
+            else:
+                geometries = scene.pop('geometries')
+                scene['names'] = [g['name'] for g in geometries]
+                scene['styles'] = [g['style'] for g in geometries]
+                scene['wkb'] = shapely.to_wkb(shapely.from_wkt([g['wkt'] for g in geometries]))
+            self.data.append(scene)
+
+        logger.info("Loaded %d scenes", len(self.data))
+
+    @staticmethod
+    def _read_scene_file(path:str) -> Dict:
+        with open(path, 'r') as file:
+            return json.load(file)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, idx:int) -> Dict:
+        scene = self.data[idx]
+        image = self.get_image(idx)
+        if self.transform is not None:
+            image = self.transform(image)
+
+        return {
+            'image': image,
+            'names': scene['names'],
+            'relationships': scene['relationships'],
+            'question': scene['question'],
+        }
+
+    def get_image(self, idx:int, resolution:int=None) -> np.ndarray:
+        """
+        Return the decoded image of a scene, serving repeated reads from the LRU cache.
+        Scenes stored without an image (map scenes, scenes built without
+        rendering) are rasterized from their geometry even without render_on_read.
+
+        Args:
+            idx (int): Scene index
+            resolution (int): Override of the dataset resolution (rendered images only)
+        """
+        scene = self.data[idx]
+        render = self.render_on_read or scene.get('image') is None
+        resolution = resolution or self.resolution
+        key = (idx, resolution if render else None)
+        if key in self._image_cache:
+            self._image_cache.move_to_end(key)
+            return self._image_cache[key]
+
+        if render:
+            geometries = list(zip(scene['styles'], shapely.from_wkb(scene['wkb'])))
+            image = rasterize_geometries(geometries, scene['canvas_bounds'], resolution, seed=scene['index'])
+        else:
+            with Image.open(os.path.join(self.save_dir, scene['image'])) as file:
+                image = np.asarray(file.convert('RGB'))
+
+        if self.cache_size > 0:
+            self._image_cache[key] = image
+            if len(self._image_cache) > self.cache_size:
+                self._image_cache.popitem(last=False)
+
+        return image
+
+    def create_ds_polygon(self, img_count:int) -> None:
+        """
+        Generate synthetic polygon scenes into shard files under `save_dir/scenes`
+        (see faron.build.polygon_scene for the stored format), checkpointed
+        in the build manifest like create_ds_map.
+
+        Args:
+            img_count (int): Number of polygon scenes to create
+        """
+        manifest = build_dataset(self.save_dir, 'polygon', img_count)
+
+        logger.info("Created %d polygon scenes", manifest.num_scenes())
+
+    def create_ds_map(self, img_count:int) -> None:
+        """
+        Generate synthetic map scenes into shard files under `save_dir/scenes`
+        (see faron.build.map_scene for the stored format). Progress is
+        checkpointed in the build manifest: an interrupted build resumes and
+        a larger `img_count` extends the existing scenes.
 
-        
+        Args:
+            img_count (int): Number of map scenes to create
+        """
+        manifest = build_dataset(self.save_dir, 'map', img_count)
 
-    def create_ds_polygon(img_count:int):
-        return 0
-    
-    def create_ds_map(img_count:int):
-        return 0
-    
\ No newline at end of file
+        logger.info("Created %d map scenes", manifest.num_scenes())
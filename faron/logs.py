@@ -0,0 +1,106 @@
+"""
+Logging setup of the scene pipeline.
+
+Progress and diagnostics go through the "faron" logger (every module logs
+to `logging.getLogger(__name__)`) and the loggers of the scripts built on
+it, to stderr at the configured level. Warnings come back scene after
+scene, so configure_logging() lets every warning message through
+`warning_limit` times and only counts it after that; the suppressed totals
+are logged at exit.
+"""
+import json
+import atexit
+import logging
+import functools
+import threading
+from collections import Counter
+from typing import Dict, Iterable, Optional, TextIO, Tuple
+
+LOG_WARNING_LIMIT = 5 # Occurrences of one warning message shown per run
+
+class RateLimitFilter(logging.Filter):
+    """Passes every warning message (by its unformatted template) `limit` times, then counts it."""
+    def __init__(self, limit:int) -> None:
+        super().__init__()
+        self.limit = limit
+        self.lock = threading.Lock()
+        self.seen = Counter()
+
+    def filter(self, record:logging.LogRecord) -> bool:
+        if record.levelno != logging.WARNING:
+            return True
+        key = (record.name, record.msg)
+        with self.lock:
+            self.seen[key] += 1
+            seen = self.seen[key]
+        if seen == self.limit:
+            record.msg = f"{record.msg} (further occurrences suppressed)"
+        return seen <= self.limit
+
+    def suppressed(self) -> Dict[Tuple[str, str], int]:
+        """(logger name, message template) -> number of records dropped."""
+        with self.lock:
+            return {key: seen - self.limit for key, seen in self.seen.items() if seen > self.limit}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; the dict passed as extra={"fields": ...} is merged in."""
+    def format(self, record:logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+def configure_logging(level:str="INFO",
+                      fmt:str="text",
+                      warning_limit:int=LOG_WARNING_LIMIT,
+                      stream:Optional[TextIO]=None,
+                      names:Iterable[str]=("faron",)) -> RateLimitFilter:
+    """
+    Sends the records of the loggers `names` (and their children) to stderr
+    (or `stream`) through one handler.
+
+    Args:
+        level (str): Level of the configured loggers
+        fmt (str): 'text' or 'json' (one object per line, with the structured fields)
+        warning_limit (int): Occurrences of each warning message passed before it is suppressed
+        stream (file): Stream to write to (default: stderr)
+        names (list): Loggers to configure, e.g. ("faron", "tmp") for a script
+
+    Returns:
+        RateLimitFilter: The filter counting the suppressed warnings
+    """
+    handler = logging.StreamHandler(stream)
+    if fmt == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    rate_limit = RateLimitFilter(warning_limit)
+    handler.addFilter(rate_limit)
+
+    for name in names:
+        logger = logging.getLogger(name)
+        logger.handlers[:] = [handler]
+        logger.setLevel(level)
+        logger.propagate = False
+
+    # One exit report, for the filter of the latest configuration
+    global _exit_report
+    if _exit_report is not None:
+        atexit.unregister(_exit_report)
+    _exit_report = functools.partial(report_suppressed, rate_limit)
+    atexit.register(_exit_report)
+    return rate_limit
+
+_exit_report = None # report_suppressed of the current configuration, registered with atexit
+
+def report_suppressed(rate_limit:RateLimitFilter) -> None:
+    """Logs how many records of each warning message `rate_limit` dropped."""
+    for (name, template), dropped in sorted(rate_limit.suppressed().items()):
+        logging.getLogger(name).info("Suppressed %d more warning(s): %s", dropped, template,
+                                     extra={"fields": {"suppressed": dropped, "template": template}})
@@ -0,0 +1,182 @@
+"""
+Per-stage wall time and event counters of the scene pipeline (placement
+attempts and rejections, GEOS predicate calls, failures).
+
+Instrumentation is off unless enable_stats() is called: the module-level
+STATS is then None, stage_timer() hands out one shared no-op context
+manager and count() returns on its first check, so instrumented code costs
+a global lookup per call site. Hot loops keep their own local tallies and
+report them once per loop. The memory helpers at the end measure the
+resident size of the process against a RAM budget.
+"""
+import os
+import sys
+import json
+import time
+import threading
+import contextlib
+from collections import Counter, defaultdict
+from typing import Dict, Optional
+
+class PipelineStats:
+    """Thread-safe accumulator of stage timings and labelled counters."""
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.stages = defaultdict(lambda: [0, 0.0]) # stage -> [calls, seconds]
+        self.counters = Counter()                   # (name, ((label, value), ...)) -> total
+
+    def add_time(self, stage:str, seconds:float) -> None:
+        with self.lock:
+            entry = self.stages[stage]
+            entry[0] += 1
+            entry[1] += seconds
+
+    def add_count(self, name:str, value:float, labels:Dict) -> None:
+        with self.lock:
+            self.counters[(name, tuple(sorted(labels.items())))] += value
+
+    def counter(self, name:str, **labels) -> float:
+        """Total of one counter, summed over the labels not given."""
+        wanted = set(labels.items())
+        return sum(total for (counter_name, key), total in self.counters.items()
+                   if counter_name == name and wanted <= set(key))
+
+    def rejection_rates(self) -> Dict[str, float]:
+        """Share of rejected placement attempts, per object kind."""
+        rates = {}
+        for (name, key), attempts in self.counters.items():
+            if name == "placement_attempts" and attempts:
+                rates[dict(key)["kind"]] = self.counter("placement_rejections", **dict(key)) / attempts
+        return rates
+
+    def to_dict(self) -> Dict:
+        """Aggregated stats, with per-scene means once scenes were counted."""
+        with self.lock:
+            num_scenes = self.counters.get(("scenes", ()), 0)
+            stages = {
+                stage: {"calls": calls, "seconds": round(seconds, 6), "mean_seconds": round(seconds / calls, 6)}
+                for stage, (calls, seconds) in sorted(self.stages.items())
+            }
+            counters = [
+                {"name": name, "labels": dict(key), "value": value}
+                for (name, key), value in sorted(self.counters.items())
+            ]
+        stats = {"stages": stages, "counters": counters, "rejection_rates": self.rejection_rates()}
+        if num_scenes:
+            stats["per_scene"] = {
+                "seconds": {stage: round(entry["seconds"] / num_scenes, 6) for stage, entry in stages.items()},
+                "counters": [dict(counter, value=counter["value"] / num_scenes) for counter in counters],
+            }
+        return stats
+
+    def to_prometheus(self, prefix:str="faron") -> str:
+        """Aggregated stats in the Prometheus text exposition format."""
+        def labels_text(labels):
+            if not labels:
+                return ""
+            return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+        lines = [
+            f"# TYPE {prefix}_stage_seconds_total counter",
+            *(f'{prefix}_stage_seconds_total{{stage="{stage}"}} {seconds}' for stage, (_, seconds) in sorted(self.stages.items())),
+            f"# TYPE {prefix}_stage_calls_total counter",
+            *(f'{prefix}_stage_calls_total{{stage="{stage}"}} {calls}' for stage, (calls, _) in sorted(self.stages.items())),
+        ]
+        for name in sorted({name for name, _ in self.counters}):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.extend(
+                f"{prefix}_{name}_total{labels_text(key)} {value}"
+                for (counter_name, key), value in sorted(self.counters.items()) if counter_name == name
+            )
+        lines.append(f"# TYPE {prefix}_placement_rejection_ratio gauge")
+        lines.extend(f'{prefix}_placement_rejection_ratio{{kind="{kind}"}} {rate}' for kind, rate in sorted(self.rejection_rates().items()))
+        return "\n".join(lines) + "\n"
+
+    def save(self, path:str, fmt:str="json") -> None:
+        """Writes the stats as JSON or Prometheus text ("prometheus")."""
+        with open(path, "w") as outfile:
+            if fmt == "prometheus":
+                outfile.write(self.to_prometheus())
+            else:
+                json.dump(self.to_dict(), outfile, indent=4)
+
+class _StageTimer:
+    """Adds the wall time of its block to a stage; a raising block also counts as a failure."""
+    __slots__ = ("stats", "stage", "start")
+
+    def __init__(self, stats, stage):
+        self.stats = stats
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stats.add_time(self.stage, time.perf_counter() - self.start)
+        if exc_type is not None:
+            self.stats.add_count("failures", 1, {"stage": self.stage})
+        return False
+
+_NO_TIMER = contextlib.nullcontext()
+
+STATS = None # PipelineStats while instrumentation is enabled
+
+def enable_stats() -> PipelineStats:
+    """Turns instrumentation on (with fresh totals) and returns the accumulator."""
+    global STATS
+    STATS = PipelineStats()
+    return STATS
+
+def disable_stats() -> Optional[PipelineStats]:
+    """Turns instrumentation off and returns the totals collected so far."""
+    global STATS
+    stats, STATS = STATS, None
+    return stats
+
+def stage_timer(stage:str):
+    """Context manager timing one run of `stage` (a shared no-op when disabled)."""
+    if STATS is None:
+        return _NO_TIMER
+    return _StageTimer(STATS, stage)
+
+def record_time(stage:str, seconds:float) -> None:
+    """Adds a duration measured elsewhere, e.g. in a worker process."""
+    if STATS is not None:
+        STATS.add_time(stage, seconds)
+
+def count(name:str, value:float=1, **labels) -> None:
+    """Adds `value` to the counter `name` with the given labels."""
+    if STATS is not None:
+        STATS.add_count(name, value, labels)
+
+def count_placement(kind:str, attempts:int, placed:int, wanted:int) -> None:
+    """Records one placement loop: attempts, rejected attempts and objects left unplaced."""
+    if STATS is not None and (attempts or wanted):
+        STATS.add_count("placement_attempts", attempts, {"kind": kind})
+        STATS.add_count("placement_rejections", attempts - placed, {"kind": kind})
+        if wanted > placed:
+            STATS.add_count("placement_failures", wanted - placed, {"kind": kind})
+
+# --- Memory ---
+
+def peak_memory_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+def current_memory_mb() -> float:
+    """Current resident set size in MB (the peak where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return peak_memory_mb()
+
+def check_memory_budget(ram_budget_mb:Optional[float], stage:str) -> None:
+    """Raises MemoryError once the process has grown past `ram_budget_mb`."""
+    used = current_memory_mb()
+    if ram_budget_mb is not None and used > ram_budget_mb:
+        raise MemoryError(f"Large scene exceeded its {ram_budget_mb} MB RAM budget while {stage} ({used:.0f} MB resident).")
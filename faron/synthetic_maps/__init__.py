@@ -0,0 +1,8 @@
+from ._map import generate_map
+from ._topology import PlanarTopology, decode_topojson
+
+__all__ = [
+    "generate_map",
+    "PlanarTopology",
+    "decode_topojson"
+]
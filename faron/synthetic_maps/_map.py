@@ -0,0 +1,103 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+import shapely
+
+from ._parcels import generate_parcels, vertex_incidence
+from ._roads import ring_edges, generate_roads
+from ._pois import generate_pois
+from ._topology import PlanarTopology
+
+def sample_disjoint(num_entities:int,
+                    labeled:np.ndarray,
+                    disjoint_rate:float,
+                    rng:np.random.Generator) -> np.ndarray:
+    """
+    Draw a `disjoint_rate` sample of the entity pairs not in `labeled`
+    (the dataset's disjoint sampling), without enumerating all pairs.
+    """
+    if num_entities < 2 or disjoint_rate <= 0:
+        return np.empty((0, 2), dtype=int)
+
+    num_samples = rng.binomial(num_entities * (num_entities - 1) // 2, disjoint_rate)
+    pairs = np.sort(rng.integers(0, num_entities, size=(num_samples, 2)), axis=1)
+    pairs = np.unique(pairs[pairs[:, 0] != pairs[:, 1]], axis=0)
+
+    keys = pairs[:, 0] * num_entities + pairs[:, 1]
+    labeled_keys = labeled[:, 0] * num_entities + labeled[:, 1]
+    return pairs[~np.isin(keys, labeled_keys)]
+
+def generate_map(canvas_bounds:Tuple[float]=(0, 0, 100, 100),
+                 num_parcels:int=100,
+                 num_roads:int=10,
+                 num_pois:int=30,
+                 road_length_range:Tuple[int]=(3, 12),
+                 disjoint_rate:float=0.05,
+                 seed:int=None) -> Dict:
+    """
+    Generate a synthetic map of parcels, roads and points of interest whose
+    relationships are known by construction.
+
+    Parcels are Voronoi cells, roads run along parcel borders and POIs lie
+    strictly inside parcels, so:
+        - two parcels / roads touch exactly when they share a node of the
+          map's arc-node topology (see PlanarTopology)
+        - a POI is within the parcel it was placed in, and nothing else
+    and no spatial predicate is ever evaluated.
+
+    Args:
+        canvas_bounds (tuple): (min_x, min_y, max_x, max_y) of the map
+        num_parcels (int): Number of parcels (polygons)
+        num_roads (int): Number of roads (lines); fewer if the border graph runs out of free edges
+        num_pois (int): Number of points of interest
+        road_length_range (tuple): (min, max) number of border edges per road
+        disjoint_rate (float): Share of the unrelated pairs reported as "disjoint"
+        seed (int): Seed of the map's random generator
+
+    Returns:
+        dict: "parcels", "roads" and "pois" geometry arrays, their "names"
+            (POLYGON_/LINE_/POINT_ numbering), the "topology" of parcels and
+            roads and "relationships" as (name_a, name_b, relation) tuples
+    """
+    rng = np.random.default_rng(seed)
+
+    parcels, seeds = generate_parcels(canvas_bounds, num_parcels, rng)
+    vertices, parcel_idx, vertex_idx = vertex_incidence(parcels)
+    roads_vertices = generate_roads(vertices, ring_edges(parcel_idx, vertex_idx), num_roads, road_length_range, rng)
+    pois, poi_parcel = generate_pois(parcels, seeds, num_pois, rng)
+
+    if roads_vertices:
+        road_idx = np.repeat(np.arange(len(roads_vertices)), [len(road) for road in roads_vertices])
+        roads = shapely.linestrings(vertices[np.concatenate(roads_vertices)], indices=road_idx)
+    else:
+        roads = np.empty(0, dtype=object)
+    topology = PlanarTopology(parcels, roads)
+
+    num_parcels, num_roads, num_pois = len(parcels), len(roads), len(pois)
+    names = (
+        [f"POLYGON_{i+1}" for i in range(num_parcels)]
+        + [f"LINE_{i+1}" for i in range(num_roads)]
+        + [f"POINT_{i+1}" for i in range(num_pois)]
+    )
+
+    # Entity ids follow the name order: parcels, then roads, then POIs
+    touching = topology.touch_pairs()
+    within = np.column_stack([num_parcels + num_roads + np.arange(num_pois), poi_parcel])
+    disjoint = sample_disjoint(len(names), np.concatenate([touching, np.sort(within, axis=1)]), disjoint_rate, rng)
+
+    relationships: List[Tuple[str, str, str]] = []
+    relationships.extend((names[a], names[b], "touches") for a, b in touching)
+    for poi, parcel in within:
+        relationships.append((names[poi], names[parcel], "within"))
+        relationships.append((names[parcel], names[poi], "contains"))
+    relationships.extend((names[a], names[b], "disjoint") for a, b in disjoint)
+
+    return {
+        "canvas_bounds": tuple(canvas_bounds),
+        "parcels": parcels,
+        "roads": roads,
+        "pois": pois,
+        "names": names,
+        "topology": topology,
+        "relationships": relationships,
+    }
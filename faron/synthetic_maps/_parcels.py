@@ -0,0 +1,69 @@
+from typing import Tuple
+
+import numpy as np
+import shapely
+
+def generate_parcels(canvas_bounds:Tuple[float],
+                     num_parcels:int,
+                     rng:np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Tessellate the canvas into Voronoi parcels around jittered grid seeds.
+
+    Only cells lying strictly inside the canvas are kept, so no parcel is ever
+    clipped: every vertex is a Voronoi vertex computed once by GEOS and is
+    bit-identical in all the parcels sharing it, which is what lets relations
+    be read off shared vertices instead of being recomputed.
+
+    Args:
+        canvas_bounds (tuple): (min_x, min_y, max_x, max_y) of the map
+        num_parcels (int): Number of parcels to keep
+        rng (np.random.Generator): Random generator
+
+    Returns:
+        tuple: (parcels, seeds), the convex parcel polygons and the seed point
+            of each parcel as an (n, 2) array (every seed lies strictly inside its parcel)
+    """
+    min_x, min_y, max_x, max_y = canvas_bounds
+
+    # One extra ring of seeds on every side; their cells reach the canvas edge and are dropped
+    grid_size = int(np.ceil(np.sqrt(num_parcels))) + 2
+    cell_w, cell_h = (max_x - min_x) / grid_size, (max_y - min_y) / grid_size
+    grid_x, grid_y = np.meshgrid(np.arange(grid_size), np.arange(grid_size))
+    seeds = np.column_stack([
+        min_x + (grid_x.ravel() + rng.uniform(0.1, 0.9, grid_size ** 2)) * cell_w,
+        min_y + (grid_y.ravel() + rng.uniform(0.1, 0.9, grid_size ** 2)) * cell_h,
+    ])
+
+    canvas = shapely.box(min_x, min_y, max_x, max_y)
+    cells = shapely.get_parts(shapely.voronoi_polygons(shapely.multipoints(seeds), extend_to=canvas, ordered=True))
+    bounds = shapely.bounds(cells)
+    inside = (bounds[:, 0] > min_x) & (bounds[:, 1] > min_y) & (bounds[:, 2] < max_x) & (bounds[:, 3] < max_y)
+    cells, seeds = cells[inside], seeds[inside]
+
+    # Keep the most central parcels so the map stays one compact block
+    center = np.array([(min_x + max_x) / 2, (min_y + max_y) / 2])
+    order = np.argsort(np.abs(seeds - center).max(axis=1), kind="stable")[:num_parcels]
+    order.sort()
+    return cells[order], seeds[order]
+
+def vertex_incidence(geoms:np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Index the distinct vertices of polygons and lines.
+
+    Args:
+        geoms (np.ndarray): Polygons and/or LineStrings
+
+    Returns:
+        tuple: (vertices, geom_idx, vertex_idx) where vertices is the (m, 2)
+            array of distinct coordinates and (geom_idx[k], vertex_idx[k])
+            lists every vertex of every geometry in ring / line order, without
+            the closing coordinate of polygon rings
+    """
+    coords, geom_idx = shapely.get_coordinates(geoms, return_index=True)
+    is_polygon = shapely.get_type_id(geoms) == 3
+    is_closing = np.zeros(len(coords), dtype=bool)
+    ring_ends = np.cumsum(np.bincount(geom_idx, minlength=len(geoms))) - 1
+    is_closing[ring_ends[is_polygon]] = True
+
+    vertices, vertex_idx = np.unique(coords[~is_closing], axis=0, return_inverse=True)
+    return vertices, geom_idx[~is_closing], vertex_idx.ravel()
@@ -0,0 +1,38 @@
+from typing import Tuple
+
+import numpy as np
+import shapely
+
+def generate_pois(parcels:np.ndarray,
+                  seeds:np.ndarray,
+                  num_pois:int,
+                  rng:np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Scatter points of interest strictly inside randomly chosen parcels.
+
+    Parcels are convex and contain their seed, so a point on the way from the
+    seed to any border point, stopping short of the border, is in the interior.
+
+    Args:
+        parcels (np.ndarray): Convex parcel polygons
+        seeds (np.ndarray): (n, 2) interior point of every parcel
+        num_pois (int): Number of points to place
+        rng (np.random.Generator): Random generator
+
+    Returns:
+        tuple: (pois, parcel_of), the points and the index of the parcel holding each
+    """
+    coords, ring_idx = shapely.get_coordinates(parcels, return_index=True)
+    ring_sizes = np.bincount(ring_idx, minlength=len(parcels))
+    ring_starts = np.cumsum(ring_sizes) - ring_sizes
+
+    # Random border point: a random spot on a random edge (rings are closed, so k + 1 exists)
+    parcel_of = rng.integers(0, len(parcels), num_pois)
+    edge = ring_starts[parcel_of] + (rng.random(num_pois) * (ring_sizes[parcel_of] - 1)).astype(int)
+    along = rng.random(num_pois)[:, np.newaxis]
+    border = coords[edge] * (1 - along) + coords[edge + 1] * along
+
+    # Square root spreads the points evenly over the area instead of bunching them at the seed
+    reach = 0.9 * np.sqrt(rng.random(num_pois))[:, np.newaxis]
+    pois = seeds[parcel_of] + reach * (border - seeds[parcel_of])
+    return shapely.points(pois), parcel_of
@@ -0,0 +1,77 @@
+from typing import List, Tuple
+
+import numpy as np
+
+def ring_edges(geom_idx:np.ndarray, vertex_idx:np.ndarray) -> np.ndarray:
+    """
+    Distinct undirected edges of polygon rings given their vertex incidence
+    (see vertex_incidence), as an (e, 2) array of sorted vertex ids.
+    """
+    # Every vertex is joined to the next one of its ring, the last one to the first
+    position = np.arange(len(geom_idx))
+    ring_start = np.searchsorted(geom_idx, geom_idx, side='left')
+    ring_end = np.searchsorted(geom_idx, geom_idx, side='right')
+    following = np.where(position + 1 < ring_end, position + 1, ring_start)
+
+    edges = np.sort(np.column_stack([vertex_idx, vertex_idx[following]]), axis=1)
+    return np.unique(edges, axis=0)
+
+def generate_roads(vertices:np.ndarray,
+                   edges:np.ndarray,
+                   num_roads:int,
+                   length_range:Tuple[int],
+                   rng:np.random.Generator) -> List[np.ndarray]:
+    """
+    Lay roads along parcel borders as edge-disjoint simple paths of the edge graph.
+
+    A road keeps to the straightest unused edge at every vertex. Since Voronoi
+    vertices have degree 3, two edge-disjoint roads can never pass through the
+    same vertex, so roads meet other roads only where one of them ends.
+
+    Args:
+        vertices (np.ndarray): (m, 2) vertex coordinates
+        edges (np.ndarray): (e, 2) vertex ids of the edge graph
+        num_roads (int): Number of roads to lay
+        length_range (tuple): (min, max) number of edges per road
+        rng (np.random.Generator): Random generator
+
+    Returns:
+        list: One array of vertex ids per road, in driving order
+    """
+    # Adjacency in CSR form: the edges leaving vertex v are half_edges[offsets[v]:offsets[v + 1]]
+    sources = np.concatenate([edges[:, 0], edges[:, 1]])
+    targets = np.concatenate([edges[:, 1], edges[:, 0]])
+    edge_ids = np.concatenate([np.arange(len(edges))] * 2)
+    order = np.argsort(sources, kind="stable")
+    targets, edge_ids = targets[order], edge_ids[order]
+    offsets = np.searchsorted(sources[order], np.arange(len(vertices) + 1))
+
+    used = np.zeros(len(edges), dtype=bool)
+    roads = []
+    for start_edge in rng.permutation(len(edges)):
+        if len(roads) == num_roads:
+            break
+        if used[start_edge]:
+            continue
+
+        path = list(edges[start_edge])
+        path_edges = [start_edge]
+        target_length = rng.integers(length_range[0], length_range[1] + 1)
+        while len(path_edges) < target_length:
+            head = path[-1]
+            candidates = [
+                (target, edge) for target, edge in zip(targets[offsets[head]:offsets[head + 1]], edge_ids[offsets[head]:offsets[head + 1]])
+                if not used[edge] and target not in path
+            ]
+            if not candidates:
+                break
+            heading = vertices[head] - vertices[path[-2]]
+            turn = [np.dot(heading, vertices[target] - vertices[head]) / np.linalg.norm(vertices[target] - vertices[head]) for target, _ in candidates]
+            target, edge = candidates[int(np.argmax(turn))]
+            path.append(target)
+            path_edges.append(edge)
+
+        used[path_edges] = True
+        roads.append(np.array(path))
+
+    return roads
@@ -0,0 +1,305 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+import shapely
+
+from ._parcels import vertex_incidence
+
+class PlanarTopology:
+    """
+    Arc-node topology of a planar partition, in the spirit of TopoJSON.
+
+    Faces (polygons without holes) and lines sharing bit-identical vertices
+    are cut into arcs: maximal chains of edges with the same face on either
+    side and the same line running along them. Arcs end at nodes and every
+    shared boundary is stored once, referenced by the faces and lines using it.
+
+    Attributes:
+        vertices (np.ndarray): (m, 2) coordinates of all distinct vertices
+        arcs (List[np.ndarray]): Vertex ids of every arc, from start node to end node
+        arc_faces (np.ndarray): (a, 2) face on the left / right of every arc (-1: outside)
+        arc_lines (np.ndarray): (a,) line running along every arc (-1: none)
+        face_arcs (List[List[int]]): Counter-clockwise ring of every face as arc
+            references, ~i meaning arc i reversed
+        line_arcs (List[List[int]]): Every line as arc references, in line order
+    """
+    def __init__(self,
+                 faces:np.ndarray,
+                 lines:np.ndarray=None) -> None:
+        """
+        Args:
+            faces (np.ndarray): Polygons of the partition, sharing exact vertices along common borders
+            lines (np.ndarray): LineStrings running along face borders (edge-disjoint from each other)
+        """
+        faces = np.asarray(faces, dtype=object)
+        lines = np.empty(0, dtype=object) if lines is None else np.asarray(lines, dtype=object)
+        self.num_faces, self.num_lines = len(faces), len(lines)
+
+        self.vertices, geom_idx, vertex_idx = vertex_incidence(np.concatenate([faces, lines]))
+        self._build_edges(geom_idx, vertex_idx, shapely.is_ccw(shapely.get_exterior_ring(faces)))
+        self._trace_arcs()
+        self.face_arcs = [self._chain(refs) for refs in self._face_refs()]
+        self.line_arcs = self._line_refs(geom_idx, vertex_idx)
+
+    def _build_edges(self, geom_idx:np.ndarray, vertex_idx:np.ndarray, is_ccw:np.ndarray) -> None:
+        """Label every undirected edge (a < b) with its left face, right face and line."""
+        position = np.arange(len(geom_idx))
+        ring_start = np.searchsorted(geom_idx, geom_idx, side='left')
+        ring_end = np.searchsorted(geom_idx, geom_idx, side='right')
+        is_face = geom_idx < self.num_faces
+
+        # Faces wrap around to their first vertex, lines stop at their last one
+        has_next = is_face | (position + 1 < ring_end)
+        following = np.where(position + 1 < ring_end, position + 1, ring_start)
+        tail, head = vertex_idx[has_next], vertex_idx[following][has_next]
+        owner, is_face = geom_idx[has_next], is_face[has_next]
+
+        # Walking a counter-clockwise ring keeps the face on the left
+        forward = np.where(is_face & ~is_ccw[np.minimum(owner, self.num_faces - 1)], tail > head, tail < head)
+        self.edges, edge_of = np.unique(np.sort(np.column_stack([tail, head]), axis=1), axis=0, return_inverse=True)
+        edge_of = edge_of.ravel()
+
+        self.edge_faces = np.full((len(self.edges), 2), -1)
+        self.edge_faces[edge_of[is_face], np.where(forward[is_face], 0, 1)] = owner[is_face]
+        self.edge_lines = np.full(len(self.edges), -1)
+        line_edges = edge_of[~is_face]
+        if len(np.unique(line_edges)) < len(line_edges):
+            raise ValueError("Lines of a PlanarTopology must not share edges.")
+        self.edge_lines[line_edges] = owner[~is_face] - self.num_faces
+
+    def _trace_arcs(self) -> None:
+        """Cut the edge graph into arcs at every vertex where the edge labels change."""
+        # Edges leaving every vertex, in CSR form
+        sources = np.concatenate([self.edges[:, 0], self.edges[:, 1]])
+        targets = np.concatenate([self.edges[:, 1], self.edges[:, 0]])
+        half_edges = np.concatenate([np.arange(len(self.edges))] * 2)
+        order = np.argsort(sources, kind="stable")
+        self._targets, self._half_edges = targets[order], half_edges[order]
+        self._offsets = np.searchsorted(sources[order], np.arange(len(self.vertices) + 1))
+        degree = np.diff(self._offsets)
+
+        is_node = degree != 2
+        for vertex in np.nonzero(degree == 2)[0]:
+            (prev, _), (nxt, _) = self._neighbors(vertex)
+            # Labels as seen when walking prev -> vertex -> next
+            if self._label(prev, vertex) != self._label(vertex, nxt):
+                is_node[vertex] = True
+
+        arcs, visited = [], np.zeros(len(self.edges), dtype=bool)
+        def walk(start, target, edge):
+            arc = [start]
+            while True:
+                visited[edge] = True
+                arc.append(target)
+                if is_node[target] or target == start:
+                    return np.array(arc)
+                (a, edge_a), (b, edge_b) = self._neighbors(target)
+                target, edge = (b, edge_b) if edge_a == edge else (a, edge_a)
+
+        for node in np.nonzero(is_node)[0]:
+            for target, edge in self._neighbors(node):
+                if not visited[edge]:
+                    arcs.append(walk(node, target, edge))
+        # What is left are closed rings without any node; each becomes one arc
+        for edge in np.nonzero(~visited)[0]:
+            if not visited[edge]:
+                start, target = self.edges[edge]
+                is_node[start] = True
+                arcs.append(walk(start, target, edge))
+
+        self.arcs = arcs
+        self.is_node = is_node
+        self.arc_faces = np.array([self._faces(arc[0], arc[1]) for arc in arcs], dtype=int).reshape(-1, 2)
+        self.arc_lines = np.array([self.edge_lines[self._edge(arc[0], arc[1])] for arc in arcs], dtype=int)
+
+    def _neighbors(self, vertex:int) -> List[Tuple[int, int]]:
+        span = slice(self._offsets[vertex], self._offsets[vertex + 1])
+        return list(zip(self._targets[span], self._half_edges[span]))
+
+    def _edge(self, a:int, b:int) -> int:
+        for target, edge in self._neighbors(a):
+            if target == b:
+                return edge
+        raise KeyError((a, b))
+
+    def _faces(self, a:int, b:int) -> Tuple[int, int]:
+        """(left, right) faces when walking from vertex a to vertex b."""
+        left, right = self.edge_faces[self._edge(a, b)]
+        return (left, right) if a < b else (right, left)
+
+    def _label(self, a:int, b:int) -> Tuple[int, int, int]:
+        return self._faces(a, b) + (self.edge_lines[self._edge(a, b)],)
+
+    def _face_refs(self) -> List[List[int]]:
+        """Arc references of every face: arc i where the face is on its left, ~i on its right."""
+        refs = [[] for _ in range(self.num_faces)]
+        for arc, (left, right) in enumerate(self.arc_faces):
+            if left >= 0:
+                refs[left].append(arc)
+            if right >= 0:
+                refs[right].append(~arc)
+        return refs
+
+    def _line_refs(self, geom_idx:np.ndarray, vertex_idx:np.ndarray) -> List[List[int]]:
+        """Arc references of every line, following the line's own vertex order."""
+        # (first vertex, second vertex) -> reference, for both directions of every arc
+        by_start = {}
+        for arc, vertices in enumerate(self.arcs):
+            by_start[(vertices[0], vertices[1])] = arc
+            by_start[(vertices[-1], vertices[-2])] = ~arc
+
+        line_refs = []
+        line_starts = np.searchsorted(geom_idx, self.num_faces + np.arange(self.num_lines + 1))
+        for line in range(self.num_lines):
+            line_vertices = vertex_idx[line_starts[line]:line_starts[line + 1]]
+            refs, position = [], 0
+            while position < len(line_vertices) - 1:
+                ref = by_start[(line_vertices[position], line_vertices[position + 1])]
+                refs.append(ref)
+                position += len(self.arcs[ref if ref >= 0 else ~ref]) - 1
+            line_refs.append(refs)
+        return line_refs
+
+    def _ends(self, ref:int) -> Tuple[int, int]:
+        arc = self.arcs[ref] if ref >= 0 else self.arcs[~ref]
+        return (arc[0], arc[-1]) if ref >= 0 else (arc[-1], arc[0])
+
+    def _chain(self, refs:List[int]) -> List[int]:
+        """Order the arc references of a ring so that each one starts where the previous one ends."""
+        if not refs:
+            return refs
+        by_start = {self._ends(ref)[0]: ref for ref in refs}
+        chain = [refs[0]]
+        while len(chain) < len(refs):
+            chain.append(by_start[self._ends(chain[-1])[1]])
+        return chain
+
+    def border_pairs(self) -> np.ndarray:
+        """
+        Pairs of faces sharing a boundary line, read from the arc-face
+        incidence in O(arcs).
+
+        Returns:
+            np.ndarray: (p, 2) face ids, smaller id first
+        """
+        pairs = np.sort(self.arc_faces[(self.arc_faces >= 0).all(axis=1)], axis=1)
+        return np.unique(pairs, axis=0)
+
+    def touch_pairs(self) -> np.ndarray:
+        """
+        Pairs of features (faces, then lines, numbered after the faces) whose
+        boundaries meet. Two features meet exactly when they share a node:
+        arcs end at nodes, so any shared arc or vertex implies a shared node.
+
+        Returns:
+            np.ndarray: (p, 2) feature ids, smaller id first
+        """
+        starts = np.array([arc[0] for arc in self.arcs], dtype=int)
+        ends = np.array([arc[-1] for arc in self.arcs], dtype=int)
+        owners = np.concatenate([
+            self.arc_faces[:, 0], self.arc_faces[:, 1],
+            np.where(self.arc_lines >= 0, self.num_faces + self.arc_lines, -1),
+        ])
+        features = np.concatenate([owners, owners])
+        nodes = np.concatenate([np.tile(starts, 3), np.tile(ends, 3)])
+        keep = features >= 0
+        features, nodes = features[keep], nodes[keep]
+
+        incidence = np.unique(np.column_stack([nodes, features]), axis=0)
+        nodes, features = incidence[:, 0], incidence[:, 1]
+        pairs = [np.empty((0, 2), dtype=int)]
+        for gap in range(1, len(nodes)):
+            same = nodes[gap:] == nodes[:-gap]
+            if not same.any():
+                break
+            pairs.append(np.column_stack([features[:-gap][same], features[gap:][same]]))
+        return np.unique(np.sort(np.concatenate(pairs), axis=1), axis=0)
+
+    def to_topojson(self,
+                    properties:List[Dict]=None,
+                    points:np.ndarray=None,
+                    quantization:int=None) -> Dict:
+        """
+        Serialize the faces and lines as a TopoJSON topology.
+
+        With `quantization`, coordinates are snapped to a `quantization` x
+        `quantization` grid over the vertices' extent and arcs are delta
+        encoded, as in TopoJSON. Shared borders stay shared, since each is
+        one arc; only detail finer than a grid step is lost.
+
+        Args:
+            properties (list): Optional properties of every feature (faces, lines, then points)
+            points (np.ndarray): Optional Points stored as a third "points" object
+            quantization (int): Grid size per axis (e.g. 10**6); None keeps full precision
+
+        Returns:
+            dict: {"type": "Topology", "arcs": [...], "objects": {"faces": ..., "lines": ..., "points": ...}}
+        """
+        points = np.empty(0, dtype=object) if points is None else np.asarray(points, dtype=object)
+        num_features = self.num_faces + self.num_lines
+        properties = properties or [{} for _ in range(num_features + len(points))]
+        point_coords = shapely.get_coordinates(points)
+
+        topology = {"type": "Topology"}
+        if quantization:
+            translate = self.vertices.min(axis=0)
+            extent = self.vertices.max(axis=0) - translate
+            scale = np.where(extent > 0, extent / (quantization - 1), 1.0)
+            grid = np.round((self.vertices - translate) / scale).astype(int)
+            topology["transform"] = {"scale": scale.tolist(), "translate": translate.tolist()}
+            topology["arcs"] = [np.diff(grid[arc], axis=0, prepend=0).tolist() for arc in self.arcs]
+            point_coords = np.round((point_coords - translate) / scale).astype(int)
+        else:
+            topology["arcs"] = [self.vertices[arc].tolist() for arc in self.arcs]
+
+        topology["objects"] = {
+            "faces": {"type": "GeometryCollection", "geometries": [
+                {"type": "Polygon", "arcs": [[int(ref) for ref in refs]], "properties": props}
+                for refs, props in zip(self.face_arcs, properties[:self.num_faces])
+            ]},
+            "lines": {"type": "GeometryCollection", "geometries": [
+                {"type": "LineString", "arcs": [int(ref) for ref in refs], "properties": props}
+                for refs, props in zip(self.line_arcs, properties[self.num_faces:num_features])
+            ]},
+        }
+        if len(points):
+            topology["objects"]["points"] = {"type": "GeometryCollection", "geometries": [
+                {"type": "Point", "coordinates": coords, "properties": props}
+                for coords, props in zip(point_coords.tolist(), properties[num_features:])
+            ]}
+        return topology
+
+def decode_topojson(topology:Dict) -> Tuple[np.ndarray, List[Dict]]:
+    """
+    Rebuild the geometries of a topology written by PlanarTopology.to_topojson.
+
+    Args:
+        topology (dict): TopoJSON topology (quantized or not)
+
+    Returns:
+        tuple: (geometries, properties) of all objects, in object order
+    """
+    scale, translate = np.ones(2), np.zeros(2)
+    if "transform" in topology:
+        scale = np.asarray(topology["transform"]["scale"], dtype=float)
+        translate = np.asarray(topology["transform"]["translate"], dtype=float)
+        arcs = [np.cumsum(np.asarray(arc, dtype=float), axis=0) * scale + translate for arc in topology["arcs"]]
+    else:
+        arcs = [np.asarray(arc, dtype=float) for arc in topology["arcs"]]
+
+    def stitch(refs):
+        # Consecutive arcs share their joining node; keep it once
+        parts = [arcs[ref] if ref >= 0 else arcs[~ref][::-1] for ref in refs]
+        return np.concatenate([parts[0]] + [part[1:] for part in parts[1:]])
+
+    geometries, properties = [], []
+    for collection in topology["objects"].values():
+        for obj in collection["geometries"]:
+            if obj["type"] == "Polygon":
+                geometries.append(shapely.Polygon(stitch(obj["arcs"][0])))
+            elif obj["type"] == "LineString":
+                geometries.append(shapely.LineString(stitch(obj["arcs"])))
+            else:
+                geometries.append(shapely.Point(np.asarray(obj["coordinates"], dtype=float) * scale + translate))
+            properties.append(obj.get("properties", {}))
+    return np.array(geometries, dtype=object), properties
@@ -1,9 +1,65 @@
-from .points import *
-from .lines import *
-from .polygons import *
+from ._force_topo import *
+from ._shapes import generate_random_polygons, generate_random_points, generate_random_lines
+from ._geometry import prepare_geometry, GridIndex, transform_batch, fit_into_containers
+from ._placement import (
+    PlacementBudget, free_space_centers, sample_region, place_in_free_space,
+    candidate_stream, placement_budgets, ScenePlacement,
+)
+from ._pairs import plan_polygon_relations, build_polygon_relations, validate_polygon_relations
+from ._relations import (
+    relate_pair, find_all_relationships, find_all_relationships_tiled, iter_tiled_relationships,
+    RelationTracker, sample_disjoint_pairs, relation_key, verify_relationships,
+)
+from ._questions import generate_spatial_question_from_data_with_postgis
+from ._scene import (
+    generate_scene, entity_table, scene_canvas, name_scene_geometries, scene_relationships,
+    stage_relate, stage_questions, scene_json,
+)
+from ._synthesis import synthesize_scene, relation_histogram
 
 __all__ = [
-    "points",
-    "lines",
-    "polygons"
-]
\ No newline at end of file
+    "topo_pairs",
+    "force_pairs",
+    "verify_pairs",
+    "create_touching_pairs",
+    "create_bordering_pairs",
+    "create_overlapping_pairs",
+    "create_within_pairs",
+    "create_crossing_pairs",
+    "generate_random_polygons",
+    "generate_random_points",
+    "generate_random_lines",
+    "prepare_geometry",
+    "GridIndex",
+    "transform_batch",
+    "fit_into_containers",
+    "PlacementBudget",
+    "free_space_centers",
+    "sample_region",
+    "place_in_free_space",
+    "candidate_stream",
+    "placement_budgets",
+    "ScenePlacement",
+    "plan_polygon_relations",
+    "build_polygon_relations",
+    "validate_polygon_relations",
+    "relate_pair",
+    "find_all_relationships",
+    "find_all_relationships_tiled",
+    "iter_tiled_relationships",
+    "RelationTracker",
+    "sample_disjoint_pairs",
+    "relation_key",
+    "verify_relationships",
+    "generate_spatial_question_from_data_with_postgis",
+    "generate_scene",
+    "entity_table",
+    "scene_canvas",
+    "name_scene_geometries",
+    "scene_relationships",
+    "stage_relate",
+    "stage_questions",
+    "scene_json",
+    "synthesize_scene",
+    "relation_histogram",
+]
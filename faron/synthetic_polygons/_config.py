@@ -0,0 +1,49 @@
+# Settings of the polygon scene generator. They are read at call time as
+# attributes of this module, so a script or benchmark changes them with
+# `_config.NAME = value` (or monkeypatch.setattr) before generating.
+
+# --- Scene Configuration ---
+CANVAS_BOUNDS = (0, 0, 100, 100)
+
+# --- Polygon Control ---
+NUM_POLYGONS = 5
+VERTEX_RANGE = (3, 6)
+RADIUS_RANGE = (5, 25)
+CREATE_REGULAR_SHAPES = False
+
+# --- Polygon Relationship Control ---
+NUM_ALIGNED_PAIRS = 0
+NUM_OVERLAPPING_PAIRS = 0
+NUM_CONTAINED_PAIRS = 1
+NUM_TOUCHING_PAIRS = 0
+
+# --- Geometry Relationship Control ---
+LINE_CONTAINMENT_PROBABILITY = 0.1
+POINT_CONTAINMENT_PROBABILITY = 0.1
+LINE_ON_POLYGON_PROBABILITY = 0.1
+POINT_ON_LINE_PROBABILITY = 0.1
+POINT_ON_POLYGON_BORDER_PROBABILITY = 0.1
+LINE_THROUGH_POLYGON_PROBABILITY = 0.1
+LINE_CROSSES_LINE_PROBABILITY = 0.1
+
+# --- Point Control ---
+NUM_POINTS = 10
+
+# --- Line Control ---
+NUM_LINES = 3
+STRAIGHT_LINES_ONLY = False
+LINE_LENGTH_RANGE = (10, 30)
+LINE_SEGMENT_RANGE = (3, 8)
+
+# --- Disjoint Placement Control ---
+MAX_ATTEMPTS_PER_PLACEMENT = 100 # Attempts to find a disjoint spot (ceiling of the adaptive budget)
+ADAPTIVE_PLACEMENT = True        # Size attempt budgets and batches from the observed acceptance rates
+PLACEMENT_CONFIDENCE = 0.95      # The budget finds a spot with this probability at the estimated rate
+PLACEMENT_MIN_ATTEMPTS = 5       # Floor of the adaptive budget
+PLACEMENT_MAX_BATCH = 32         # Most candidates drawn and checked at once
+PLACEMENT_FALLBACK_RATE = 0.05   # Below this acceptance rate, sample centers from the free space
+PLACEMENT_MAX_SHRINKS = 3        # Shrink steps (x0.75) when the free space has no room for an object
+PLACEMENT_RATE_DECAY = 0.9       # Weight of earlier outcomes in the acceptance-rate estimate
+
+# --- Relationship Control ---
+VERIFY_RELATIONSHIPS = False # Recompute all relationships to check the incremental ones
@@ -1,32 +1,333 @@
+import logging
 from typing import List, Union, Tuple, Dict
-from shapely import affinity
-from shapely.geometry import Point, Line, Polygon
+import numpy as np
+import shapely
+from shapely.geometry import Point, LineString as Line, Polygon
+
+logger = logging.getLogger(__name__)
+
+# Rounds of transform + verify; every round only retries the pairs that failed
+MAX_ATTEMPTS_PER_PAIR = 20
+
+# DE-9IM patterns checked on relate(a, b) once b has been moved onto a
+RELATION_PATTERNS = {
+    'touch': 'FF*F0****',    # boundaries meet in a single point
+    'border': 'F***1****',   # boundaries share a line, interiors apart
+    'overlap': 'T*T***T**',
+    'within': 'T*****FF*',   # a contains b
+}
+# Largest scale-up of b in a 'border' pair (4x its area), to reach the
+# length of a's edge; b is never scaled down
+BORDER_MAX_SCALE = 2.0
+
+# cross is checked on relate(b, a), b being the line
+CROSS_PATTERNS = {
+    'Polygon': 'T*T******',
+    'LineString': '0********',
+}
+
+def _packed_coords(geoms:np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Coordinates of all geometries as one complex array.
+
+    Returns:
+        tuple: (z, geom_idx, starts) with starts[i] the first row of geometry i
+    """
+    coords, geom_idx = shapely.get_coordinates(geoms, return_index=True)
+    counts = np.bincount(geom_idx, minlength=len(geoms))
+    return coords[:, 0] + 1j * coords[:, 1], geom_idx, np.cumsum(counts) - counts
+
+def _set_packed_coords(geoms:np.ndarray, z:np.ndarray) -> np.ndarray:
+    return shapely.set_coordinates(np.array(geoms, dtype=object), np.column_stack([z.real, z.imag]))
+
+def _group_pick(values:np.ndarray, group_idx:np.ndarray, num_groups:int) -> np.ndarray:
+    """Row of the largest value of every group (-1 for empty groups)."""
+    order = np.lexsort((values, group_idx))
+    last = np.searchsorted(group_idx[order], np.arange(num_groups), side='right') - 1
+    picked = np.where(last >= 0, order[np.maximum(last, 0)], -1)
+    has_rows = np.bincount(group_idx, minlength=num_groups) > 0
+    return np.where(has_rows, picked, -1)
+
+def _random_units(n:int, rng:np.random.Generator) -> np.ndarray:
+    return np.exp(1j * rng.uniform(0, 2 * np.pi, n))
+
+def _ring_vertices(polygons:np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Packed exterior-ring vertices without the closing coordinate: (z, ring_idx, row) with row the packed-coordinate row."""
+    z, geom_idx, starts = _packed_coords(polygons)
+    is_closing = np.zeros(len(z), dtype=bool)
+    is_closing[np.append(starts[1:], len(z)) - 1] = True
+    rows = np.nonzero(~is_closing)[0]
+    return z[rows], geom_idx[rows], rows
+
+def _supporting_edges(z:np.ndarray, ring_idx:np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Edges (k, k + 1) of counter-clockwise rings that have every other vertex
+    of their ring strictly on the left, i.e. ring edges lying on the convex hull.
+
+    Returns:
+        tuple: (is_supporting, following) where following[k] is the packed index of vertex k + 1
+    """
+    sizes = np.bincount(ring_idx)
+    starts = np.cumsum(sizes) - sizes
+    position = np.arange(len(z))
+    ring_end = starts[ring_idx] + sizes[ring_idx]
+    following = np.where(position + 1 < ring_end, position + 1, starts[ring_idx])
+
+    # Every edge against every vertex of its ring
+    repeats = sizes[ring_idx]
+    edge = np.repeat(position, repeats)
+    vertex = starts[ring_idx][edge] + (np.arange(repeats.sum()) - np.repeat(np.cumsum(repeats) - repeats, repeats))
+    direction = z[following[edge]] - z[edge]
+    cross = (np.conj(direction) * (z[vertex] - z[edge])).imag
+    tolerance = 1e-9 * np.abs(direction) ** 2
+    is_left = (cross > tolerance) | (vertex == edge) | (vertex == following[edge])
+
+    is_supporting = np.logical_and.reduceat(is_left, np.cumsum(repeats) - repeats)
+    return is_supporting, following
+
+# --- Pair Transforms ---
+#
+# Each transform gets the anchor geometries `a` and the original geometries
+# `b` of all pending pairs and returns every b moved (rotated, scaled,
+# translated) onto its a with one packed-coordinate update ('border' may add
+# one vertex to b, and then rebuilds the polygons in one call). Random
+# choices differ between calls, so a retry is a fresh attempt, not a repeat.
+
+def _touch(a:np.ndarray, b:np.ndarray, rng:np.random.Generator) -> np.ndarray:
+    """Meet in one vertex: a's extreme vertex along a random direction, b's extreme vertex against it."""
+    direction = _random_units(len(a), rng)
+    b = _set_packed_coords(b, _packed_coords(b)[0] * np.repeat(_random_units(len(b), rng), shapely.get_num_coordinates(b)))
+
+    za, ring_a, _ = _ring_vertices(a)
+    zb, ring_b, rows_b = _ring_vertices(b)
+    tip_a = _group_pick((za * np.conj(direction[ring_a])).real, ring_a, len(a))
+    tip_b = _group_pick(-(zb * np.conj(direction[ring_b])).real, ring_b, len(b))
+
+    z, geom_idx, starts = _packed_coords(b)
+    z = z + (za[tip_a] - zb[tip_b])[geom_idx]
+    # The touching vertex is copied exactly, ring closure included
+    _copy_vertex(z, rows_b[tip_b], starts, shapely.get_num_coordinates(b), za[tip_a])
+    return _set_packed_coords(b, z)
+
+def _border(a:np.ndarray, b:np.ndarray, rng:np.random.Generator) -> np.ndarray:
+    """
+    Share one full edge of a: put a hull edge of b on a hull edge of a, b on
+    the far side. b is only rotated and translated when its edge is at least
+    as long as a's (a's far vertex is then added to b's edge, which runs on
+    past it); a shorter edge is scaled up to a's length, by at most
+    BORDER_MAX_SCALE. A pair without a fitting edge of b fails the
+    round and gets another edge of a on retry.
+    """
+    a = shapely.orient_polygons(a)
+    b = shapely.orient_polygons(b)
+    za, ring_a, _ = _ring_vertices(a)
+    zb, ring_b, rows_b = _ring_vertices(b)
+    support_a, next_a = _supporting_edges(za, ring_a)
+    support_b, next_b = _supporting_edges(zb, ring_b)
+
+    # A random supporting edge of every a ...
+    edge_a = _group_pick(np.where(support_a, rng.random(len(za)), -1), ring_a, len(a))
+    has_edges = (edge_a >= 0) & support_a[edge_a]
+    edge_a = np.where(has_edges, edge_a, 0)
+    p, q = za[edge_a], za[next_a[edge_a]]
+
+    # ... and a random supporting edge of b that reaches a's length scaled by at most BORDER_MAX_SCALE
+    scale = np.maximum(np.abs(p - q)[ring_b] / np.abs(zb[next_b] - zb), 1)
+    fits = support_b & (scale <= BORDER_MAX_SCALE)
+    edge_b = _group_pick(np.where(fits, rng.random(len(zb)), -1), ring_b, len(b))
+    has_edges &= (edge_b >= 0) & fits[edge_b]
+    edge_b = np.where(has_edges, edge_b, 0)
+
+    # b's edge r -> s runs from a's q along q -> p, so b ends up right of p -> q, away from a
+    r, s = zb[edge_b], zb[next_b[edge_b]]
+    direction = (p - q) / np.abs(p - q) / ((s - r) / np.abs(s - r))
+    factor = np.where(has_edges, direction * scale[edge_b], 1)
+    offset = np.where(has_edges, q - r * factor, 0)
+    runs_past = has_edges & (np.abs(s - r) > np.abs(p - q))
+
+    z, geom_idx, starts = _packed_coords(b)
+    z = z * factor[geom_idx] + offset[geom_idx]
+    num_coords = shapely.get_num_coordinates(b)
+    ends = has_edges & ~runs_past
+    _copy_vertex(z, rows_b[edge_b][has_edges], starts[has_edges], num_coords[has_edges], q[has_edges])
+    _copy_vertex(z, rows_b[next_b[edge_b]][ends], starts[ends], num_coords[ends], p[ends])
+    if not runs_past.any():
+        return _set_packed_coords(b, z)
+
+    # p becomes a vertex of b, right after r (the row after r's is s or the closing coordinate)
+    at = rows_b[edge_b][runs_past] + 1
+    z = np.insert(z, at, p[runs_past])
+    geom_idx = np.insert(geom_idx, at, np.nonzero(runs_past)[0])
+    return shapely.polygons(shapely.linearrings(np.column_stack([z.real, z.imag]), indices=geom_idx))
+
+def _copy_vertex(z:np.ndarray, rows:np.ndarray, starts:np.ndarray, num_coords:np.ndarray, values:np.ndarray) -> None:
+    """Set ring vertices exactly, repeating the value on the closing coordinate of vertex 0."""
+    z[rows] = values
+    is_first = rows == starts
+    z[(starts + num_coords - 1)[is_first]] = values[is_first]
+
+def _overlap(a:np.ndarray, b:np.ndarray, rng:np.random.Generator) -> np.ndarray:
+    """Put an interior point of b on a vertex of a, with b scaled below a's size."""
+    za, ring_a, _ = _ring_vertices(a)
+    vertex_a = _group_pick(rng.random(len(za)), ring_a, len(a))
+
+    center_b = _complex(shapely.point_on_surface(b))
+    scale = rng.uniform(0.4, 0.8, len(a)) * _radius(a, _complex(shapely.centroid(a))) / _radius(b, center_b)
+    return _similarity(b, center_b, scale * _random_units(len(b), rng), za[vertex_a])
+
+def _within(a:np.ndarray, b:np.ndarray, rng:np.random.Generator) -> np.ndarray:
+    """Shrink b into the largest circle inscribed in a."""
+    circle = shapely.maximum_inscribed_circle(a)
+    center_a = _complex(shapely.get_point(circle, 0))
+    center_b = _complex(shapely.centroid(b))
+    scale = rng.uniform(0.5, 0.9, len(a)) * shapely.length(circle) / _radius(b, center_b)
+    return _similarity(b, center_b, scale * _random_units(len(b), rng), center_a)
+
+def _cross(a:np.ndarray, b:np.ndarray, rng:np.random.Generator) -> np.ndarray:
+    """
+    Run line b through a: its midpoint goes to an interior point of a polygon
+    (with both ends scaled out of a's reach) or to the midpoint of a line.
+    """
+    if not (shapely.get_type_id(b) == 1).all():
+        raise ValueError("'cross' pairs need a LineString as their second geometry.")
+
+    mid_b = _complex(shapely.line_interpolate_point(b, 0.5, normalized=True))
+    end_reach = np.minimum(np.abs(_complex(shapely.get_point(b, 0)) - mid_b), np.abs(_complex(shapely.get_point(b, -1)) - mid_b))
+
+    is_polygon = shapely.get_type_id(a) == 3
+    target = np.zeros(len(a), dtype=complex)
+    target[~is_polygon] = _complex(shapely.line_interpolate_point(a[~is_polygon], 0.5, normalized=True))
+    scale = np.ones(len(a))
+    if is_polygon.any():
+        target[is_polygon] = _complex(shapely.point_on_surface(a[is_polygon]))
+        reach = _radius(a[is_polygon], target[is_polygon])
+        scale[is_polygon] = rng.uniform(1.1, 1.5, is_polygon.sum()) * reach / np.maximum(end_reach[is_polygon], 1e-12)
+    return _similarity(b, mid_b, scale * _random_units(len(b), rng), target)
+
+def _complex(points:np.ndarray) -> np.ndarray:
+    coords = shapely.get_coordinates(points)
+    return coords[:, 0] + 1j * coords[:, 1]
+
+def _radius(geoms:np.ndarray, centers:np.ndarray) -> np.ndarray:
+    """Largest distance from every center to a vertex of its geometry."""
+    z, geom_idx, _ = _packed_coords(geoms)
+    radius = np.zeros(len(geoms))
+    np.maximum.at(radius, geom_idx, np.abs(z - centers[geom_idx]))
+    return radius
+
+def _similarity(geoms:np.ndarray, origins:np.ndarray, factors:np.ndarray, targets:np.ndarray) -> np.ndarray:
+    """Apply z -> (z - origin) * factor + target to every geometry."""
+    z, geom_idx, _ = _packed_coords(geoms)
+    return _set_packed_coords(geoms, (z - origins[geom_idx]) * factors[geom_idx] + targets[geom_idx])
+
+PAIR_TRANSFORMS = {
+    'touch': _touch,
+    'border': _border,
+    'overlap': _overlap,
+    'within': _within,
+    'cross': _cross,
+}
+
+def verify_pairs(a:np.ndarray, b:np.ndarray, relation:str) -> np.ndarray:
+    """
+    Check a relation on many pairs at once with vectorized relate_pattern.
+
+    Args:
+        a (np.ndarray): First geometry of every pair
+        b (np.ndarray): Second geometry of every pair
+        relation (str): 'touch', 'border', 'overlap', 'within' (b within a) or 'cross' (b crosses a)
+
+    Returns:
+        np.ndarray: Boolean per pair
+    """
+    if relation == 'cross':
+        is_polygon = shapely.get_type_id(a) == 3
+        return np.where(
+            is_polygon,
+            shapely.relate_pattern(b, a, CROSS_PATTERNS['Polygon']),
+            shapely.relate_pattern(b, a, CROSS_PATTERNS['LineString']),
+        ) & shapely.is_valid(b)
+    return shapely.relate_pattern(a, b, RELATION_PATTERNS[relation]) & shapely.is_valid(b)
+
+def force_pairs(geoms:List[Union[Point, Line, Polygon]],
+                plan:np.ndarray,
+                relation:str,
+                max_attempts:int=MAX_ATTEMPTS_PER_PAIR,
+                rng:np.random.Generator=None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Force one relation onto many pairs of geometries in bulk.
+
+    The second geometry of every pair is moved onto the first one; all
+    pending pairs are transformed together, verified with vectorized
+    predicates, and only the failed ones are retried. Pairs are not kept
+    apart from each other (that is left to the placement step).
+
+    Args:
+        geoms (list): Geometries
+        plan (np.ndarray): (n, 2) indices into geoms; (a, b) moves b, no index may repeat
+        relation (str): 'touch', 'border', 'overlap', 'within' or 'cross'
+        max_attempts (int): Transform + verify rounds before a pair is given up
+        rng (np.random.Generator): Random generator
+
+    Returns:
+        tuple: (geoms, forced), a new geometry array and a boolean per pair;
+            pairs that could not be forced keep their original geometries
+    """
+    if relation not in PAIR_TRANSFORMS:
+        raise ValueError(f"Unknown relation '{relation}' (expected one of {list(PAIR_TRANSFORMS)}).")
+    plan = np.asarray(plan, dtype=int).reshape(-1, 2)
+    if len(np.unique(plan)) < plan.size:
+        raise ValueError("A geometry can only be part of one pair.")
+
+    rng = rng or np.random.default_rng()
+    geoms = np.array(geoms, dtype=object)
+    originals = geoms[plan[:, 1]]
+    forced = np.zeros(len(plan), dtype=bool)
+    pending = np.arange(len(plan))
+
+    for _ in range(max_attempts):
+        if pending.size == 0:
+            break
+        anchors = geoms[plan[pending, 0]]
+        moved = PAIR_TRANSFORMS[relation](anchors, originals[pending], rng)
+        passed = verify_pairs(anchors, moved, relation)
+        geoms[plan[pending[passed], 1]] = moved[passed]
+        forced[pending[passed]] = True
+        pending = pending[~passed]
+
+    return geoms, forced
 
 def topo_pairs(polygons: List[Union[Point, Line, Polygon]],
                relation:str,
                grp_details:int) -> List[Union[Point, Line, Polygon]]:
-    
-    if relation == 'touch':
-        return 0
-    
-    elif relation == 'border':
-        return 0
-
-    elif relation == 'overlap':
-        return 0
-    
-    elif relation == 'within':
-        return 0
-    return 0
+    """
+    Force `relation` onto the first `grp_details` consecutive pairs
+    (0, 1), (2, 3), ... of the geometries.
+
+    Args:
+        polygons (list): Geometries, paired in order
+        relation (str): 'touch', 'border', 'overlap', 'within' or 'cross'
+        grp_details (int): Number of pairs
+
+    Returns:
+        list: The geometries with every second member of a pair moved
+    """
+    if 2 * grp_details > len(polygons):
+        raise ValueError(f"{grp_details} '{relation}' pairs need {2 * grp_details} geometries, got {len(polygons)}.")
+
+    plan = np.arange(2 * grp_details).reshape(-1, 2)
+    geoms, forced = force_pairs(polygons, plan, relation)
+    if not forced.all():
+        logger.warning("Could not force '%s' on %d of %d pairs", relation, (~forced).sum(), len(plan))
+    return list(geoms)
 
 def create_touching_pairs(polygons, num_pairs):
     """
     Args:
-        polygons (list): 
-        num_pairs (int):
+        polygons (list): Polygons, paired in order
+        num_pairs (int): Number of pairs meeting in a single vertex
     """
-
-    return 0
+    return topo_pairs(polygons, 'touch', num_pairs)
 
 def create_bordering_pairs(polygons: List[tuple]):
     """
@@ -34,50 +335,37 @@ def create_bordering_pairs(polygons: List[tuple]):
     Shared region is always a line
 
     Args:
-        polygons (list): 
+        polygons (list): (polygon_a, polygon_b) tuples; polygon_b is moved
 
     Return:
-        polygons (list):
+        polygons (list): The tuples with polygon_b sharing an edge with polygon_a
     """
     if not polygons:
         return polygons
 
-    MAX_ATTEMPTS_PER_PAIR = 20
-
-    for t in polygons:
-        pair_bordering = False
-
-        for _ in range(MAX_ATTEMPTS_PER_PAIR):
-            poly_a = t[0]
-            poly_b = t[1]
-            
-        return 0
-
-    return 0
+    flat = topo_pairs([poly for pair in polygons for poly in pair], 'border', len(polygons))
+    return list(zip(flat[0::2], flat[1::2]))
 
 def create_overlapping_pairs(polygons, num_pairs):
     """
     Args:
-        polygons (list): 
-        num_pairs (int):
+        polygons (list): Polygons, paired in order
+        num_pairs (int): Number of overlapping pairs
     """
-
-    return 0
+    return topo_pairs(polygons, 'overlap', num_pairs)
 
 def create_within_pairs(polygons, num_pairs):
     """
     Args:
-        polygons (list): 
-        num_pairs (int):
+        polygons (list): Polygons, paired in order
+        num_pairs (int): Number of pairs whose second polygon lies within the first
     """
-
-    return 0
+    return topo_pairs(polygons, 'within', num_pairs)
 
 def create_crossing_pairs(polygons, num_pairs):
     """
     Args:
-        polygons (list): 
-        num_pairs (int):
+        polygons (list): (polygon or line, line) geometries, paired in order
+        num_pairs (int): Number of pairs whose line crosses the first geometry
     """
-
-    return 0
\ No newline at end of file
+    return topo_pairs(polygons, 'cross', num_pairs)
@@ -0,0 +1,162 @@
+from collections import defaultdict
+from typing import List, Optional, Tuple
+
+import numpy as np
+import shapely
+
+from faron.stats import count
+
+# --- Prepared Geometry Helpers ---
+#
+# GridIndex, the pair separation and the footprint checks of generate_scene
+# test many candidates against the same container. Preparing the container
+# builds GEOS' internal index once and makes every later predicate on it
+# cheaper. Shapely 2 geometries are immutable and store the prepared state
+# on the object itself, so the "cache" is keyed by object identity for
+# free: moving a polygon creates a new object, which simply starts out
+# unprepared.
+
+def prepare_geometry(geom:shapely.Geometry) -> shapely.Geometry:
+    """Prepares a geometry in place (once) and returns it."""
+    if not shapely.is_prepared(geom):
+        shapely.prepare(geom)
+    return geom
+
+# --- Spatial Grid Index ---
+
+class GridIndex:
+    """
+    Uniform grid over the canvas that, unlike shapely's STRtree, accepts
+    geometries one at a time while a scene is being placed.
+    """
+    def __init__(self, canvas_bounds:Tuple[float], cell_size:float) -> None:
+        self.min_x, self.min_y = canvas_bounds[0], canvas_bounds[1]
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+        self.geoms = []
+        self.names = []
+
+    def _cells(self, bounds:Tuple[float]) -> List[Tuple[int, int]]:
+        min_x, min_y, max_x, max_y = bounds
+        i0, i1 = int((min_x - self.min_x) // self.cell_size), int((max_x - self.min_x) // self.cell_size)
+        j0, j1 = int((min_y - self.min_y) // self.cell_size), int((max_y - self.min_y) // self.cell_size)
+        return [(i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1)]
+
+    def insert(self, geom:shapely.Geometry, name:Optional[str]=None) -> int:
+        """Adds a geometry (prepared for later queries) and returns its index."""
+        idx = len(self.geoms)
+        self.geoms.append(prepare_geometry(geom))
+        self.names.append(name)
+        for cell in self._cells(geom.bounds):
+            self.cells[cell].append(idx)
+        return idx
+
+    def query(self, geom:shapely.Geometry) -> List[int]:
+        """Indices of the geometries sharing a grid cell with geom's bbox."""
+        found = set()
+        for cell in self._cells(geom.bounds):
+            found.update(self.cells.get(cell, ()))
+        return sorted(found)
+
+    def free_mask(self, candidates:np.ndarray) -> np.ndarray:
+        """True for the candidates that intersect no indexed geometry, checked in one vectorized call."""
+        candidates = np.asarray(candidates, dtype=object)
+        pairs = [(k, idx) for k, geom in enumerate(candidates) for idx in self.query(geom)]
+        free = np.ones(len(candidates), dtype=bool)
+        if pairs:
+            cand_idx, geom_idx = np.array(pairs).T
+            count("geos_calls", len(pairs), op="intersects")
+            hits = shapely.intersects(np.asarray(self.geoms, dtype=object)[geom_idx], candidates[cand_idx])
+            free[cand_idx[hits]] = False
+        return free
+
+    def intersecting(self, geom:shapely.Geometry) -> List[int]:
+        """Indices of the geometries that actually intersect geom."""
+        candidates = self.query(geom)
+        count("geos_calls", len(candidates), op="intersects")
+        return [idx for idx in candidates if self.geoms[idx].intersects(geom)]
+
+# --- Batched Affine Transforms ---
+#
+# Applies one similarity transform per geometry to a whole array of
+# geometries with a single shapely.transform call: the coordinates of all
+# geometries arrive as one packed (N, 2) array and the per-geometry
+# parameters are repeated over each geometry's coordinate count.
+
+def transform_batch(geoms:np.ndarray,
+                    offsets:Optional[np.ndarray]=None,
+                    scales:Optional[np.ndarray]=None,
+                    angles:Optional[np.ndarray]=None,
+                    origins:Optional[np.ndarray]=None) -> np.ndarray:
+    """
+    Computes x' = R(angle) * scale * (x - origin) + origin + offset for every geometry.
+
+    Args:
+        geoms (array): Shapely geometries to transform
+        offsets (array): (n, 2) translations (default: none)
+        scales (array): (n,) uniform scale factors (default: 1)
+        angles (array): (n,) counter-clockwise rotations in radians (default: 0)
+        origins (array): (n, 2) scale/rotation origins (default: (0, 0))
+
+    Returns:
+        np.ndarray: The transformed geometries
+    """
+    geoms = np.asarray(geoms, dtype=object)
+    n = len(geoms)
+    offsets = np.zeros((n, 2)) if offsets is None else np.asarray(offsets, dtype=float)
+    scales = np.ones(n) if scales is None else np.asarray(scales, dtype=float)
+    angles = np.zeros(n) if angles is None else np.asarray(angles, dtype=float)
+    origins = np.zeros((n, 2)) if origins is None else np.asarray(origins, dtype=float)
+    if n == 0:
+        return geoms
+
+    counts = shapely.get_num_coordinates(geoms)
+    cos = np.repeat(np.cos(angles) * scales, counts)
+    sin = np.repeat(np.sin(angles) * scales, counts)
+    origin = np.repeat(origins, counts, axis=0)
+    offset = np.repeat(offsets, counts, axis=0)
+
+    def apply(coords):
+        local = coords - origin
+        rotated = np.column_stack([
+            cos * local[:, 0] - sin * local[:, 1],
+            sin * local[:, 0] + cos * local[:, 1],
+        ])
+        return rotated + origin + offset
+
+    return shapely.transform(geoms, apply)
+
+def _bounds_centers(bounds:np.ndarray) -> np.ndarray:
+    """Centers of (n, 4) bounds, i.e. affinity's origin='center'."""
+    return np.column_stack([(bounds[:, 0] + bounds[:, 2]) / 2, (bounds[:, 1] + bounds[:, 3]) / 2])
+
+def _fit_scales(container_bounds:np.ndarray, geom_bounds:np.ndarray, fraction:float) -> np.ndarray:
+    """Scale factors that fit each geometry's bbox into `fraction` of its container's bbox."""
+    c_width = container_bounds[:, 2] - container_bounds[:, 0]
+    c_height = container_bounds[:, 3] - container_bounds[:, 1]
+    m_width = geom_bounds[:, 2] - geom_bounds[:, 0]
+    m_height = geom_bounds[:, 3] - geom_bounds[:, 1]
+    m_width = np.where(m_width > 1e-6, m_width, 1.0)
+    m_height = np.where(m_height > 1e-6, m_height, 1.0)
+    return np.minimum((c_width / m_width) * fraction, (c_height / m_height) * fraction)
+
+def fit_into_containers(containers:np.ndarray, geoms:np.ndarray, fraction:float) -> np.ndarray:
+    """
+    Scales every geometry to `fraction` of its container's bbox and moves its
+    centroid onto the container's representative point, all in one transform.
+    """
+    containers = np.asarray(containers, dtype=object)
+    geoms = np.asarray(geoms, dtype=object)
+    if len(geoms) == 0:
+        return geoms
+
+    geom_bounds = shapely.bounds(geoms)
+    scales = _fit_scales(shapely.bounds(containers), geom_bounds, fraction)
+    centers = _bounds_centers(geom_bounds)
+
+    # Scaling about the bbox center maps the centroid c to center + s * (c - center)
+    centroids = shapely.get_coordinates(shapely.centroid(geoms))
+    scaled_centroids = centers + scales[:, np.newaxis] * (centroids - centers)
+    targets = shapely.get_coordinates(shapely.point_on_surface(containers))
+
+    return transform_batch(geoms, offsets=targets - scaled_centroids, scales=scales, origins=centers)
@@ -0,0 +1,230 @@
+import random
+
+import numpy as np
+import shapely
+from shapely import affinity
+from shapely.geometry import LineString
+from shapely.ops import unary_union
+
+from faron.stats import count, count_placement
+from . import _config as config
+from ._force_topo import force_pairs
+from ._geometry import fit_into_containers, transform_batch
+from ._pairs import engine_rng
+from ._placement import PlacementBudget, sample_region
+
+# --- Geometry Relationship Functions ---
+
+def move_line_into_poly(container_poly, line_to_move):
+    """Scales and moves a line to be inside a polygon."""
+    return move_lines_into_polys([container_poly], [line_to_move])[0]
+
+def move_lines_into_polys(container_polys, lines_to_move):
+    """Scales and moves every line to be inside its polygon, in one batch."""
+    return fit_into_containers(container_polys, lines_to_move, 0.5)
+
+def move_point_into_poly(container_poly, point_to_move):
+    """Moves a point to be inside a polygon."""
+    return move_points_into_polys([container_poly], [point_to_move])[0]
+
+def move_points_into_polys(container_polys, points_to_move):
+    """Moves every point to be inside its polygon, in one batch."""
+    points_to_move = np.asarray(points_to_move, dtype=object)
+    if len(points_to_move) == 0:
+        return points_to_move
+    targets = shapely.get_coordinates(shapely.point_on_surface(np.asarray(container_polys, dtype=object)))
+    return transform_batch(points_to_move, offsets=targets - shapely.get_coordinates(points_to_move))
+
+def create_line_on_poly_border(container_poly):
+    """Creates a new line that lies on the polygon's border."""
+    return create_lines_on_poly_borders([container_poly])[0]
+
+def create_lines_on_poly_borders(container_polys):
+    """
+    Creates one line per polygon along a stretch of its exterior ring.
+
+    The lines are made of whole edges only: the start/end distances are
+    drawn as before and snapped to the nearest ring vertices, so a line is a
+    chain of one or more complete edges of the ring (never the whole ring).
+    An end point inside an edge would have to be interpolated, which puts it
+    off the ring by rounding error and makes GEOS see the line entering the
+    polygon; the ring's own vertices keep every line covered by the border.
+
+    All rings are measured and cut in one batch; only the two distances per
+    polygon are drawn one by one, in the order of the scene's random stream.
+    """
+    rings = shapely.get_exterior_ring(np.asarray(container_polys, dtype=object))
+    if len(rings) == 0:
+        return np.empty(0, dtype=object)
+    coords, ring_idx = shapely.get_coordinates(rings, return_index=True)
+    num_coords = np.bincount(ring_idx, minlength=len(rings))
+    first = np.concatenate([[0], np.cumsum(num_coords)[:-1]])
+    num_edges = num_coords - 1  # The last coordinate closes the ring
+
+    # Distance of every vertex along its own ring
+    edge_length = np.hypot(*(coords - np.roll(coords, 1, axis=0)).T)
+    edge_length[first] = 0.0
+    cum_length = np.cumsum(edge_length)
+    cum_length -= cum_length[first][ring_idx]
+    length = cum_length[first + num_edges]
+
+    start_dist = np.empty(len(rings))
+    end_dist = np.empty(len(rings))
+    for i, ring_length in enumerate(length):
+        start_dist[i] = random.uniform(0, ring_length * 0.8)
+        end_dist[i] = random.uniform(start_dist[i] + (ring_length * 0.1), ring_length)
+
+    # Offsetting each ring by more than the longest one makes the distances
+    # increase across all rings, so one searchsorted finds every vertex
+    ring_offset = np.arange(len(rings)) * (length.max() + 1.0)
+    keys = cum_length + ring_offset[ring_idx]
+
+    def nearest_vertex(dist):
+        query = dist + ring_offset
+        after = np.searchsorted(keys, query)
+        before = np.maximum(after - 1, first)
+        after = np.minimum(after, first + num_edges)
+        nearest = np.where(query - keys[before] <= keys[after] - query, before, after)
+        return nearest - first
+
+    start_idx = np.minimum(nearest_vertex(start_dist), num_edges - 1)
+    end_idx = nearest_vertex(end_dist)
+
+    # At least one edge, and never the whole (closed) ring
+    end_idx = np.minimum(np.maximum(end_idx, start_idx + 1), num_edges)
+    end_idx -= (start_idx == 0) & (end_idx == num_edges)
+
+    chain_length = end_idx - start_idx + 1
+    line_index = np.repeat(np.arange(len(rings)), chain_length)
+    chain_start = np.concatenate([[0], np.cumsum(chain_length)[:-1]])
+    positions = (first + start_idx)[line_index] + np.arange(len(line_index)) - chain_start[line_index]
+    return shapely.linestrings(coords[positions], indices=line_index)
+
+def move_point_onto_line(container_line, point_to_move):
+    """Moves a point to lie on a line."""
+    dist = random.uniform(0, container_line.length)
+    target_point = container_line.interpolate(dist)
+    
+    x_off = target_point.x - point_to_move.x
+    y_off = target_point.y - point_to_move.y
+    return affinity.translate(point_to_move, xoff=x_off, yoff=y_off)
+    
+def move_point_onto_poly_border(container_poly, point_to_move):
+    """Moves a point to lie on a polygon's border."""
+    dist = random.uniform(0, container_poly.boundary.length)
+    target_point = container_poly.boundary.interpolate(dist)
+    
+    x_off = target_point.x - point_to_move.x
+    y_off = target_point.y - point_to_move.y
+    return affinity.translate(point_to_move, xoff=x_off, yoff=y_off)
+    
+def create_line_through_poly(container_poly):
+    """Creates a new line that crosses through a polygon."""
+    boundary = container_poly.boundary
+    
+    # Pick two random points on the boundary
+    p1 = boundary.interpolate(random.uniform(0, boundary.length))
+    p2 = boundary.interpolate(random.uniform(0, boundary.length))
+    
+    # To ensure it's a 'through' line, extend it past the boundary
+    # Calculate vector from p1 to p2 and extend it
+    dx = p2.x - p1.x
+    dy = p2.y - p1.y
+    
+    # Create start point by going "backwards" from p1
+    start_x = p1.x - dx * 0.5
+    start_y = p1.y - dy * 0.5
+    
+    # Create end point by going "forwards" from p2
+    end_x = p2.x + dx * 0.5
+    end_y = p2.y + dy * 0.5
+    
+    return LineString([(start_x, start_y), (end_x, end_y)])
+
+def create_crossing_lines(line_a, line_b):
+    """Takes two lines and moves/rotates B to cross A."""
+    geoms, _ = force_pairs([line_a, line_b], [(0, 1)], "cross", rng=engine_rng())
+    return line_a, geoms[1]
+
+# --- Vectorized Point Classification ---
+
+def classify_points(points, polygons):
+    """
+    Classifies every point against every polygon in a single batch of
+    vectorized predicates. Returns an (n_points, n_polygons) array of
+    'within' / 'touches' / 'disjoint' labels.
+    """
+    points = np.asarray(points, dtype=object)
+    polygons = np.asarray(polygons, dtype=object)
+    if points.size == 0 or polygons.size == 0:
+        return np.full((points.size, polygons.size), "disjoint")
+
+    shapely.prepare(polygons)
+    count("geos_calls", 2 * points.size * polygons.size, op="point_polygon")
+    # For a point, "within" means it lies in the polygon's interior
+    inside = shapely.contains_properly(polygons[np.newaxis, :], points[:, np.newaxis])
+    hits = shapely.intersects(polygons[np.newaxis, :], points[:, np.newaxis])
+
+    labels = np.full(inside.shape, "disjoint", dtype="<U8")
+    labels[hits] = "touches"
+    labels[inside] = "within"
+    return labels
+
+def place_free_points(num_points, placed_geometries, canvas_bounds, max_attempts, placement=None):
+    """
+    Places `num_points` points disjoint from all placed geometries. Each round
+    draws one candidate per still-missing point and checks the whole batch
+    with one spatial index query, so every point gets `max_attempts` tries.
+
+    With ADAPTIVE_PLACEMENT the rounds follow the "free_point" budget, and
+    once its acceptance rate is too low (or the rounds run out) the missing
+    points are drawn from the free space itself. `placement` (a
+    ScenePlacement) receives the outcome for the scene's metadata.
+    """
+    min_x, min_y, max_x, max_y = canvas_bounds
+    rng = np.random.default_rng(random.getrandbits(64))
+    tree = shapely.STRtree(placed_geometries)
+    budget = placement.budgets["free_point"] if placement is not None else PlacementBudget()
+    placed_points = []
+    attempts = 0
+
+    for _ in range(min(max_attempts, budget.max_attempts())):
+        remaining = num_points - len(placed_points)
+        if remaining == 0 or budget.use_free_space():
+            break
+        candidates = shapely.points(
+            rng.uniform(min_x, max_x, remaining),
+            rng.uniform(min_y, max_y, remaining),
+        )
+        hit_idx, _ = tree.query(candidates, predicate="intersects")
+        is_free = np.ones(remaining, dtype=bool)
+        is_free[hit_idx] = False
+        placed_points.extend(candidates[is_free])
+        attempts += remaining
+        budget.record(remaining, int(is_free.sum()))
+
+    num_sampled = len(placed_points)
+    if config.ADAPTIVE_PLACEMENT and num_sampled < num_points:
+        # A point has no extent, so its free space is the canvas minus the placed areas
+        region = shapely.box(*canvas_bounds).difference(unary_union(placed_geometries))
+        for _ in range(config.PLACEMENT_MAX_SHRINKS + 1):
+            remaining = num_points - len(placed_points)
+            coords = sample_region(region, remaining, rng) if remaining else None
+            if coords is None:
+                break
+            candidates = shapely.points(coords)
+            # Landing on a line or an outline has probability zero, but is still checked
+            is_free = np.ones(remaining, dtype=bool)
+            is_free[tree.query(candidates, predicate="intersects")[0]] = False
+            placed_points.extend(candidates[is_free])
+
+    count("geos_calls", attempts, op="strtree_query")
+    count_placement("free_point", attempts, num_sampled, num_sampled)
+    if len(placed_points) > num_sampled:
+        count("placement_fallbacks", len(placed_points) - num_sampled, kind="free_point", mode="free_space")
+    if len(placed_points) < num_points:
+        count("placement_failures", num_points - len(placed_points), kind="free_point")
+    if placement is not None:
+        placement.record_batch("free_point", attempts, len(placed_points), num_points,
+                               free_space=len(placed_points) - num_sampled)
+    return placed_points
@@ -0,0 +1,215 @@
+import random
+import logging
+
+import numpy as np
+import shapely
+from shapely.ops import unary_union
+
+from faron.stats import count, count_placement
+from ._force_topo import force_pairs
+from ._geometry import prepare_geometry, transform_batch
+
+logger = logging.getLogger(__name__)
+
+# --- Polygon Relationship Functions ---
+#
+# Pairs are built by the batched relation-forcing engine of
+# faron.synthetic_polygons: all pairs of one relation are moved in a single
+# packed-coordinate update and verified together, and only the pairs that
+# failed are retried.
+
+def engine_rng():
+    """numpy generator for the forcing engine, drawn from (so seeded with) the random module."""
+    return np.random.default_rng(random.getrandbits(64))
+
+def force_polygon_pairs(polygons, indices_to_use, relation, in_place=False):
+    """
+    Forces `relation` (a faron.synthetic_polygons relation) onto the pairs
+    (indices_to_use[0], indices_to_use[1]), ...: the second polygon of every
+    pair is moved onto the first. Pairs that cannot be forced keep their polygons.
+    """
+    modified_polygons = polygons if in_place else polygons[:]
+    if not indices_to_use:
+        return modified_polygons
+
+    plan = np.reshape(indices_to_use, (-1, 2))
+    geoms, _ = force_pairs(modified_polygons, plan, relation, rng=engine_rng())
+    for idx in plan[:, 1]:
+        modified_polygons[idx] = geoms[idx]
+    return modified_polygons
+
+def _order_pairs_by_area(polygons, indices_to_use, larger_first):
+    """The flat pair index list with the larger (or smaller) polygon of every pair first."""
+    if not indices_to_use:
+        return indices_to_use
+    areas = shapely.area(np.asarray(polygons, dtype=object)[indices_to_use]).reshape(-1, 2)
+    pairs = np.reshape(indices_to_use, (-1, 2))
+    swap = areas[:, 0] < areas[:, 1] if larger_first else areas[:, 0] > areas[:, 1]
+    return np.where(swap[:, np.newaxis], pairs[:, ::-1], pairs).ravel().tolist()
+
+def create_aligned_edges(polygons, indices_to_use, in_place=False):
+    """
+    Adjusts polygons so pairs share a boundary line with no interior overlap.
+    """
+    # The larger polygon is moved onto the smaller one: its edges reach the
+    # smaller one's without being scaled up, so it keeps its size
+    return force_polygon_pairs(polygons, _order_pairs_by_area(polygons, indices_to_use, larger_first=False), "border", in_place)
+
+def create_overlapping_pairs(polygons, indices_to_use, in_place=False):
+    """
+    Adjusts polygons so pairs partially overlap.
+    """
+    return force_polygon_pairs(polygons, indices_to_use, "overlap", in_place)
+
+def create_contained_pairs(polygons, indices_to_use, in_place=False):
+    """
+    Adjusts polygons so one is contained within the other.
+    """
+    # Ensure A is the larger (container) and B is the smaller (contained)
+    return force_polygon_pairs(polygons, _order_pairs_by_area(polygons, indices_to_use, larger_first=True), "within", in_place)
+
+def create_touching_polygons(polygons, indices_to_use, in_place=False):
+    """
+    Adjusts polygons so pairs touch at a single vertex without overlapping.
+    """
+    return force_polygon_pairs(polygons, indices_to_use, "touch", in_place)
+
+# --- Polygon Relationship Planner ---
+#
+# Assigns polygons to the requested pair relations up front, builds every
+# pair on one shared list, moves each finished pair (rigidly, so its relation
+# is kept) away from the pairs built before it, and validates all pairs once.
+
+POLYGON_PAIR_BUILDERS = {
+    "aligned": create_aligned_edges,
+    "overlapping": create_overlapping_pairs,
+    "contained": create_contained_pairs,
+    "touching": create_touching_polygons,
+}
+
+# DE-9IM patterns each pair (A, B) must match after construction
+POLYGON_PAIR_PATTERNS = {
+    "aligned": "F***1****",
+    "overlapping": "T*T***T**",
+    "touching": "F***0****",
+}
+
+def plan_polygon_relations(num_polygons, relation_counts):
+    """
+    Assigns shuffled polygon indices to the requested pair relations.
+
+    Args:
+        num_polygons (int): Number of available polygons
+        relation_counts (dict): Number of pairs per relation in POLYGON_PAIR_BUILDERS
+
+    Returns:
+        dict: relation -> flat [a0, b0, a1, b1, ...] index list
+    """
+    total_polygons_needed = sum(relation_counts.values()) * 2
+    if total_polygons_needed > num_polygons:
+        raise ValueError(f"Not enough valid polygons generated ({num_polygons}) to create all requested pairs ({total_polygons_needed} needed).")
+
+    poly_indices = list(range(num_polygons))
+    random.shuffle(poly_indices)
+
+    plan = {}
+    poly_idx_offset = 0
+    for relation in POLYGON_PAIR_BUILDERS:
+        num_indices = relation_counts.get(relation, 0) * 2
+        plan[relation] = poly_indices[poly_idx_offset : poly_idx_offset + num_indices]
+        poly_idx_offset += num_indices
+    return plan
+
+def validate_polygon_relations(polygons, plan):
+    """Returns relation -> flat index list of the planned pairs that do not hold."""
+    failed = {}
+    for relation, indices in plan.items():
+        if not indices:
+            continue
+        polygon_array = np.asarray(polygons, dtype=object)
+        geoms_a = polygon_array[indices[0::2]]
+        geoms_b = polygon_array[indices[1::2]]
+        if relation == "contained":
+            # The builder may have swapped which polygon is the container
+            holds = shapely.contains(geoms_a, geoms_b) | shapely.contains(geoms_b, geoms_a)
+        else:
+            holds = shapely.relate_pattern(geoms_a, geoms_b, POLYGON_PAIR_PATTERNS[relation])
+        bad = np.nonzero(~holds)[0]
+        if len(bad):
+            failed[relation] = [idx for k in bad for idx in indices[2 * k : 2 * k + 2]]
+    return failed
+
+def _separate_pairs(polygons, plan, canvas_bounds, max_attempts):
+    """
+    Translates each built pair as a unit until it clears all pairs placed
+    before it; a pair the forcing moved (partly) off the canvas is moved
+    back onto it as well.
+    """
+    min_x, min_y, max_x, max_y = canvas_bounds
+    footprint = None
+    checks, separated, num_pairs = 0, 0, 0
+
+    def is_blocked(pair_union):
+        p_minx, p_miny, p_maxx, p_maxy = pair_union.bounds
+        if p_minx < min_x or p_miny < min_y or p_maxx > max_x or p_maxy > max_y:
+            return True
+        return footprint is not None and footprint.intersects(pair_union)
+
+    for relation, indices in plan.items():
+        for i in range(0, len(indices), 2):
+            idx_a, idx_b = indices[i], indices[i+1]
+            pair = [polygons[idx_a], polygons[idx_b]]
+            pair_union = unary_union(pair)
+
+            if footprint is not None:
+                prepare_geometry(footprint)
+
+            attempt = 0
+            while is_blocked(pair_union) and attempt < max_attempts:
+                checks += 1
+                # Random offset that keeps the pair's bbox on the canvas
+                p_minx, p_miny, p_maxx, p_maxy = pair_union.bounds
+                x_off = random.uniform(min_x - p_minx, max(min_x - p_minx, max_x - p_maxx))
+                y_off = random.uniform(min_y - p_miny, max(min_y - p_miny, max_y - p_maxy))
+                pair = list(transform_batch(pair, offsets=[(x_off, y_off)] * 2))
+                pair_union = unary_union(pair)
+                attempt += 1
+
+            if footprint is not None or attempt:
+                checks += 1
+                num_pairs += 1
+                if is_blocked(pair_union):
+                    logger.warning("Could not separate %s pair (%d, %d) from the other pairs.", relation, idx_a, idx_b)
+                else:
+                    separated += 1
+
+            polygons[idx_a], polygons[idx_b] = pair
+            footprint = pair_union if footprint is None else unary_union([footprint, pair_union])
+
+    count_placement("polygon_pair", checks, separated, num_pairs)
+
+def build_polygon_relations(polygons, plan, canvas_bounds, max_attempts):
+    """
+    Builds every planned pair in one pass over a single working copy of
+    `polygons`, then validates the final relations once and rebuilds only
+    the pairs that failed.
+    """
+    modified_polygons = list(polygons)
+    for relation, indices in plan.items():
+        POLYGON_PAIR_BUILDERS[relation](modified_polygons, indices, in_place=True)
+    _separate_pairs(modified_polygons, plan, canvas_bounds, max_attempts)
+
+    failed = validate_polygon_relations(modified_polygons, plan)
+    if failed:
+        # Rebuild with roles swapped, e.g. an overlap fails when B swallows A
+        failed = {
+            relation: [idx for k in range(0, len(indices), 2) for idx in (indices[k+1], indices[k])]
+            for relation, indices in failed.items()
+        }
+        for relation, indices in failed.items():
+            POLYGON_PAIR_BUILDERS[relation](modified_polygons, indices, in_place=True)
+        for relation, indices in validate_polygon_relations(modified_polygons, failed).items():
+            count("relation_failures", len(indices) // 2, relation=relation)
+            logger.warning("%d %s pair(s) do not hold after rebuilding.", len(indices) // 2, relation)
+
+    return modified_polygons
@@ -0,0 +1,222 @@
+import math
+import random
+from collections import Counter, defaultdict
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import shapely
+from shapely.ops import unary_union
+
+from faron.stats import count, count_placement
+from . import _config as config
+from ._geometry import transform_batch
+
+# --- Adaptive Placement ---
+#
+# Disjoint placement is rejection sampling: draw a candidate, keep it if it
+# hits nothing. Each kind of object keeps an online estimate of its
+# acceptance rate p (decayed, so it follows the density of the run) and
+# sizes its work from it: candidates are drawn and checked in batches of
+# about 1/p, the expected number needed for one hit, and the attempt budget
+# is the number that succeeds with PLACEMENT_CONFIDENCE. Once p drops below
+# PLACEMENT_FALLBACK_RATE, rejection sampling is cut to one probe batch
+# (which keeps the estimate current) and the object is placed by sampling
+# its center from the free space instead, shrinking it when even the free
+# space is too tight. What was decided is reported in the scene's metadata.
+# The estimates belong to the caller: a ScenePlacement starts from fresh
+# ones unless it is handed the budgets of earlier scenes (run_pipeline keeps
+# one set per run), so nothing is shared through module state.
+
+class PlacementBudget:
+    """Decayed acceptance-rate estimate of one kind of placement, and the budgets derived from it."""
+    def __init__(self) -> None:
+        # Beta(1, 1) prior: an unseen kind starts at p = 0.5
+        self.accepted = 1.0
+        self.attempts = 2.0
+
+    def rate(self) -> float:
+        return self.accepted / self.attempts
+
+    def record(self, attempts:int, accepted:int) -> None:
+        self.accepted = config.PLACEMENT_RATE_DECAY * self.accepted + accepted
+        self.attempts = config.PLACEMENT_RATE_DECAY * self.attempts + attempts
+
+    def max_attempts(self) -> int:
+        """Attempts that find a spot with PLACEMENT_CONFIDENCE at the estimated rate."""
+        if not config.ADAPTIVE_PLACEMENT:
+            return config.MAX_ATTEMPTS_PER_PLACEMENT
+        p = min(self.rate(), 1 - 1e-9)
+        needed = math.ceil(math.log(1 - config.PLACEMENT_CONFIDENCE) / math.log(1 - p))
+        return int(min(max(needed, config.PLACEMENT_MIN_ATTEMPTS), config.MAX_ATTEMPTS_PER_PLACEMENT))
+
+    def batch_size(self) -> int:
+        """Candidates drawn and checked at once: the expected attempts per hit."""
+        if not config.ADAPTIVE_PLACEMENT:
+            return 1
+        return int(min(max(round(1 / self.rate()), 1), config.PLACEMENT_MAX_BATCH))
+
+    def use_free_space(self) -> bool:
+        return config.ADAPTIVE_PLACEMENT and self.rate() < config.PLACEMENT_FALLBACK_RATE
+
+    def search(self,
+               make_candidates:Callable[[int], np.ndarray],
+               is_free:Callable[[np.ndarray], np.ndarray],
+               max_attempts:int) -> Tuple[Optional[shapely.Geometry], int]:
+        """
+        Rejection sampling in batches. Returns (geometry or None, attempts),
+        counting attempts up to the first free candidate of its batch.
+        """
+        attempts = 0
+        while attempts < max_attempts:
+            candidates = make_candidates(min(self.batch_size(), max_attempts - attempts))
+            if len(candidates) == 0:
+                break
+            free = np.flatnonzero(is_free(candidates))
+            if len(free):
+                attempts += int(free[0]) + 1
+                self.record(attempts, 1)
+                return candidates[free[0]], attempts
+            attempts += len(candidates)
+        self.record(attempts, 0)
+        return None, attempts
+
+def free_space_centers(canvas_bounds:Tuple[float], occupied:Iterable, clearance:float) -> shapely.Geometry:
+    """Region of the centers whose `clearance` disk stays on the canvas and away from `occupied`."""
+    region = shapely.box(*canvas_bounds).buffer(-clearance, join_style="mitre")
+    if len(occupied) and not region.is_empty:
+        region = region.difference(unary_union(occupied).buffer(clearance))
+    return region
+
+def sample_region(region:shapely.Geometry, num_points:int, rng:np.random.Generator) -> Optional[np.ndarray]:
+    """Uniform random points of a (multi)polygon, via its area-weighted triangles (None if it is empty)."""
+    if region.is_empty or region.area <= 0:
+        return None
+    triangles = shapely.get_parts(shapely.constrained_delaunay_triangles(region))
+    areas = shapely.area(triangles)
+    corners = shapely.get_coordinates(triangles).reshape(len(triangles), 4, 2)[:, :3]
+
+    picked = corners[rng.choice(len(triangles), size=num_points, p=areas / areas.sum())]
+    u, v = rng.random((2, num_points))
+    flip = u + v > 1
+    u[flip], v[flip] = 1 - u[flip], 1 - v[flip]
+    return picked[:, 0] + u[:, np.newaxis] * (picked[:, 1] - picked[:, 0]) + v[:, np.newaxis] * (picked[:, 2] - picked[:, 0])
+
+def place_in_free_space(geom:shapely.Geometry,
+                        occupied:Iterable,
+                        canvas_bounds:Tuple[float],
+                        rng:np.random.Generator,
+                        max_shrinks:int) -> Tuple[Optional[shapely.Geometry], int]:
+    """
+    Moves `geom` to a center sampled from the free space, so that the disk
+    around its centroid holding all of it misses every occupied geometry.
+    Shrinks it (x0.75 about its centroid) while no such center exists.
+    Returns (geometry or None, shrink steps).
+    """
+    center = np.asarray(geom.centroid.coords[0])
+    extent = max(np.hypot(*(shapely.get_coordinates(geom) - center).T).max(), 1e-9)
+    # Slightly larger disk, so the placed geometry cannot even touch its neighbours
+    clearance = extent * 1.001
+
+    for shrinks in range(max_shrinks + 1):
+        target = sample_region(free_space_centers(canvas_bounds, occupied, clearance), 1, rng)
+        if target is not None:
+            scale = 0.75 ** shrinks
+            return transform_batch([geom], offsets=[target[0] - center], scales=[scale], origins=[center])[0], shrinks
+        clearance *= 0.75
+    return None, max_shrinks
+
+def candidate_stream(initial:Iterable, make_new:Callable[[int], Iterable]) -> Callable[[int], np.ndarray]:
+    """make_candidates that hands out the already drawn `initial` candidates first, then `make_new(k)` ones."""
+    pending = list(initial)
+
+    def make_candidates(k):
+        head = pending[:k]
+        del pending[:k]
+        return np.asarray(head + list(make_new(k - len(head))), dtype=object)
+    return make_candidates
+
+def placement_budgets() -> Dict[str, PlacementBudget]:
+    """Empty set of placement budgets: kind -> PlacementBudget, created at the prior on first use."""
+    return defaultdict(PlacementBudget)
+
+class ScenePlacement:
+    """Places the objects of one scene and records the decisions."""
+    def __init__(self, canvas_bounds:Tuple[float], budgets:Optional[Dict[str, PlacementBudget]]=None) -> None:
+        """
+        Args:
+            canvas_bounds (tuple): Canvas the scene is placed on
+            budgets (dict): placement_budgets() to start from and update, e.g.
+                those of the earlier scenes of a run (default: fresh ones)
+        """
+        self.canvas_bounds = canvas_bounds
+        self.budgets = placement_budgets() if budgets is None else budgets
+        self.rng = np.random.default_rng(random.getrandbits(64))
+        self.decisions = defaultdict(Counter)
+
+    def place(self,
+              kind:str,
+              make_candidates:Callable[[int], np.ndarray],
+              is_free:Callable[[np.ndarray], np.ndarray],
+              occupied:Callable[[], Iterable]) -> Optional[shapely.Geometry]:
+        """
+        Places one object of `kind`.
+
+        Args:
+            kind (str): Budget key, e.g. "free_polygon"
+            make_candidates (callable): k -> object array of k candidate geometries
+            is_free (callable): Candidate array -> bool array, True where nothing is hit
+            occupied (callable): () -> geometries to avoid, for the free-space fallback
+
+        Returns:
+            The placed geometry, or None
+        """
+        budget = self.budgets[kind]
+        decisions = self.decisions[kind]
+        decisions["objects"] += 1
+
+        # At a low acceptance rate only one probe batch is spent on rejection sampling
+        max_attempts = budget.batch_size() if budget.use_free_space() else budget.max_attempts()
+        geom, attempts = budget.search(make_candidates, is_free, max_attempts)
+        decisions["attempts"] += attempts
+        count_placement(kind, attempts, int(geom is not None), int(geom is not None))
+        if geom is not None:
+            decisions["rejection_sampled"] += 1
+            return geom
+
+        # The generator can come up empty (e.g. when it only drew invalid polygons)
+        candidates = make_candidates(1) if config.ADAPTIVE_PLACEMENT else ()
+        if len(candidates):
+            geom, shrinks = place_in_free_space(candidates[0], occupied(), self.canvas_bounds,
+                                                self.rng, config.PLACEMENT_MAX_SHRINKS)
+            if geom is not None:
+                decisions["free_space"] += 1
+                decisions["shrunk"] += int(shrinks > 0)
+                count("placement_fallbacks", kind=kind, mode="shrink" if shrinks else "free_space")
+                return geom
+
+        decisions["failed"] += 1
+        count("placement_failures", kind=kind)
+        return None
+
+    def record_batch(self, kind:str, attempts:int, placed:int, wanted:int, free_space:int=0) -> None:
+        """Records a batched placement (e.g. place_free_points) that ran outside place()."""
+        decisions = self.decisions[kind]
+        decisions["objects"] += wanted
+        decisions["attempts"] += attempts
+        decisions["rejection_sampled"] += placed - free_space
+        decisions["free_space"] += free_space
+        decisions["failed"] += wanted - placed
+
+    def summary(self) -> Dict[str, Dict]:
+        """Per kind: the counts above plus the rate and budgets the next scene starts from."""
+        summary = {}
+        for kind, decisions in sorted(self.decisions.items()):
+            budget = self.budgets[kind]
+            summary[kind] = {
+                **decisions,
+                "acceptance_rate": round(budget.rate(), 4),
+                "attempt_budget": budget.max_attempts(),
+                "batch_size": budget.batch_size(),
+                "mode": "free_space" if budget.use_free_space() else "rejection",
+            }
+        return summary
@@ -0,0 +1,378 @@
+import os
+import math
+import random
+import functools
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import shapely
+
+from faron.stats import check_memory_budget, count
+from . import _config as config
+from ._geometry import GridIndex
+from ._objects import classify_points
+
+# --- Relationship Finding Function ---
+
+def relate_pair(name_a, geom_a, name_b, geom_b):
+    """Finds the spatial relationships between one pair of named geometries."""
+    count("geos_calls", op="relate_pair")
+    relationships = []
+    type_a = geom_a.geom_type
+    type_b = geom_b.geom_type
+
+    # Use a flag to track if any positive relationship was found
+    found_relationship = False
+
+    # Check for equals first, as it's the simplest
+    if geom_a.equals(geom_b):
+        # relationships.append((name_a, name_b, "equals"))
+        return relationships # Don't check other relationships if they are equal
+
+    # --- WITHIN / CONTAINS ---
+    # (A within B) is same as (B contains A)
+    # We only check valid type combinations
+
+    # Check A within B
+    if (type_a == 'Point' and type_b == 'Polygon') or \
+       (type_a == 'LineString' and type_b == 'Polygon') or \
+       (type_a == 'Polygon' and type_b == 'Polygon'):
+        if geom_a.within(geom_b):
+            relationships.append((name_a, name_b, "within"))
+            relationships.append((name_b, name_a, "contains"))
+            found_relationship = True
+
+    # Check B within A (if not already found)
+    elif (type_b == 'Point' and type_a == 'Polygon') or \
+         (type_b == 'LineString' and type_a == 'Polygon'):
+        if geom_b.within(geom_a):
+            relationships.append((name_b, name_a, "within"))
+            relationships.append((name_a, name_b, "contains"))
+            found_relationship = True
+
+    # --- OVERLAPS ---
+    # Must be same-dimension and > 0 dimension
+    if type_a == type_b and (type_a == 'LineString' or type_a == 'Polygon'):
+        if geom_a.overlaps(geom_b):
+            relationships.append((name_a, name_b, "overlaps"))
+            found_relationship = True
+
+    # --- CROSSES ---
+    # Must be mixed-dimension (Line/Poly) or Line/Line
+    if (type_a == 'LineString' and type_b == 'LineString') or \
+       (type_a == 'LineString' and type_b == 'Polygon') or \
+       (type_a == 'Polygon' and type_b == 'LineString'):
+        if geom_a.crosses(geom_b):
+            relationships.append((name_b, name_a, "cross"))
+            found_relationship = True
+
+    # --- TOUCHES ---
+    # Cannot be Point/Point
+    if not (type_a == 'Point' and type_b == 'Point'):
+        # Get the full relate matrix once
+        relate_matrix = geom_a.relate(geom_b)
+
+        # Check for interior intersection (relate() reports dimensions,
+        # so anything but 'F' means the interiors meet)
+        interiors_intersect = relate_matrix[0] != 'F'
+
+        if not interiors_intersect:
+            # Interiors do not intersect, now check boundary/interior intersections
+            # B(a) intersects B(b)
+            b_int_b = relate_matrix[4] in ('T', '0', '1', '2') 
+
+            # I(a) intersects B(b) (relate matrix [0][1])
+            i_int_b = relate_matrix[1] in ('T', '0', '1', '2')
+
+            # B(a) intersects I(b) (relate matrix [1][0])
+            b_int_i = relate_matrix[3] in ('T', '0', '1', '2')
+
+            if b_int_b or i_int_b or b_int_i:
+                relationships.append((name_a, name_b, "touches"))
+                found_relationship = True
+
+    # If no positive relationship was found, label it as disjoint
+    if not found_relationship:
+        if random.random() < 0.05:
+            relationships.append((name_a, name_b, "disjoint"))
+
+    return relationships
+
+def find_all_relationships(all_named_geoms, tile_size=None, halo=None, workers=None):
+    """
+    Finds all spatial relationships between all generated geometries.
+
+    Passing `tile_size` splits the canvas into tiles that are related in
+    parallel worker processes (see find_all_relationships_tiled), for scenes
+    too large for the pairwise pass below.
+    """
+    if tile_size is not None:
+        return find_all_relationships_tiled(all_named_geoms, tile_size, halo, workers)
+
+    relationships = []
+    geom_items = list(all_named_geoms.items())
+    # Every geometry is the left operand of n-1 predicates below
+    shapely.prepare([geom for _, geom in geom_items])
+
+    # Point x Polygon pairs are by far the most numerous; classify them in one batch
+    point_items = [(name, geom) for name, geom in geom_items if geom.geom_type == 'Point']
+    polygon_items = [(name, geom) for name, geom in geom_items if geom.geom_type == 'Polygon']
+    labels = classify_points([g for _, g in point_items], [g for _, g in polygon_items])
+
+    for i, j in zip(*np.nonzero(labels == "within")):
+        relationships.append((point_items[i][0], polygon_items[j][0], "within"))
+        relationships.append((polygon_items[j][0], point_items[i][0], "contains"))
+    for i, j in zip(*np.nonzero(labels == "touches")):
+        relationships.append((polygon_items[j][0], point_items[i][0], "touches"))
+    sampled_disjoint = (labels == "disjoint") & (np.random.default_rng(random.getrandbits(64)).random(labels.shape) < 0.05)
+    for i, j in zip(*np.nonzero(sampled_disjoint)):
+        relationships.append((polygon_items[j][0], point_items[i][0], "disjoint"))
+    
+    for i in range(len(geom_items)):
+        for j in range(i + 1, len(geom_items)):
+            name_a, geom_a = geom_items[i]
+            name_b, geom_b = geom_items[j]
+
+            # Already handled by the batched point classification
+            if {geom_a.geom_type, geom_b.geom_type} == {'Point', 'Polygon'}:
+                continue
+
+            relationships.extend(relate_pair(name_a, geom_a, name_b, geom_b))
+                
+    return {"relationships": relationships}
+
+# --- Incremental Relationship Tracking ---
+
+class RelationTracker:
+    """
+    Maintains a scene's relationships while it is being placed. Each
+    committed geometry is related only to the grid-index neighbours it
+    actually intersects, since every other pair is disjoint, so no O(n^2)
+    pass over the finished scene is needed.
+    """
+    def __init__(self, canvas_bounds, cell_size):
+        self.index = GridIndex(canvas_bounds, cell_size)
+        self.relationships = []
+        self.intersecting_pairs = set()
+
+    def commit(self, name, geom):
+        """Adds a placed geometry and emits its relations with earlier geometries."""
+        for idx in self.index.intersecting(geom):
+            self.relationships.extend(r for r in relate_pair(self.index.names[idx], self.index.geoms[idx], name, geom) if r[2] != "disjoint")
+            # Also pairs without a relation (e.g. equal geometries): they are still not disjoint
+            self.intersecting_pairs.add((idx, len(self.index.geoms)))
+        self.index.insert(geom, name)
+
+    def finalize(self, disjoint_rate=0.05):
+        """
+        Returns the relationships, plus a `disjoint_rate` sample of the pairs
+        that do not intersect (find_all_relationships' disjoint sampling).
+        """
+        return list(self.relationships) + sample_disjoint_pairs(self.index.names, self.intersecting_pairs, disjoint_rate)
+
+def sample_disjoint_pairs(names, labeled_pairs, disjoint_rate=0.05):
+    """
+    Draws a `disjoint_rate` sample of the pairs of `names` that are not in
+    `labeled_pairs` (as (i, j) with i < j), without enumerating all pairs.
+    """
+    n = len(names)
+    if n < 2:
+        return []
+
+    rng = np.random.default_rng(random.getrandbits(64))
+    num_samples = rng.binomial(n * (n - 1) // 2, disjoint_rate)
+    disjoint = []
+    sampled = set()
+    for i, j in rng.integers(0, n, size=(num_samples, 2)):
+        pair = (min(i, j), max(i, j))
+        if i != j and pair not in labeled_pairs and pair not in sampled:
+            sampled.add(pair)
+            disjoint.append((names[pair[0]], names[pair[1]], "disjoint"))
+    return disjoint
+
+def relation_key(a, b, rel):
+    """(a, b, rel) with a and b sorted for the relations that hold both ways, whose emitted order varies."""
+    return (a, b, rel) if rel in ("within", "contains") else (*sorted((a, b)), rel)
+
+def _normalize_relationships(relationships):
+    """Order-insensitive multiset of the non-disjoint relationships, for comparisons."""
+    return Counter(relation_key(a, b, rel) for a, b, rel in relationships if rel != "disjoint")
+
+def verify_relationships(all_named_geoms, relationships):
+    """Raises AssertionError if incremental relationships differ from a full recomputation."""
+    recomputed = find_all_relationships(all_named_geoms)["relationships"]
+    if _normalize_relationships(relationships) != _normalize_relationships(recomputed):
+        raise AssertionError("Incrementally maintained relationships do not match find_all_relationships.")
+
+# --- Tiled Relationship Extraction ---
+#
+# Relationships of scenes too large for a pairwise pass. Candidate pairs come
+# from an STRtree, their DE-9IM matrices from one batched shapely.relate call
+# per tile, and the relations are read off the matrices with relate_pair's
+# semantics; the canvas is split into tiles that are related independently,
+# in parallel worker processes.
+
+# DE-9IM patterns of the predicates relate_pair evaluates, so that its
+# relations can be read off the matrices of one batched shapely.relate call
+_EQUALS_PATTERN = "T*F**FFF*"
+_WITHIN_PATTERN = "T*F**F***"
+_CONTAINS_PATTERN = "T*****FF*"
+_OVERLAPS_PATTERNS = {"LineString": "1*T***T**", "Polygon": "T*T***T**"}
+_CROSSES_PATTERNS = {
+    ("LineString", "LineString"): "0********",
+    ("LineString", "Polygon"): "T*T******",
+    ("Polygon", "LineString"): "T*****T**",
+}
+_GEOM_TYPE_NAMES = np.array(["Point", "LineString", "LinearRing", "Polygon"], dtype=object)
+
+def _matches_pattern(matrix, pattern):
+    return all(p == "*" or m == p or (p == "T" and m != "F") for m, p in zip(matrix, pattern))
+
+@functools.lru_cache(maxsize=None)
+def relations_from_matrix(type_a, type_b, matrix):
+    """
+    relate_pair's (non-disjoint) relations for a pair with this DE-9IM
+    matrix, as (first, second, relation) triples where 0 is a and 1 is b.
+    There are only a few distinct matrices per scene, so this is cached.
+    """
+    if _matches_pattern(matrix, _EQUALS_PATTERN):
+        return ()
+    relations = []
+    if (type_a, type_b) in (('Point', 'Polygon'), ('LineString', 'Polygon'), ('Polygon', 'Polygon')):
+        if _matches_pattern(matrix, _WITHIN_PATTERN):
+            relations += [(0, 1, "within"), (1, 0, "contains")]
+    elif (type_b, type_a) in (('Point', 'Polygon'), ('LineString', 'Polygon')):
+        if _matches_pattern(matrix, _CONTAINS_PATTERN):
+            relations += [(1, 0, "within"), (0, 1, "contains")]
+    if type_a == type_b and type_a in _OVERLAPS_PATTERNS and _matches_pattern(matrix, _OVERLAPS_PATTERNS[type_a]):
+        relations.append((0, 1, "overlaps"))
+    if (type_a, type_b) in _CROSSES_PATTERNS and _matches_pattern(matrix, _CROSSES_PATTERNS[(type_a, type_b)]):
+        relations.append((1, 0, "cross"))
+    if not (type_a == 'Point' and type_b == 'Point') and matrix[0] == 'F' and \
+       (matrix[1] != 'F' or matrix[3] != 'F' or matrix[4] != 'F'):
+        relations.append((0, 1, "touches"))
+    return tuple(relations)
+
+def relate_pairs(geoms, type_names, left, right):
+    """Relations of the pairs (left[k], right[k]) as (i, j, relation) index triples."""
+    relationships = []
+    count("geos_calls", len(left), op="relate")
+    matrices = shapely.relate(geoms[left], geoms[right])
+    for pair, type_a, type_b, matrix in zip(zip(left, right), type_names[left], type_names[right], matrices):
+        for first, second, relation in relations_from_matrix(type_a, type_b, matrix):
+            relationships.append((int(pair[first]), int(pair[second]), relation))
+    return relationships
+
+def _tile_grid(canvas_bounds, geoms, tile_size):
+    """Tile grid covering the canvas and every geometry: (min_x, min_y, tiles_x, tiles_y, tile_size)."""
+    geom_bounds = shapely.total_bounds(geoms)
+    min_x, min_y = min(canvas_bounds[0], geom_bounds[0]), min(canvas_bounds[1], geom_bounds[1])
+    max_x, max_y = max(canvas_bounds[2], geom_bounds[2]), max(canvas_bounds[3], geom_bounds[3])
+    tiles_x = max(1, math.ceil((max_x - min_x) / tile_size))
+    tiles_y = max(1, math.ceil((max_y - min_y) / tile_size))
+    return (min_x, min_y, tiles_x, tiles_y, tile_size)
+
+def _owner_tiles(grid, x, y):
+    """Tile id of every point (x, y) of the grid."""
+    min_x, min_y, tiles_x, tiles_y, tile_size = grid
+    tile_x = np.floor((x - min_x) / tile_size).astype(int).clip(0, tiles_x - 1)
+    tile_y = np.floor((y - min_y) / tile_size).astype(int).clip(0, tiles_y - 1)
+    return tile_y * tiles_x + tile_x
+
+def relate_tile(tile, geoms, global_idx, grid):
+    """
+    Relations of the pairs owned by `tile`, given only the geometries whose
+    bounding box reaches the tile (plus halo). A pair is owned by the tile
+    holding the lower-left corner of the intersection of its two bounding
+    boxes: that corner lies in both boxes, so the owner always sees both
+    geometries, and every other tile that sees the pair drops it.
+    """
+    type_names = _GEOM_TYPE_NAMES[shapely.get_type_id(geoms)]
+    left, right = shapely.STRtree(geoms).query(geoms, predicate="intersects")
+    keep = left < right
+    left, right = left[keep], right[keep]
+
+    bounds = shapely.bounds(geoms)
+    corner_x = np.maximum(bounds[left, 0], bounds[right, 0])
+    corner_y = np.maximum(bounds[left, 1], bounds[right, 1])
+    owned = _owner_tiles(grid, corner_x, corner_y) == tile
+    return [
+        (int(global_idx[i]), int(global_idx[j]), relation)
+        for i, j, relation in relate_pairs(geoms, type_names, left[owned], right[owned])
+    ]
+
+def _relate_tile_worker(tile, wkb, global_idx, grid):
+    """Runs relate_tile inside a worker process, which only receives the tile's geometries."""
+    return relate_tile(tile, shapely.from_wkb(wkb), global_idx, grid)
+
+def iter_tiled_relationships(geoms, canvas_bounds, tile_size, halo=None, workers=None, ram_budget_mb=None):
+    """
+    Yields the relationships of a scene one tile at a time, as (i, j, relation)
+    index triples into `geoms` with i < j for the pair.
+
+    The canvas is cut into `tile_size` tiles. Each tile is related on its own,
+    from the geometries whose bounding box reaches the tile grown by `halo`
+    (default: a millionth of a tile, which absorbs rounding at tile edges),
+    so a worker's memory follows the tile's density rather than the scene's
+    size. Pairs straddling tiles are kept only by their owner tile (see
+    relate_tile).
+
+    Args:
+        geoms (np.ndarray): Scene geometries
+        canvas_bounds (tuple): Canvas to tile (grown to cover stray geometries)
+        tile_size (float): Tile side in canvas units
+        halo (float): Margin added around every tile when collecting its geometries
+        workers (int): Worker processes (default: CPU count); 1 relates in-process
+        ram_budget_mb (float): Resident-size limit of this process (see check_memory_budget)
+    """
+    geoms = np.asarray(geoms, dtype=object)
+    if len(geoms) < 2:
+        return
+    grid = _tile_grid(canvas_bounds, geoms, tile_size)
+    min_x, min_y, tiles_x, tiles_y, _ = grid
+    halo = tile_size * 1e-6 if halo is None else halo
+    tree = shapely.STRtree(geoms)
+
+    def tile_jobs():
+        for tile in range(tiles_x * tiles_y):
+            x0 = min_x + (tile % tiles_x) * tile_size
+            y0 = min_y + (tile // tiles_x) * tile_size
+            members = np.sort(tree.query(shapely.box(x0 - halo, y0 - halo, x0 + tile_size + halo, y0 + tile_size + halo)))
+            if members.size > 1:
+                yield tile, members
+
+    if workers == 1:
+        for tile, members in tile_jobs():
+            yield relate_tile(tile, geoms[members], members, grid)
+            check_memory_budget(ram_budget_mb, f"relating tile {tile}")
+        return
+
+    # At most two tiles per worker are in flight, so the parent never holds
+    # more than that many tiles' worth of WKB and results
+    max_in_flight = 2 * (workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for tile, members in tile_jobs():
+            pending.append(pool.submit(_relate_tile_worker, tile, shapely.to_wkb(geoms[members]), members, grid))
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+                check_memory_budget(ram_budget_mb, f"relating tile {tile}")
+        while pending:
+            yield pending.popleft().result()
+
+def find_all_relationships_tiled(all_named_geoms, tile_size, halo=None, workers=None, canvas_bounds=None):
+    """
+    find_all_relationships computed per tile (see iter_tiled_relationships),
+    with the same disjoint sampling over the pairs left without a relation.
+    """
+    names = list(all_named_geoms)
+    geoms = np.array(list(all_named_geoms.values()), dtype=object)
+    relationships = []
+    related_pairs = set()
+    for tile_relationships in iter_tiled_relationships(geoms, canvas_bounds or config.CANVAS_BOUNDS, tile_size, halo, workers):
+        for i, j, relation in tile_relationships:
+            relationships.append((names[i], names[j], relation))
+            related_pairs.add((min(i, j), max(i, j)))
+    relationships.extend(sample_disjoint_pairs(names, related_pairs))
+    return {"relationships": relationships}
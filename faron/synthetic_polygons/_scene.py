@@ -0,0 +1,369 @@
+import random
+import logging
+
+import numpy as np
+import shapely
+from shapely.ops import unary_union
+
+from faron.stats import count, stage_timer
+from . import _config as config
+from ._shapes import generate_random_polygons, generate_one_point, generate_one_line
+from ._geometry import prepare_geometry, transform_batch
+from ._placement import ScenePlacement, candidate_stream
+from ._pairs import plan_polygon_relations, build_polygon_relations
+from ._objects import (
+    move_lines_into_polys, move_points_into_polys, create_line_on_poly_border, create_line_through_poly,
+    create_crossing_lines, move_point_onto_line, move_point_onto_poly_border, place_free_points,
+)
+from ._relations import RelationTracker, find_all_relationships, verify_relationships
+from ._questions import generate_spatial_question_from_data_with_postgis
+
+logger = logging.getLogger(__name__)
+
+# --- Scene Generation ---
+
+def generate_scene(placement_budgets=None):
+    """
+    Generates and places one scene of polygons, lines and points.
+
+    Args:
+        placement_budgets (dict): Placement budgets to start from and update
+            (see ScenePlacement; default: fresh ones for this scene)
+    """
+    logger.debug("Generating initial random polygons...")
+    with stage_timer("generate_polygons"):
+        initial_polygons = generate_random_polygons(
+            canvas_bounds=config.CANVAS_BOUNDS,
+            num_polygons=config.NUM_POLYGONS,
+            min_vertices=config.VERTEX_RANGE[0],
+            max_vertices=config.VERTEX_RANGE[1],
+            min_radius=config.RADIUS_RANGE[0],
+            max_radius=config.RADIUS_RANGE[1],
+            regular_shapes=config.CREATE_REGULAR_SHAPES
+        )
+    
+    # 2. Plan the polygon pair relations *after* generation, based on *actual* number generated
+    num_generated_polygons = len(initial_polygons)
+    polygon_plan = plan_polygon_relations(num_generated_polygons, {
+        "aligned": config.NUM_ALIGNED_PAIRS,
+        "overlapping": config.NUM_OVERLAPPING_PAIRS,
+        "contained": config.NUM_CONTAINED_PAIRS,
+        "touching": config.NUM_TOUCHING_PAIRS,
+    })
+    if config.NUM_LINES == 0 and (config.POINT_ON_LINE_PROBABILITY > 0 or config.LINE_CROSSES_LINE_PROBABILITY > 0):
+        logger.warning("Cannot place points on lines or cross lines as NUM_LINES is 0.")
+    
+    # 3. Polygon Relationship Processing (now safe)
+    with stage_timer("polygon_relations"):
+        modified_polygons = build_polygon_relations(
+            initial_polygons, polygon_plan, config.CANVAS_BOUNDS, config.MAX_ATTEMPTS_PER_PLACEMENT
+        )
+
+    # 4. Disjoint Check for "Free" Polygons
+    logger.debug("Repositioning free polygons to ensure they are disjoint...")
+    
+    placement = ScenePlacement(config.CANVAS_BOUNDS, placement_budgets)
+
+    with stage_timer("place_free_polygons"):
+        involved_poly_indices = set(idx for indices in polygon_plan.values() for idx in indices)
+    
+        involved_footprint = prepare_geometry(unary_union([modified_polygons[i] for i in involved_poly_indices]))
+    
+        placed_free_polygons = [] # Footprint of free polygons placed so far
+        free_poly_indices = [i for i in range(config.NUM_POLYGONS) if i not in involved_poly_indices]
+
+        def is_free_polygon(candidates):
+            free = ~shapely.intersects(involved_footprint, candidates)
+            if placed_free_polygons:
+                placed = np.asarray(placed_free_polygons, dtype=object)[:, np.newaxis]
+                free &= ~shapely.intersects(placed, candidates).any(axis=0)
+            return free
+
+        # Regenerate new polygons in new random spots
+        new_polygons = lambda k: generate_random_polygons(
+            canvas_bounds=config.CANVAS_BOUNDS, num_polygons=k,
+            min_vertices=config.VERTEX_RANGE[0], max_vertices=config.VERTEX_RANGE[1],
+            min_radius=config.RADIUS_RANGE[0], max_radius=config.RADIUS_RANGE[1],
+            regular_shapes=config.CREATE_REGULAR_SHAPES
+        )
+    
+        for free_idx in free_poly_indices:
+            poly = placement.place(
+                "free_polygon", candidate_stream([modified_polygons[free_idx]], new_polygons),
+                is_free_polygon, lambda: [involved_footprint] + placed_free_polygons
+            )
+            if poly is None:
+                logger.warning("Could not find disjoint spot for polygon %d. Placing anyway.", free_idx)
+                poly = modified_polygons[free_idx]
+            modified_polygons[free_idx] = poly
+            placed_free_polygons.append(poly)
+
+    # --- Generate, Classify, and Place Lines and Points ---
+    
+    # All polygons are now in their final place.
+    # This list will track ALL placed geoms for disjoint checks
+    placed_geometries = [g for g in modified_polygons] 
+
+    # Relationships are emitted as each object is committed, against its
+    # grid neighbours only; names match name_scene_geometries' numbering
+    tracker = RelationTracker(config.CANVAS_BOUNDS, cell_size=max(config.RADIUS_RANGE[1], 1))
+    for i, poly in enumerate(modified_polygons):
+        tracker.commit(f"POLYGON_{i+1}", poly)
+    
+    modified_lines = []
+    modified_points = []
+
+    def commit_line(line, style):
+        modified_lines.append({"geom": line, "style": style})
+        placed_geometries.append(line)
+        tracker.commit(f"LINE_{len(modified_lines)}", line)
+
+    def commit_point(point, style):
+        modified_points.append({"geom": point, "style": style})
+        placed_geometries.append(point)
+        tracker.commit(f"POINT_{len(modified_points)}", point)
+    num_contained_lines, num_on_poly_lines, num_through_poly_lines, num_crossing_lines = 0, 0, 0, 0
+    num_contained_points, num_on_poly_border_points, num_on_line_points = 0, 0, 0
+
+    logger.debug("Generating and placing %d lines...", config.NUM_LINES)
+    
+    with stage_timer("place_lines"):
+        # --- 1. Create Crossing Line Pairs ---
+        num_crossing_pairs = int((config.NUM_LINES * config.LINE_CROSSES_LINE_PROBABILITY) / 2)
+        num_lines_processed = 0
+    
+        for _ in range(num_crossing_pairs):
+            if num_lines_processed + 2 > config.NUM_LINES:
+                break
+            
+            line_a = generate_one_line(config.CANVAS_BOUNDS, True, config.LINE_LENGTH_RANGE, config.LINE_SEGMENT_RANGE)
+            line_b = generate_one_line(config.CANVAS_BOUNDS, True, config.LINE_LENGTH_RANGE, config.LINE_SEGMENT_RANGE)
+            line_a, line_b = create_crossing_lines(line_a, line_b)
+        
+            # Now find a disjoint spot for this pair; a multi-line keeps the two lines apart
+            pair_geom = shapely.multilinestrings([line_a, line_b])
+            centroid = np.asarray(pair_geom.centroid.coords[0])
+
+            def moved_pairs(k, pair_geom=pair_geom, centroid=centroid):
+                # Move the pair to new random centers
+                new_centers = [generate_one_point(config.CANVAS_BOUNDS).coords[0] for _ in range(k)]
+                return transform_batch([pair_geom] * k, offsets=np.reshape(new_centers, (k, 2)) - centroid)
+
+            placed_pair = placement.place(
+                "crossing_pair", candidate_stream([pair_geom], moved_pairs),
+                tracker.index.free_mask, lambda: tracker.index.geoms
+            )
+            if placed_pair is None:
+                logger.warning("Could not find disjoint spot for a crossing line pair. Skipping.")
+                continue
+
+            line_a, line_b = shapely.get_parts(placed_pair)
+            commit_line(line_a, "crossing_line")
+            commit_line(line_b, "crossing_line")
+            num_crossing_lines += 2
+            num_lines_processed += 2
+
+        # --- 2. Process Remaining Single Lines ---
+        num_remaining_lines = config.NUM_LINES - num_lines_processed
+        # Contained lines stay inside their polygons, which free lines already
+        # avoid, so they can all be moved in one batch after the loop
+        lines_to_contain, line_containers = [], []
+        for _ in range(num_remaining_lines):
+            line_to_place = generate_one_line(
+                config.CANVAS_BOUNDS, config.STRAIGHT_LINES_ONLY, 
+                config.LINE_LENGTH_RANGE, config.LINE_SEGMENT_RANGE
+            )
+        
+            # --- Line Relationship Logic ---
+            # Priority: Contained > On Border > Through > Free
+        
+            if random.random() < config.LINE_CONTAINMENT_PROBABILITY:
+                line_containers.append(random.choice(modified_polygons))
+                lines_to_contain.append(line_to_place)
+        
+            elif random.random() < config.LINE_ON_POLYGON_PROBABILITY:
+                container_poly = random.choice(modified_polygons)
+                final_line = create_line_on_poly_border(container_poly)
+                commit_line(final_line, "on_poly_border")
+                num_on_poly_lines += 1
+
+            elif random.random() < config.LINE_THROUGH_POLYGON_PROBABILITY:
+                container_poly = random.choice(modified_polygons)
+                final_line = create_line_through_poly(container_poly)
+                commit_line(final_line, "through_poly")
+                num_through_poly_lines += 1
+
+            else: # "Free" line, must be disjoint
+                new_lines = lambda k: [
+                    generate_one_line(config.CANVAS_BOUNDS, config.STRAIGHT_LINES_ONLY, config.LINE_LENGTH_RANGE, config.LINE_SEGMENT_RANGE)
+                    for _ in range(k)
+                ]
+                final_line = placement.place(
+                    "free_line", candidate_stream([line_to_place], new_lines),
+                    tracker.index.free_mask, lambda: tracker.index.geoms
+                )
+                if final_line is None:
+                    logger.warning("Could not find disjoint spot for a free line. Skipping.")
+                else:
+                    style = 'straight' if len(final_line.coords) == 2 else 'curly'
+                    commit_line(final_line, style)
+
+        contained_lines = move_lines_into_polys(line_containers, lines_to_contain)
+        for line in contained_lines:
+            commit_line(line, "in_poly")
+        num_contained_lines += len(contained_lines)
+    
+    # --- 3. Process All Points ---
+    logger.debug("Generating and placing %d points...", config.NUM_POINTS)
+    with stage_timer("place_points"):
+        num_free_points = 0
+        points_to_contain, point_containers = [], []
+        for _ in range(config.NUM_POINTS):
+            point_to_place = generate_one_point(config.CANVAS_BOUNDS)
+
+            # --- Point Relationship Logic ---
+            # Priority: Contained > On Poly Border > On Line > Free
+        
+            if random.random() < config.POINT_CONTAINMENT_PROBABILITY:
+                point_containers.append(random.choice(modified_polygons))
+                points_to_contain.append(point_to_place)
+        
+            elif random.random() < config.POINT_ON_POLYGON_BORDER_PROBABILITY:
+                container_poly = random.choice(modified_polygons)
+                final_point = move_point_onto_poly_border(container_poly, point_to_place)
+                commit_point(final_point, "on_border_or_line")
+                num_on_poly_border_points += 1
+
+            elif random.random() < config.POINT_ON_LINE_PROBABILITY and modified_lines:
+                # Need to pick from the geom, not the dict
+                container_line = random.choice(modified_lines)["geom"]
+                final_point = move_point_onto_line(container_line, point_to_place)
+                commit_point(final_point, "on_border_or_line")
+                num_on_line_points += 1
+
+            else: # "Free" point, must be disjoint; placed together below
+                num_free_points += 1
+
+        contained_points = move_points_into_polys(point_containers, points_to_contain)
+        for point in contained_points:
+            commit_point(point, "in_poly")
+        num_contained_points += len(contained_points)
+
+        free_points = place_free_points(num_free_points, placed_geometries, config.CANVAS_BOUNDS, config.MAX_ATTEMPTS_PER_PLACEMENT, placement)
+        for point in free_points:
+            commit_point(point, "point")
+        if len(free_points) < num_free_points:
+            logger.warning("Could not find disjoint spot for %d free points. Skipping.", num_free_points - len(free_points))
+
+    return {
+        "canvas_bounds": config.CANVAS_BOUNDS,
+        "polygons": modified_polygons,
+        "lines": modified_lines,
+        "points": modified_points,
+        "relationships": tracker.finalize(),
+        "placement": placement.summary(),
+        "counts": {
+            "contained_lines": num_contained_lines,
+            "on_poly_lines": num_on_poly_lines,
+            "through_poly_lines": num_through_poly_lines,
+            "crossing_lines": num_crossing_lines,
+            "contained_points": num_contained_points,
+            "on_poly_border_points": num_on_poly_border_points,
+            "on_line_points": num_on_line_points,
+        },
+    }
+
+# Entity type of every geometry type, as used in names and questions
+ENTITY_TYPES = {"Polygon": "POLYGON", "LineString": "LINE", "Point": "POINT"}
+
+def entity_table(all_named_geoms):
+    """Typed entity table of a scene: name -> POLYGON / LINE / POINT."""
+    return {name: ENTITY_TYPES[geom.geom_type] for name, geom in all_named_geoms.items()}
+
+def scene_canvas(scene):
+    """Canvas a scene was placed on (CANVAS_BOUNDS for scene functions that do not record one)."""
+    return tuple(scene.get("canvas_bounds", config.CANVAS_BOUNDS))
+
+def name_scene_geometries(scene):
+    """Assigns POLYGON_/LINE_/POINT_ names to the geometries of a scene."""
+    named_polygons = {f"POLYGON_{i+1}": poly for i, poly in enumerate(scene["polygons"])}
+    named_lines_with_style = {f"LINE_{i+1}": {"geom": d["geom"], "style": d["style"]} for i, d in enumerate(scene["lines"])}
+    named_points_with_style = {f"POINT_{i+1}": {"geom": d["geom"], "style": d["style"]} for i, d in enumerate(scene["points"])}
+
+    all_named_geoms = {
+        **named_polygons,
+        **{name: d["geom"] for name, d in named_lines_with_style.items()},
+        **{name: d["geom"] for name, d in named_points_with_style.items()}
+    }
+    return named_polygons, named_lines_with_style, named_points_with_style, all_named_geoms
+
+def scene_relationships(scene, all_named_geoms):
+    """
+    Relationships of a scene: the ones maintained during placement when the
+    generator tracked them, otherwise a full find_all_relationships pass,
+    together with the scene's entity table.
+    """
+    if "relationships" not in scene:
+        relationships = find_all_relationships(all_named_geoms)
+    else:
+        if config.VERIFY_RELATIONSHIPS:
+            verify_relationships(all_named_geoms, scene["relationships"])
+        relationships = {"relationships": scene["relationships"]}
+    relationships["entities"] = entity_table(all_named_geoms)
+    return relationships
+
+# --- Pipeline Stages ---
+#
+# The relate and question stages of tmp.py's staged pipeline and the stored
+# form of a scene, shared with the dataset builder of faron.build.
+
+def stage_relate(record):
+    """Relate stage: names the scene geometries and finds their relationships."""
+    with stage_timer("relate"):
+        named_polygons, named_lines, named_points, all_named_geoms = name_scene_geometries(record["scene"])
+        record["named"] = (named_polygons, named_lines, named_points)
+        record["relationships"] = scene_relationships(record["scene"], all_named_geoms)
+    return record
+
+def stage_questions(record):
+    """Questions stage: builds a multi-step question from the relationships."""
+    with stage_timer("questions"):
+        record["question"] = generate_spatial_question_from_data_with_postgis(
+            record["relationships"]["relationships"],
+            table_name="generated_geometries",
+            name_col="name",
+            geom_col="geom",
+            entity_types=record["relationships"]["entities"]
+        )
+    if not record["question"] or "error" in record["question"]:
+        count("question_failures")
+    return record
+
+def scene_json(record):
+    """The stored form of a related scene record: geometries as WKT, relationships and question."""
+    named_polygons, named_lines, named_points = record["named"]
+    poly_style = "regular" if config.CREATE_REGULAR_SHAPES else "irregular"
+
+    geometries = [
+        {"name": name, "type": "Polygon", "style": poly_style, "wkt": poly.wkt}
+        for name, poly in named_polygons.items()
+    ]
+    geometries.extend(
+        {"name": name, "type": "LineString", "style": d["style"], "wkt": d["geom"].wkt}
+        for name, d in named_lines.items()
+    )
+    geometries.extend(
+        {"name": name, "type": "Point", "style": d["style"], "wkt": d["geom"].wkt}
+        for name, d in named_points.items()
+    )
+
+    return {
+        "index": record["index"],
+        "canvas_bounds": list(scene_canvas(record.get("scene", {}))),
+        "image": record["image"],
+        "geometries": geometries,
+        "relationships": record["relationships"]["relationships"],
+        "question": record["question"],
+        "placement": record.get("scene", {}).get("placement"),
+        "fingerprints": record.get("fingerprints"),
+    }
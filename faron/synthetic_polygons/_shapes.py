@@ -1,45 +1,150 @@
-from Typing import List, Dict, Tuple
-
-from shapely.geometry import Point, Line, Polygon, box
-
-def generate_random_polygons(canvas_bounds:Tuple[int],
-                             num_polygons:int,
-                             min_vertices:int, max_vertices:int,
-                             min_radius:int, max_radius:int,
-                             is_regular:bool=False) -> List[Polygon]:
-    """
-    Args:
-        canvas_bounds (tuple):
-        is_regular (bool):
-
-    Returns:
-        list: A list of Shapely Polygon objects
-    """
-    return 0
-
-def generate_random_lines(canvas_bounds:Tuple[int],
-                          num_lines:int,
-                          min_length:int, max_length:int,
-                          is_regular:bool=False) -> List[Line]:
-    """
-    Args:
-        canvas_bounds (tuple):
-        is_regular (bool):
-
-    Returns:
-        list: A list of Shapely Line objects
-    """
-    return 0
-
-def generate_random_points(canvas_bounds:Tuple[int],
-                           num_points:int,
-                           min_radius:int, max_radius:int,) -> List[Point]:
-    """
-    Args:
-        canvas_bounds (tuple):
-        is_regular (bool):
-
-    Returns:
-        list: A list of Shapely Point objects
-    """
-    return 0
\ No newline at end of file
+import math
+import random
+import logging
+
+from shapely.geometry import Point, LineString, Polygon
+
+from faron.stats import count
+
+logger = logging.getLogger(__name__)
+
+# --- Polygon Generation ---
+
+def generate_random_polygons(
+    canvas_bounds, 
+    num_polygons, 
+    min_vertices, 
+    max_vertices, 
+    min_radius, 
+    max_radius, 
+    regular_shapes=False
+):
+    """Generates a list of random vector polygons on a square plane."""
+    min_x, min_y, max_x, max_y = canvas_bounds
+    polygons = []
+    
+    attempts = 0
+    # Give up after 10x attempts per polygon
+    MAX_GEN_ATTEMPTS = num_polygons * 10 
+
+    while len(polygons) < num_polygons and attempts < MAX_GEN_ATTEMPTS:
+        attempts += 1
+        # 1. Determine polygon properties
+        num_vertices = random.randint(min_vertices, max_vertices)
+        avg_radius = random.uniform(min_radius, max_radius)
+        
+        # 2. Pick a random, valid center point for the polygon
+        buffer = avg_radius * 1.1 
+        center_x = random.uniform(min_x + buffer, max_x - buffer)
+        center_y = random.uniform(min_y + buffer, max_y - buffer)
+        
+        # 3. Generate vertices based on the control variable
+        vertices = []
+        
+        if regular_shapes:
+            # --- Generate a REGULAR polygon ---
+            start_angle = random.uniform(0, 2 * math.pi)
+            angle_step = 2 * math.pi / num_vertices
+            
+            for i in range(num_vertices):
+                angle = start_angle + i * angle_step
+                x = center_x + avg_radius * math.cos(angle)
+                y = center_y + avg_radius * math.sin(angle)
+                vertices.append((x, y))
+        else:
+            # --- Generate an IRREGULAR polygon (original logic) ---
+            angles = sorted([random.uniform(0, 2 * math.pi) for _ in range(num_vertices)])
+            
+            for angle in angles:
+                radius = random.uniform(avg_radius * 0.8, avg_radius * 1.2)
+                x = center_x + radius * math.cos(angle)
+                y = center_y + radius * math.sin(angle)
+                vertices.append((x, y))
+        
+        # 4. Create the Shapely Polygon object
+        polygon = Polygon(vertices)
+        if polygon.is_valid:
+            polygons.append(polygon)
+            
+    count("generation_attempts", attempts, kind="polygon")
+    count("generation_rejections", attempts - len(polygons), kind="polygon")
+    if len(polygons) < num_polygons:
+        logger.warning("Could only generate %d valid polygons out of %d requested.", len(polygons), num_polygons)
+            
+    return polygons
+
+# --- Point Generation ---
+
+def generate_random_points(canvas_bounds, num_points):
+    """Generates a list of random Point objects."""
+    min_x, min_y, max_x, max_y = canvas_bounds
+    points = []
+    for _ in range(num_points):
+        x = random.uniform(min_x, max_x)
+        y = random.uniform(min_y, max_y)
+        points.append(Point(x, y))
+    return points
+
+def generate_one_point(canvas_bounds):
+    """Generates a single random Point object."""
+    min_x, min_y, max_x, max_y = canvas_bounds
+    x = random.uniform(min_x, max_x)
+    y = random.uniform(min_y, max_y)
+    return Point(x, y)
+
+# --- Line Generation ---
+
+def generate_random_lines(
+    canvas_bounds, 
+    num_lines, 
+    straight_only, 
+    length_range, 
+    segment_range
+):
+    """Generates lists of straight and curly LineString objects."""
+    straight_lines = []
+    curly_lines = []
+    
+    for _ in range(num_lines):
+        line = generate_one_line(canvas_bounds, straight_only, length_range, segment_range)
+        if len(line.coords) == 2:
+            straight_lines.append(line)
+        else:
+            curly_lines.append(line)
+            
+    return straight_lines, curly_lines
+
+def generate_one_line(canvas_bounds, straight_only, length_range, segment_range):
+    """Generates a single random LineString object."""
+    min_x, min_y, max_x, max_y = canvas_bounds
+    is_straight = straight_only or (not straight_only and random.choice([True, False]))
+    
+    if is_straight:
+        x1 = random.uniform(min_x, max_x)
+        y1 = random.uniform(min_y, max_y)
+        x2 = random.uniform(min_x, max_x)
+        y2 = random.uniform(min_y, max_y)
+        return LineString([(x1, y1), (x2, y2)])
+    else:
+        num_segments = random.randint(segment_range[0], segment_range[1])
+        seg_len = random.uniform(length_range[0], length_range[1]) / num_segments
+        
+        cx = random.uniform(min_x, max_x)
+        cy = random.uniform(min_y, max_y)
+        vertices = [(cx, cy)]
+        angle = random.uniform(0, 2 * math.pi)
+        
+        for _ in range(num_segments - 1):
+            angle += random.uniform(-math.pi / 2, math.pi / 2)
+            nx = cx + seg_len * math.cos(angle)
+            ny = cy + seg_len * math.sin(angle)
+            nx = max(min_x, min(nx, max_x))
+            ny = max(min_y, min(ny, max_y))
+            vertices.append((nx, ny))
+            cx, cy = nx, ny
+        
+        if len(vertices) > 1:
+            return LineString(vertices)
+        else:
+            # Fallback to a simple line if random walk fails
+            return generate_one_line(canvas_bounds, True, length_range, segment_range)
@@ -1,2 +1,94 @@
-import psycopg2
+import string
+import functools
 
+# Value of the geom_type column (see save_geometries_to_postgis) of every entity type
+GEOM_TYPE_VALUES = {
+    "POLYGON": "Polygon",
+    "LINE": "LineString",
+    "POINT": "Point"
+}
+
+# PostGIS predicate of every relation questions are built from
+SQL_FUNCTIONS = {
+    "within": "ST_Within({A}, {B})",
+    "contain": "ST_Contains({A}, {B})",
+    "overlap": "ST_Overlaps({A}, {B})",
+    "intersect": "ST_Intersects({A}, {B})",
+    "disjoint": "ST_Disjoint({A}, {B})",
+    "crosses": "ST_Crosses({A}, {B})"
+}
+
+# Predicates as quoted in the reasoning steps
+SQL_FUNCTION_HINTS = {rel: sql.format(A='..', B='..') for rel, sql in SQL_FUNCTIONS.items()}
+
+# SQL skeletons of the question templates. {table_name}, {name_col},
+# {geom_col} and {type_col} are filled in once per table by compile_templates, which leaves
+# the ${{...}} slots as string.Template ${...} slots for every question. The
+# rel_*_sql slots take one of the predicates compiled per relation for the
+# table aliases listed with the skeleton.
+CHAINED_RELATIONSHIP_SQL = """
+WITH IntermediateSet AS (
+    SELECT T1.{geom_col}
+    FROM {table_name} AS T1, {table_name} AS T2
+    WHERE
+        T1.{type_col} = '${{type_b}}'
+        AND T2.{name_col} = '${{entity_c}}'
+        AND ${{rel_2_sql}}
+)
+SELECT DISTINCT T_Final.{name_col}
+FROM {table_name} AS T_Final, IntermediateSet
+WHERE
+    T_Final.{type_col} = '${{type_a}}'
+    AND ${{rel_1_sql}};
+"""
+CHAINED_RELATIONSHIP_ALIASES = {"rel_1_sql": ("T_Final", "IntermediateSet"), "rel_2_sql": ("T1", "T2")}
+
+MULTIPLE_CONDITIONS_SQL = """
+SELECT T1.{name_col}
+FROM {table_name} AS T1, {table_name} AS T2
+WHERE
+    T1.{type_col} = '${{type_a}}'
+    AND T2.{name_col} = '${{entity_b}}'
+    AND ${{rel_1_sql}}
+
+INTERSECT
+SELECT T1.{name_col}
+FROM {table_name} AS T1, {table_name} AS T2
+WHERE
+    T1.{type_col} = '${{type_a}}'
+    AND T2.{name_col} = '${{entity_c}}'
+    AND ${{rel_2_sql}};
+"""
+MULTIPLE_CONDITIONS_ALIASES = {"rel_1_sql": ("T1", "T2"), "rel_2_sql": ("T1", "T2")}
+
+def clean_sql(sql):
+    """Drops the indentation and the blank lines of a SQL block."""
+    return "\n".join(
+        [line.strip() for line in sql.strip().split('\n') if line.strip()]
+    )
+
+@functools.lru_cache(maxsize=None)
+def compile_templates(table_name, name_col, geom_col, type_col="geom_type"):
+    """
+    Compiles the SQL skeletons for one table: the table and column names are
+    substituted and the SQL cleaned up once, leaving a string.Template with
+    the per-question slots, and every relation predicate is precomputed for
+    the aliases of its slot. Cached per (table_name, name_col, geom_col, type_col).
+
+    Returns:
+        dict: Template name -> (string.Template, {slot: {relation: predicate}})
+    """
+    def compile_one(skeleton, aliases):
+        sql = string.Template(clean_sql(skeleton.format(
+            table_name=table_name, name_col=name_col, geom_col=geom_col, type_col=type_col
+        )))
+        predicates = {
+            slot: {rel: rel_sql.format(A=f"{a}.{geom_col}", B=f"{b}.{geom_col}") for rel, rel_sql in SQL_FUNCTIONS.items()}
+            for slot, (a, b) in aliases.items()
+        }
+        return sql, predicates
+
+    return {
+        "chained_relationship": compile_one(CHAINED_RELATIONSHIP_SQL, CHAINED_RELATIONSHIP_ALIASES),
+        "multiple_conditions": compile_one(MULTIPLE_CONDITIONS_SQL, MULTIPLE_CONDITIONS_ALIASES),
+    }
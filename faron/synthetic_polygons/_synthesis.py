@@ -0,0 +1,219 @@
+import random
+import logging
+from collections import Counter
+
+import numpy as np
+import shapely
+
+from . import _config as config
+from ._shapes import generate_random_polygons, generate_one_point, generate_one_line
+from ._geometry import transform_batch
+from ._placement import ScenePlacement
+from ._pairs import create_contained_pairs, create_touching_polygons, create_overlapping_pairs
+from ._objects import (
+    move_point_into_poly, move_line_into_poly, move_point_onto_poly_border,
+    create_line_through_poly, create_crossing_lines,
+)
+from ._relations import RelationTracker, relate_pair, verify_relationships
+from ._scene import ENTITY_TYPES, name_scene_geometries
+
+logger = logging.getLogger(__name__)
+
+# --- Constraint-Driven Scene Synthesis ---
+#
+# Instead of placing objects by probability and filtering scenes afterwards,
+# synthesize_scene builds one small cluster per requested relation (whose only
+# mutual relation is that one), and places every cluster where the grid index
+# reports no neighbours. Clusters never interact, so the achieved histogram is
+# exactly the sum of the clusters' relations.
+
+SYNTHESIS_RELATIONS = ("within", "touches", "overlaps", "cross")
+
+def relation_histogram(relationships):
+    """Counts relationship labels, leaving out mirrored 'contains' and sampled 'disjoint'."""
+    return Counter(rel for _, _, rel in relationships if rel not in ("contains", "disjoint"))
+
+def _cluster_relations(cluster):
+    """Relationship histogram inside a cluster of (type, geom, style) members."""
+    relationships = []
+    for i in range(len(cluster)):
+        for j in range(i + 1, len(cluster)):
+            relationships.extend(relate_pair(i, cluster[i][1], j, cluster[j][1]))
+    return relation_histogram(relationships)
+
+def make_relation_cluster(relation):
+    """
+    Builds two fresh objects whose only mutual relation is `relation`.
+    Returns a list of (type, geom, style) members, or None if generation failed.
+    """
+    polygons = generate_random_polygons(
+        config.CANVAS_BOUNDS, 2, config.VERTEX_RANGE[0], config.VERTEX_RANGE[1],
+        config.RADIUS_RANGE[0], config.RADIUS_RANGE[1], config.CREATE_REGULAR_SHAPES
+    )
+    if len(polygons) < 2:
+        return None
+    poly_a, poly_b = polygons
+    poly_style = "regular" if config.CREATE_REGULAR_SHAPES else "irregular"
+
+    if relation == "within":
+        variant = random.choice(["point", "line", "polygon"])
+        if variant == "point":
+            point = move_point_into_poly(poly_a, generate_one_point(config.CANVAS_BOUNDS))
+            cluster = [("Polygon", poly_a, poly_style), ("Point", point, "in_poly")]
+        elif variant == "line":
+            line = generate_one_line(config.CANVAS_BOUNDS, config.STRAIGHT_LINES_ONLY, config.LINE_LENGTH_RANGE, config.LINE_SEGMENT_RANGE)
+            cluster = [("Polygon", poly_a, poly_style), ("LineString", move_line_into_poly(poly_a, line), "in_poly")]
+        else:
+            poly_a, poly_b = create_contained_pairs([poly_a, poly_b], [0, 1])
+            cluster = [("Polygon", poly_a, poly_style), ("Polygon", poly_b, poly_style)]
+
+    elif relation == "touches":
+        if random.random() < 0.5:
+            poly_a, poly_b = create_touching_polygons([poly_a, poly_b], [0, 1])
+            cluster = [("Polygon", poly_a, poly_style), ("Polygon", poly_b, poly_style)]
+        else:
+            point = move_point_onto_poly_border(poly_a, generate_one_point(config.CANVAS_BOUNDS))
+            cluster = [("Polygon", poly_a, poly_style), ("Point", point, "on_border_or_line")]
+
+    elif relation == "overlaps":
+        poly_a, poly_b = create_overlapping_pairs([poly_a, poly_b], [0, 1])
+        cluster = [("Polygon", poly_a, poly_style), ("Polygon", poly_b, poly_style)]
+
+    elif relation == "cross":
+        if random.random() < 0.5:
+            cluster = [("Polygon", poly_a, poly_style), ("LineString", create_line_through_poly(poly_a), "through_poly")]
+        else:
+            line_a = generate_one_line(config.CANVAS_BOUNDS, True, config.LINE_LENGTH_RANGE, config.LINE_SEGMENT_RANGE)
+            line_b = generate_one_line(config.CANVAS_BOUNDS, True, config.LINE_LENGTH_RANGE, config.LINE_SEGMENT_RANGE)
+            line_a, line_b = create_crossing_lines(line_a, line_b)
+            cluster = [("LineString", line_a, "crossing_line"), ("LineString", line_b, "crossing_line")]
+
+    else:
+        raise ValueError(f"Unsupported relation '{relation}', expected one of {SYNTHESIS_RELATIONS}.")
+
+    return cluster
+
+def _place_cluster(cluster, index, placement):
+    """
+    Moves a cluster (rigidly) to a spot where it has no neighbours in the
+    grid index, as one "cluster" placement of `placement` (a ScenePlacement).
+    When the canvas is too crowded its center is drawn from the free space
+    and, if even that is too tight, it is shrunk about its centroid, so
+    violations are repaired locally instead of discarding the scene.
+    Returns the placed cluster or None.
+    """
+    min_x, min_y, max_x, max_y = config.CANVAS_BOUNDS
+    collection = shapely.geometrycollections([geom for _, geom, _ in cluster])
+    c_minx, c_miny, c_maxx, c_maxy = collection.bounds
+
+    def moved_clusters(k):
+        offsets = [
+            (random.uniform(min_x - c_minx, max(min_x - c_minx, max_x - c_maxx)),
+             random.uniform(min_y - c_miny, max(min_y - c_miny, max_y - c_maxy)))
+            for _ in range(k)
+        ]
+        return transform_batch([collection] * k, offsets=np.reshape(offsets, (k, 2)))
+
+    placed = placement.place("cluster", moved_clusters, index.free_mask, lambda: index.geoms)
+    if placed is None:
+        return None
+    return [(kind, geom, style) for (kind, _, style), geom in zip(cluster, shapely.get_parts(placed))]
+
+def synthesize_scene(target_relations, num_free_polygons=0, num_free_lines=0, num_free_points=0, verify=False,
+                     placement_budgets=None):
+    """
+    Synthesizes a scene whose relationship histogram matches `target_relations` exactly.
+
+    Args:
+        target_relations (dict): Relation label -> count, e.g. {"within": 3, "touches": 2, "cross": 4}
+        num_free_polygons (int): Extra polygons disjoint from everything
+        num_free_lines (int): Extra lines disjoint from everything
+        num_free_points (int): Extra points disjoint from everything
+        verify (bool): Recompute all relationships at the end and compare with the tracked ones
+        placement_budgets (dict): Placement budgets to start from and update (see ScenePlacement)
+
+    Returns:
+        dict: Scene in the generate_scene format, with "counts" holding the achieved histogram
+    """
+    target = Counter({rel: count for rel, count in target_relations.items() if count})
+    tracker = RelationTracker(config.CANVAS_BOUNDS, cell_size=max(config.RADIUS_RANGE[1], 1))
+    index = tracker.index
+    placement = ScenePlacement(config.CANVAS_BOUNDS, placement_budgets)
+    achieved = Counter()
+    members = []
+
+    # Names follow name_scene_geometries' per-type numbering
+    type_counts = Counter()
+
+    def commit(member):
+        type_counts[member[0]] += 1
+        tracker.commit(f"{ENTITY_TYPES[member[0]]}_{type_counts[member[0]]}", member[1])
+        members.append(member)
+
+    jobs = [rel for rel, num in target.items() for _ in range(num)]
+    random.shuffle(jobs)
+    for relation in jobs:
+        placed = None
+        for _ in range(config.MAX_ATTEMPTS_PER_PLACEMENT):
+            cluster = make_relation_cluster(relation)
+            if cluster is None or _cluster_relations(cluster) != Counter({relation: 1}):
+                continue
+            placed = _place_cluster(cluster, index, placement)
+            # Moving and shrinking must not have changed the relation
+            if placed is not None and _cluster_relations(placed) == Counter({relation: 1}):
+                break
+            placed = None
+
+        if placed is None:
+            logger.warning("Could not place a '%s' cluster.", relation)
+            continue
+        for member in placed:
+            commit(member)
+        achieved[relation] += 1
+
+    # Free objects must be disjoint from everything already placed
+    poly_style = "regular" if config.CREATE_REGULAR_SHAPES else "irregular"
+    free_makers = [
+        ("free_polygon", num_free_polygons, lambda k: generate_random_polygons(
+            config.CANVAS_BOUNDS, k, config.VERTEX_RANGE[0], config.VERTEX_RANGE[1], config.RADIUS_RANGE[0], config.RADIUS_RANGE[1], config.CREATE_REGULAR_SHAPES
+        )),
+        ("free_line", num_free_lines, lambda k: [generate_one_line(
+            config.CANVAS_BOUNDS, config.STRAIGHT_LINES_ONLY, config.LINE_LENGTH_RANGE, config.LINE_SEGMENT_RANGE
+        ) for _ in range(k)]),
+        ("free_point", num_free_points, lambda k: [generate_one_point(config.CANVAS_BOUNDS) for _ in range(k)]),
+    ]
+    for placement_kind, num_free, make in free_makers:
+        for _ in range(num_free):
+            geom = placement.place(placement_kind, make, index.free_mask, lambda: index.geoms)
+            if geom is None:
+                logger.warning("Could not find disjoint spot for a %s. Skipping.", placement_kind.replace('_', ' '))
+                continue
+            kind = geom.geom_type
+            if kind == "Polygon":
+                style = poly_style
+            elif kind == "LineString":
+                style = 'straight' if len(geom.coords) == 2 else 'curly'
+            else:
+                style = "point"
+            commit((kind, geom, style))
+
+    if achieved != target:
+        logger.warning("Synthesized %s instead of %s.", dict(achieved), dict(target))
+
+    scene = {
+        "canvas_bounds": config.CANVAS_BOUNDS,
+        "polygons": [geom for kind, geom, _ in members if kind == "Polygon"],
+        "lines": [{"geom": geom, "style": style} for kind, geom, style in members if kind == "LineString"],
+        "points": [{"geom": geom, "style": style} for kind, geom, style in members if kind == "Point"],
+        "relationships": tracker.finalize(),
+        "placement": placement.summary(),
+        "counts": dict(achieved),
+    }
+
+    if verify:
+        _, _, _, all_named_geoms = name_scene_geometries(scene)
+        verify_relationships(all_named_geoms, scene["relationships"])
+        if relation_histogram(scene["relationships"]) != achieved:
+            raise AssertionError(f"Synthesized relations {dict(achieved)} do not match the tracked ones.")
+
+    return scene
@@ -1,15 +1,28 @@
 import os
-from Typing import List, Dict, Tuple, Union
+import logging
+import functools
+from typing import List, Dict, Tuple, Union
 
 import random
-from shapely.geometry import Point, Line, Polygon
-import matplotlib.pyplot as plt
+import numpy as np
+from PIL import Image, ImageDraw
+from shapely.geometry import Point, LineString as Line, Polygon
 
-import psycopg2
-from dotenv import load_dotenv
+# matplotlib, psycopg2 and dotenv are imported by the functions that use
+# them, so importing the package (e.g. in every DataLoader worker) stays fast
 
-load_dotenv()  # take environment variables
-psql_string = os.getenv('PSQL_CONN_STRING')
+logger = logging.getLogger(__name__)
+
+@functools.lru_cache(maxsize=None)
+def get_psql_string() -> str:
+    """
+    PostGIS connection string, read from PSQL_CONN_STRING after loading the
+    environment variables of the .env file (on first use only).
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()  # take environment variables
+    return os.getenv('PSQL_CONN_STRING')
 
 def create_dataset_dir(save_path:str='./data') -> None:
     """
@@ -20,10 +33,10 @@ def create_dataset_dir(save_path:str='./data') -> None:
     """
     if os.path.exists(save_path):
         os.makedirs(save_path)
-        print("[INFO] Save path created")
+        logger.info("Save path created")
 
     else:
-        print("[INFO] Path already exists")
+        logger.info("Path already exists")
 
 def plot_polygons(polygons:List[Union[Point, Line, Polygon]],
                   canvas_bounds:Tuple[int],
@@ -36,6 +49,8 @@ def plot_polygons(polygons:List[Union[Point, Line, Polygon]],
         canvas_bounds (tuple): The boundaries of the canvas for plotting
         save_path (str): Path to store the visualized polygons
     """
+    import matplotlib.pyplot as plt
+
     # Initialize the 2d plot plane
     fig, ax = plt.subplots(figsize=(15, 15))
     min_x, min_y, max_x, max_y = canvas_bounds
@@ -57,6 +72,70 @@ def plot_polygons(polygons:List[Union[Point, Line, Polygon]],
     
     plt.savefig(save_path)
 
+# Colors follow plot_geometries in tmp.py so both renderers agree
+LINE_STYLE_COLORS = {
+    'on_poly_border': (255, 0, 0),
+    'through_poly': (0, 255, 255),
+    'crossing_line': (255, 165, 0),
+    'straight': (0, 0, 255),
+    'road': (64, 64, 64),
+}
+POINT_STYLE_COLORS = {
+    'on_border_or_line': (255, 0, 0),
+    'in_poly': (0, 128, 0),
+    'poi': (0, 0, 255),
+}
+
+def rasterize_geometries(geometries:List[Tuple[str, Union[Point, Line, Polygon]]],
+                         canvas_bounds:Tuple[int],
+                         resolution:int,
+                         seed:int=0) -> np.ndarray:
+    """
+    Rasterize a scene directly into an RGB array without going through matplotlib.
+
+    Args:
+        geometries (list): List of (style, Shapely geometry) tuples
+        canvas_bounds (tuple): The boundaries of the canvas
+        resolution (int): Width and height of the output image in pixels
+        seed (int): Seed for the polygon fill colors so a scene always renders the same
+
+    Returns:
+        np.ndarray: uint8 array of shape (resolution, resolution, 3)
+    """
+    min_x, min_y, max_x, max_y = canvas_bounds
+    x_scale = resolution / (max_x - min_x)
+    y_scale = resolution / (max_y - min_y)
+
+    def to_pixels(coords):
+        return [((x - min_x) * x_scale, (max_y - y) * y_scale) for x, y in coords]
+
+    image = Image.new('RGB', (resolution, resolution), (255, 255, 255))
+    draw = ImageDraw.Draw(image, 'RGBA')
+    rng = random.Random(seed)
+    line_width = max(1, round(resolution * 0.003))
+    point_radius = max(1, round(resolution * 0.004))
+
+    # Largest polygons first so contained polygons stay visible
+    polygons = sorted((g for _, g in geometries if g.geom_type == 'Polygon'), key=lambda g: g.area, reverse=True)
+    for poly in polygons:
+        color = (rng.randrange(256), rng.randrange(256), rng.randrange(256), 153)
+        draw.polygon(to_pixels(poly.exterior.coords), fill=color, outline=(0, 0, 0, 255))
+
+    for style, geom in geometries:
+        if geom.geom_type == 'LineString':
+            color = LINE_STYLE_COLORS.get(style, (128, 0, 128))
+            width = line_width * 2 if style == 'on_poly_border' else line_width
+            draw.line(to_pixels(geom.coords), fill=color + (255,), width=width)
+
+    for style, geom in geometries:
+        if geom.geom_type == 'Point':
+            (x, y), = to_pixels(geom.coords)
+            color = POINT_STYLE_COLORS.get(style, (0, 0, 0))
+            draw.ellipse((x - point_radius, y - point_radius, x + point_radius, y + point_radius),
+                         fill=color + (255,), outline=(0, 0, 0, 255))
+
+    return np.asarray(image)
+
 def save_to_postgis(polygons: Union[Point, Line, Polygon], 
                     db_config:Dict[str, str], 
                     is_regular:bool) -> int:
@@ -69,14 +148,16 @@ def save_to_postgis(polygons: Union[Point, Line, Polygon],
         is_regular (bool):
     """
 
+    import psycopg2
+
     # Initiate connection
 
     try:
-        conn = psycopg2.connect(psql_string)
+        conn = psycopg2.connect(get_psql_string())
         cur = conn.cursor()
 
     except:
-        print("[ERROR] Cannot connect to the database")
+        logger.error("Cannot connect to the database")
 
         # End saving
         return -1
@@ -1,37 +1,77 @@
 import os
 import json
+import logging
 import argparse
-from fire import fire
 
-from faron import FARON
+from faron.build import SCENE_BUILDERS, SHARD_SIZE, build_dataset, merge_manifests
+
+logger = logging.getLogger(__name__)
 
 def main(save_dir:str,
-         
          mode:str,
-         img_count:int):
-    
-    FARON(save_dir=save_dir,
-          mode=mode,
-          img_count=img_count)
-    
-    print("main")
+         img_count:int,
+         shard_size:int=SHARD_SIZE,
+         verify:bool=False,
+         shard_index:int=0,
+         num_shards:int=1,
+         merge:bool=False,
+         dedup:bool=False):
+
+    if merge:
+        merge_manifests(save_dir)
+
+    else:
+        # Only the scenes the build manifest does not record yet are generated
+        manifest = build_dataset(save_dir, mode, img_count, shard_size=shard_size, verify=verify,
+                                 shard_index=shard_index, num_shards=num_shards, dedup=dedup)
+        logger.info("%s holds %d scenes in %d shard(s)", manifest.path, manifest.num_scenes(), len(manifest.shards))
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="FARON Data")
 
-    parser.add_argument("--save_path", default='./data'
+    parser.add_argument("--save_path", default='./data',
                         help="Path to store the created dataset")
 
-    parser.add_argument("--mode", choices=['polygon', 'map', 'mix'], default='polygon',
+    # 'mix' datasets have no scene builder, so they cannot be built here
+    parser.add_argument("--mode", choices=list(SCENE_BUILDERS), default='polygon',
                         help="Dataset mode (synthetic polygon or synthetic maps)")
 
-    parser.add_argument("--n", default=5, 
+    parser.add_argument("--n", type=int, default=5,
                         help="Number of questions to create")
 
+    parser.add_argument("--shard_size", type=int, default=SHARD_SIZE,
+                        help="Scenes per shard file of a new build (a resumed build keeps its own)")
+
+    parser.add_argument("--verify", action="store_true",
+                        help="Re-hash the finished shards before resuming instead of only checking their size")
+
+    parser.add_argument("--shard_index", "--shard-index", type=int, default=0,
+                        help="Index k of this node in a sharded build: it builds every --num_shards-th chunk of scenes from chunk k on")
+
+    parser.add_argument("--num_shards", "--num-shards", type=int, default=1,
+                        help="Number of nodes sharing the build")
+
+    parser.add_argument("--merge", action="store_true",
+                        help="Merge the node manifests of a sharded build into the global manifest and exit")
+
+    parser.add_argument("--dedup", action="store_true",
+                        help="Leave out scenes and questions that repeat earlier ones of the build")
+
     args = parser.parse_args()
 
+    if not 0 <= args.shard_index < args.num_shards:
+        parser.error(f"--shard_index must be in [0, {args.num_shards})")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
     #####################
 
     main(save_dir=args.save_path,
          mode=args.mode,
-         img_count=args.n)
\ No newline at end of file
+         img_count=args.n,
+         shard_size=args.shard_size,
+         verify=args.verify,
+         shard_index=args.shard_index,
+         num_shards=args.num_shards,
+         merge=args.merge,
+         dedup=args.dedup)
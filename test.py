@@ -1,10 +1,16 @@
 import random
 import math
+import logging
 from shapely.geometry import Polygon, Point, LineString
 from shapely import affinity
 from shapely.ops import unary_union
 import matplotlib.pyplot as plt
 import psycopg2
+import numpy as np
+
+from faron.synthetic_polygons import force_pairs
+
+logger = logging.getLogger(__name__)
 
 
 def generate_random_polygons(
@@ -125,155 +131,6 @@ def generate_one_line(canvas_bounds, straight_only, length_range, segment_range)
             # Fallback to a simple line if random walk fails
             return generate_one_line(canvas_bounds, True, length_range, segment_range)
 
-def create_touching_pairs(polygons, num_pairs):
-    """
-    Adjusts polygons so a specified number of pairs share a border.
-
-    Args:
-        polygons (list): The list of generated Shapely Polygons.
-        num_pairs (int): The number of pairs to make touch.
-
-    Returns:
-        list: The modified list of polygons.
-    """
-    if num_pairs == 0:
-        return polygons
-        
-    num_polygons = len(polygons)
-    if num_pairs * 2 > num_polygons:
-        print(f"Warning: Cannot create {num_pairs} pairs from {num_polygons} polygons. Reducing pairs.")
-        num_pairs = num_polygons // 2
-
-    # Create a list of indices and shuffle it to create random pairs
-    indices = list(range(num_polygons))
-    random.shuffle(indices)
-
-    modified_polygons = polygons[:] # Work on a copy
-
-    for i in range(num_pairs):
-        # Get indices for the stationary polygon (A) and the mobile one (B)
-        idx_a = indices[i*2]
-        idx_b = indices[i*2 + 1]
-
-        poly_a = modified_polygons[idx_a]
-        poly_b = modified_polygons[idx_b]
-
-        # Pick a random point on the boundary of polygon A
-        dist_a = random.uniform(0, poly_a.exterior.length)
-        touch_point_a = poly_a.exterior.interpolate(dist_a)
-
-        # Pick a random point on the boundary of polygon B
-        dist_b = random.uniform(0, poly_b.exterior.length)
-        touch_point_b = poly_b.exterior.interpolate(dist_b)
-
-        # Calculate the translation vector to move touch_point_b to touch_point_a
-        x_off = touch_point_a.x - touch_point_b.x
-        y_off = touch_point_a.y - touch_point_b.y
-
-        # Move polygon B and update it in the list
-        moved_poly_b = affinity.translate(poly_b, xoff=x_off, yoff=y_off)
-        modified_polygons[idx_b] = moved_poly_b
-    
-    return modified_polygons
-
-def create_aligned_edges(polygons, indices_to_use):
-    """Adjusts specified polygon pairs to share a boundary line."""
-    modified_polygons = polygons[:]
-    MAX_ATTEMPTS_PER_PAIR = 20
-
-    for i in range(0, len(indices_to_use), 2):
-        idx_a = indices_to_use[i]
-        idx_b = indices_to_use[i+1]
-        
-        pair_aligned = False
-        for _ in range(MAX_ATTEMPTS_PER_PAIR):
-            poly_a = modified_polygons[idx_a]
-            poly_b = modified_polygons[idx_b]
-
-            coords_a = list(poly_a.exterior.coords)
-            edge_idx_a = random.randrange(len(coords_a) - 1)
-            p_a1, p_a2 = Point(coords_a[edge_idx_a]), Point(coords_a[edge_idx_a + 1])
-            
-            coords_b = list(poly_b.exterior.coords)
-            edge_idx_b = random.randrange(len(coords_b) - 1)
-            p_b1, p_b2 = Point(coords_b[edge_idx_b]), Point(coords_b[edge_idx_b + 1])
-
-            angle_a = math.atan2(p_a2.y - p_a1.y, p_a2.x - p_a1.x)
-            angle_b = math.atan2(p_b2.y - p_b1.y, p_b2.x - p_b1.x)
-            
-            rotation_angle_rad = angle_a - angle_b + math.pi
-            rotated_poly_b = affinity.rotate(poly_b, math.degrees(rotation_angle_rad), origin='center')
-            
-            rotated_coords_b = list(rotated_poly_b.exterior.coords)
-            p_b1_rot, p_b2_rot = Point(rotated_coords_b[edge_idx_b]), Point(rotated_coords_b[edge_idx_b + 1])
-            mid_b_rot = Point((p_b1_rot.x + p_b2_rot.x) / 2, (p_b1_rot.y + p_b2_rot.y) / 2)
-            
-            mid_a = Point((p_a1.x + p_a2.x) / 2, (p_a1.y + p_a2.y) / 2)
-            
-            x_off = mid_a.x - mid_b_rot.x
-            y_off = mid_a.y - mid_b_rot.y
-            final_poly_b = affinity.translate(rotated_poly_b, xoff=x_off, yoff=y_off)
-            
-            if not poly_a.overlaps(final_poly_b):
-                modified_polygons[idx_b] = final_poly_b
-                pair_aligned = True
-                break
-        
-        if not pair_aligned:
-            print(f"Warning: Could not align pair ({idx_a}, {idx_b}) without overlap.")
-
-    return modified_polygons
-
-def create_overlapping_pairs(polygons, indices_to_use):
-    """Adjusts specified polygon pairs to partially overlap."""
-    modified_polygons = polygons[:]
-    for i in range(0, len(indices_to_use), 2):
-        idx_a = indices_to_use[i]
-        idx_b = indices_to_use[i+1]
-
-        poly_a = modified_polygons[idx_a]
-        poly_b = modified_polygons[idx_b]
-
-        target_point = poly_a.centroid
-        dist_b = random.uniform(0, poly_b.exterior.length)
-        source_point = poly_b.exterior.interpolate(dist_b)
-        
-        x_off = target_point.x - source_point.x
-        y_off = target_point.y - source_point.y
-        
-        moved_poly_b = affinity.translate(poly_b, xoff=x_off, yoff=y_off)
-        modified_polygons[idx_b] = moved_poly_b
-        
-    return modified_polygons
-
-def create_contained_pairs(polygons, indices_to_use):
-    """Adjusts specified polygon pairs so one is contained within another."""
-    modified_polygons = polygons[:]
-    for i in range(0, len(indices_to_use), 2):
-        idx_1 = indices_to_use[i]
-        idx_2 = indices_to_use[i+1]
-        
-        if modified_polygons[idx_1].area > modified_polygons[idx_2].area:
-            idx_a, idx_b = idx_1, idx_2 # A is container, B is contained
-        else:
-            idx_a, idx_b = idx_2, idx_1
-            
-        poly_a = modified_polygons[idx_a]
-        poly_b = modified_polygons[idx_b]
-        
-        scale_factor = min(0.5, math.sqrt(poly_a.area / poly_b.area) * 0.5)
-        scaled_poly_b = affinity.scale(poly_b, xfact=scale_factor, yfact=scale_factor, origin='center')
-
-        target_point = poly_a.representative_point()
-        source_centroid = scaled_poly_b.centroid
-        x_off = target_point.x - source_centroid.x
-        y_off = target_point.y - source_centroid.y
-        
-        final_poly_b = affinity.translate(scaled_poly_b, xoff=x_off, yoff=y_off)
-        modified_polygons[idx_b] = final_poly_b
-        
-    return modified_polygons
-
 def move_line_into_poly(container_poly, line_to_move):
     """Moves and scales a single line to be contained within a polygon."""
     # Scale down the line to ensure it fits
@@ -347,7 +204,7 @@ def save_geometries_to_postgis(
     """Connects to PostGIS and saves all geometry types."""
     conn = None
     try:
-        print("\nConnecting to the PostGIS database...")
+        logger.info("Connecting to the PostGIS database...")
         conn = psycopg2.connect(**db_config)
         cur = conn.cursor()
         create_table_sql = """
@@ -358,10 +215,10 @@ def save_geometries_to_postgis(
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );"""
         cur.execute(create_table_sql)
-        print("Clearing old data from the table...")
+        logger.info("Clearing old data from the table...")
         cur.execute("DELETE FROM generated_geometries;")
         
-        print(f"Inserting {len(polygons)} polygons...")
+        logger.info("Inserting %d polygons...", len(polygons))
         polygon_style = "regular" if is_regular_polygon else "irregular"
         for poly in polygons:
             cur.execute(
@@ -370,7 +227,7 @@ def save_geometries_to_postgis(
                 (poly.wkt, polygon_style, len(poly.exterior.coords) - 1, poly.area)
             )
         
-        print(f"Inserting {len(points)} points...")
+        logger.info("Inserting %d points...", len(points))
         for point in points:
             cur.execute(
                 """INSERT INTO generated_geometries (geom, geom_type, style, vertices, area)
@@ -378,7 +235,7 @@ def save_geometries_to_postgis(
                 (point.wkt,)
             )
 
-        print(f"Inserting {len(straight_lines)} straight lines...")
+        logger.info("Inserting %d straight lines...", len(straight_lines))
         for line in straight_lines:
             cur.execute(
                 """INSERT INTO generated_geometries (geom, geom_type, style, vertices, area)
@@ -386,7 +243,7 @@ def save_geometries_to_postgis(
                 (line.wkt, len(line.coords))
             )
         
-        print(f"Inserting {len(curly_lines)} curly lines...")
+        logger.info("Inserting %d curly lines...", len(curly_lines))
         for line in curly_lines:
             cur.execute(
                 """INSERT INTO generated_geometries (geom, geom_type, style, vertices, area)
@@ -395,15 +252,17 @@ def save_geometries_to_postgis(
             )
 
         conn.commit()
-        print("Successfully saved all geometries to the database.")
+        logger.info("Successfully saved all geometries to the database.")
     except (Exception, psycopg2.DatabaseError) as error:
-        print(f"Database error: {error}")
+        logger.error("Database error: %s", error)
     finally:
         if conn is not None:
             conn.close()
-            print("Database connection closed.")
+            logger.info("Database connection closed.")
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
     # --- Configuration ---
     CANVAS_BOUNDS = (0, 0, 100, 100)
     SAVE_TO_DB = False
@@ -442,7 +301,7 @@ if __name__ == '__main__':
         raise ValueError(f"Not enough polygons ({NUM_POLYGONS}) to create all requested pairs ({total_polygons_needed} needed).")
 
 
-    print(f"Generating {NUM_POLYGONS} random polygons...")
+    logger.info("Generating %d random polygons...", NUM_POLYGONS)
     initial_polygons = generate_random_polygons(
         canvas_bounds=CANVAS_BOUNDS,
         num_polygons=NUM_POLYGONS,
@@ -462,17 +321,21 @@ if __name__ == '__main__':
     overlapping_indices = indices[off_1 : off_1 + NUM_OVERLAPPING_PAIRS*2]
     off_2 = off_1 + NUM_OVERLAPPING_PAIRS*2
     contained_indices = indices[off_2 : off_2 + NUM_CONTAINED_PAIRS*2]
-    # off_3 = off_2 + NUM_TOUCHING_PAIRS*2
-    # touched_indices = indices[off_3 : off_3 + NUM_TOUCHING_PAIRS*2]
-
-    modified_polygons = create_aligned_edges(initial_polygons, aligned_indices)
-    modified_polygons = create_overlapping_pairs(modified_polygons, overlapping_indices)
-    modified_polygons = create_contained_pairs(modified_polygons, contained_indices)
-    # final_polygons = create_touching_pairs(modified_polygons, touched_indices)    # TODO: Need to fix touching function
+    off_3 = off_2 + NUM_CONTAINED_PAIRS*2
+    touched_indices = indices[off_3 : off_3 + NUM_TOUCHING_PAIRS*2]
+
+    # Pairs are forced by the batched engine of faron.synthetic_polygons
+    modified_polygons = initial_polygons
+    for relation, pair_indices in (('border', aligned_indices), ('overlap', overlapping_indices),
+                                   ('within', contained_indices), ('touch', touched_indices)):
+        modified_polygons, forced = force_pairs(modified_polygons, np.reshape(pair_indices, (-1, 2)), relation)
+        if not forced.all():
+            logger.warning("Could not force '%s' on %d pair(s).", relation, (~forced).sum())
+    modified_polygons = list(modified_polygons)
 
     # --- Repositioning to satisfy disjoint condition ---
-    print("Repositioning free polygons to ensure they are disjoint...")
-    involved_indices_set = set(aligned_indices) | set(overlapping_indices) | set(contained_indices)
+    logger.info("Repositioning free polygons to ensure they are disjoint...")
+    involved_indices_set = set(aligned_indices) | set(overlapping_indices) | set(contained_indices) | set(touched_indices)
     free_indices = [i for i in range(NUM_POLYGONS) if i not in involved_indices_set]
     
     involved_polygons_list = [modified_polygons[i] for i in involved_indices_set]
@@ -513,14 +376,12 @@ if __name__ == '__main__':
             attempt += 1
             
         if not is_placed:
-            print(f"Warning: Could not find a disjoint spot for polygon {free_idx} after {MAX_ATTEMPTS_PER_PLACEMENT} attempts. Placing it anyway.")
+            logger.warning("Could not find a disjoint spot for polygon %d after %d attempts. Placing it anyway.", free_idx, MAX_ATTEMPTS_PER_PLACEMENT)
             modified_polygons[free_idx] = poly_to_check # Add its last position
             placed_free_polygons_so_far.append(poly_to_check)
 
     # # --- Generate Points and Lines (as before) ---
-    # print(f"Generating {NUM_POINTS} random points...")
     # new_points = generate_random_points(CANVAS_BOUNDS, NUM_POINTS)
-    # print(f"Generating {NUM_LINES} random lines...")
     # straight_lines, curly_lines = generate_random_lines(
     #     CANVAS_BOUNDS, NUM_LINES, STRAIGHT_LINES_ONLY, 
     #     LINE_LENGTH_RANGE, LINE_SEGMENT_RANGE
@@ -534,7 +395,7 @@ if __name__ == '__main__':
     num_contained_lines = 0
     num_contained_points = 0
 
-    print(f"Generating and placing {NUM_LINES} lines...")
+    logger.info("Generating and placing %d lines...", NUM_LINES)
     for _ in range(NUM_LINES):
         if random.random() < LINE_CONTAINMENT_PROBABILITY:
             container_poly = random.choice(modified_polygons)
@@ -565,9 +426,9 @@ if __name__ == '__main__':
                 attempt += 1
             
             if not is_placed:
-                 print(f"Warning: Could not find disjoint spot for a free line. Skipping.")
+                 logger.warning("Could not find disjoint spot for a free line. Skipping.")
 
-    print(f"Generating and placing {NUM_POINTS} points...")
+    logger.info("Generating and placing %d points...", NUM_POINTS)
     for _ in range(NUM_POINTS):
         if random.random() < POINT_CONTAINMENT_PROBABILITY:
             container_poly = random.choice(modified_polygons)
@@ -593,14 +454,14 @@ if __name__ == '__main__':
                 attempt += 1
             
             if not is_placed:
-                print(f"Warning: Could not find disjoint spot for a free point. Skipping.")
+                logger.warning("Could not find disjoint spot for a free point. Skipping.")
 
     # --- Sorting for Plotting ---
     all_geometries = modified_polygons + modified_lines + modified_points
     modified_polygons.sort(key=lambda p: p.area, reverse=True)
     
     # --- Plotting ---
-    print(f"Generated {len(all_geometries)} total geometries.")
+    logger.info("Generated %d total geometries.", len(all_geometries))
     title = (f"Polys: {len(modified_polygons)} ({NUM_ALIGNED_PAIRS} Aligned, {NUM_OVERLAPPING_PAIRS} Overlap, {NUM_CONTAINED_PAIRS} Contained | "
              f"Lines: {len(modified_lines)} | Points: {len(modified_points)}")
     plot_geometries(all_geometries, CANVAS_BOUNDS, title_info=title)
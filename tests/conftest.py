@@ -0,0 +1,13 @@
+"""
+Shared setup of the test suite: puts the repository root on the import
+path and selects a non-interactive matplotlib backend before tmp.py
+imports pyplot.
+"""
+import os
+import sys
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
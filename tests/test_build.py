@@ -0,0 +1,213 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from faron import build
+
+class Builder:
+    """Cheap scene builder that records the indices it built and can crash at one of them."""
+    def __init__(self, crash_at=None):
+        self.built = []
+        self.crash_at = crash_at
+
+    def __call__(self, idx):
+        if idx == self.crash_at:
+            raise RuntimeError(f"crash at scene {idx}")
+        self.built.append(idx)
+        return {'index': idx, 'value': idx * idx}
+
+@pytest.fixture
+def builder(monkeypatch):
+    def register(crash_at=None):
+        scene_builder = Builder(crash_at)
+        monkeypatch.setitem(build.SCENE_BUILDERS, 'test', scene_builder)
+        return scene_builder
+    return register
+
+def scene_indices(save_dir):
+    return [scene['index'] for scene in build.iter_built_scenes(save_dir)]
+
+def test_crashed_build_resumes_after_last_finished_shard(tmp_path, builder):
+    builder(crash_at=25)
+    with pytest.raises(RuntimeError):
+        build.build_dataset(str(tmp_path), 'test', 40, shard_size=10)
+    assert build.BuildManifest(str(tmp_path), 'test').completed() == [(0, 10), (10, 20)]
+    # The shard being written when the build died never appears under its name
+    assert sorted(os.listdir(tmp_path / 'scenes')) == [
+        'shard_000000000_000000010.jsonl', 'shard_000000010_000000020.jsonl', 'shard_000000020_000000030.jsonl.tmp'
+    ]
+
+    resumed = builder()
+    manifest = build.build_dataset(str(tmp_path), 'test', 40, shard_size=10)
+
+    assert resumed.built == list(range(20, 40))
+    assert manifest.num_scenes() == 40
+    assert scene_indices(str(tmp_path)) == list(range(40))
+
+def test_finished_build_is_a_no_op_and_extends_by_new_shards(tmp_path, builder):
+    builder()
+    build.build_dataset(str(tmp_path), 'test', 15, shard_size=10)
+
+    rerun = builder()
+    build.build_dataset(str(tmp_path), 'test', 15, shard_size=10)
+    assert rerun.built == []
+
+    # The stored shard size wins over a new one
+    extended = builder()
+    manifest = build.build_dataset(str(tmp_path), 'test', 32, shard_size=4)
+    assert extended.built == list(range(15, 32))
+    assert manifest.completed() == [(0, 10), (10, 15), (15, 20), (20, 30), (30, 32)]
+    assert scene_indices(str(tmp_path)) == list(range(32))
+
+def test_corrupt_shard_is_rebuilt(tmp_path, builder):
+    builder()
+    build.build_dataset(str(tmp_path), 'test', 20, shard_size=10)
+    shard = tmp_path / 'scenes' / 'shard_000000010_000000020.jsonl'
+    original = shard.read_bytes()
+    # Same size, different content: only the checksum notices
+    shard.write_bytes(original.replace(b'"value": 100', b'"value": 999'))
+
+    rebuilt = builder()
+    build.build_dataset(str(tmp_path), 'test', 20, shard_size=10)
+    assert rebuilt.built == []
+    build.build_dataset(str(tmp_path), 'test', 20, shard_size=10, verify=True)
+    assert rebuilt.built == list(range(10, 20))
+    assert shard.read_bytes() == original
+
+def test_manifest_of_another_mode_is_refused(tmp_path, builder):
+    builder()
+    build.build_dataset(str(tmp_path), 'test', 5, shard_size=5)
+
+    with pytest.raises(ValueError):
+        build.build_dataset(str(tmp_path), 'map', 5)
+
+def test_unregistered_mode_is_refused(tmp_path):
+    with pytest.raises(ValueError, match="mix"):
+        build.build_dataset(str(tmp_path), 'mix', 5)
+
+def test_polygon_scenes_are_reproducible(tmp_path):
+    build.build_dataset(str(tmp_path), 'polygon', 3, shard_size=3)
+    scenes = list(build.iter_built_scenes(str(tmp_path)))
+
+    assert [scene['index'] for scene in scenes] == [0, 1, 2]
+    assert all(scene['geometries'] and scene['image'] is None for scene in scenes)
+    assert json.dumps(build.polygon_scene(1)) == json.dumps(scenes[1])
+
+def test_polygon_build_needs_only_the_package(tmp_path):
+    # Run outside the repository, so the tmp.py script is not importable by accident
+    script = (
+        "import sys\n"
+        "from faron import build\n"
+        f"build.build_dataset({str(tmp_path / 'dataset')!r}, 'polygon', 1)\n"
+        "print(sorted({'tmp', 'computing', 'matplotlib', 'psycopg2'} & set(sys.modules)))\n"
+    )
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [repo_root, os.environ.get('PYTHONPATH')])))
+    result = subprocess.run([sys.executable, '-c', script], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == '[]'
+
+def shard_checksums(manifest):
+    return {shard['file']: shard['sha256'] for shard in manifest.shards.values()}
+
+def test_sharded_build_merges_into_the_single_node_build(tmp_path, builder):
+    builder()
+    single = build.build_dataset(str(tmp_path / 'single'), 'test', 47, shard_size=5)
+
+    nodes = []
+    for shard_index in range(3):
+        nodes.append(builder())
+        build.build_dataset(str(tmp_path / 'sharded'), 'test', 47, shard_size=5, shard_index=shard_index, num_shards=3)
+    merged = build.merge_manifests(str(tmp_path / 'sharded'))
+
+    # Every scene is built exactly once, by the node owning its chunk
+    assert sorted(idx for node in nodes for idx in node.built) == list(range(47))
+    assert nodes[1].built[:5] == list(range(5, 10))
+    assert shard_checksums(merged) == shard_checksums(single)
+    assert scene_indices(str(tmp_path / 'sharded')) == list(range(47))
+
+def test_nodes_skip_scenes_of_the_merged_build(tmp_path, builder):
+    builder()
+    for shard_index in range(2):
+        build.build_dataset(str(tmp_path), 'test', 20, shard_size=5, shard_index=shard_index, num_shards=2)
+    build.merge_manifests(str(tmp_path))
+
+    # Extending with a different node count only builds the new scenes
+    nodes = []
+    for shard_index in range(3):
+        nodes.append(builder())
+        build.build_dataset(str(tmp_path), 'test', 30, shard_size=5, shard_index=shard_index, num_shards=3)
+    merged = build.merge_manifests(str(tmp_path))
+
+    assert sorted(idx for node in nodes for idx in node.built) == list(range(20, 30))
+    assert merged.num_scenes() == 30
+    assert scene_indices(str(tmp_path)) == list(range(30))
+
+def test_merge_reports_unfinished_nodes(tmp_path, builder, caplog):
+    builder()
+    build.build_dataset(str(tmp_path), 'test', 20, shard_size=5, shard_index=1, num_shards=2)
+
+    merged = build.merge_manifests(str(tmp_path))
+
+    assert merged.completed() == [(5, 10), (15, 20)]
+    assert "gap" in caplog.text
+
+def test_merge_refuses_disagreeing_nodes(tmp_path, builder):
+    builder()
+    build.build_dataset(str(tmp_path), 'test', 20, shard_size=5, shard_index=0, num_shards=2)
+    build.build_dataset(str(tmp_path), 'test', 20, shard_size=4, shard_index=1, num_shards=3)
+
+    with pytest.raises(ValueError):
+        build.merge_manifests(str(tmp_path))
+
+def repeating_scene(idx):
+    """Stored polygon scene that repeats every third index, under other names and in another order."""
+    squares = [f'POLYGON (({x} 0, {x + 1} 0, {x + 1} 1, {x} 1, {x} 0))' for x in range(idx % 3 + 2)]
+    if idx % 2:
+        squares.reverse()
+    return {
+        'index': idx,
+        'canvas_bounds': [0, 0, 10, 10],
+        'image': None,
+        'geometries': [{'name': f'POLYGON_{idx}_{i}', 'style': 'regular', 'wkt': wkt} for i, wkt in enumerate(squares)],
+        'relationships': [],
+        'question': None,
+    }
+
+@pytest.fixture
+def repeating(monkeypatch):
+    monkeypatch.setitem(build.SCENE_BUILDERS, 'test', repeating_scene)
+
+def test_dedup_build_drops_repeated_scenes(tmp_path, repeating):
+    manifest = build.build_dataset(str(tmp_path), 'test', 9, shard_size=3, dedup=True)
+
+    assert scene_indices(str(tmp_path)) == [0, 1, 2]
+    assert manifest.num_scenes() == 3
+    assert sum(shard['duplicates'] for shard in manifest.shards.values()) == 6
+    assert os.path.exists(tmp_path / 'scene_fingerprints.npy')
+
+    # The fingerprints of the earlier run are kept next to the manifest
+    extended = build.build_dataset(str(tmp_path), 'test', 12, shard_size=3, dedup=True)
+    assert extended.num_scenes() == 3
+
+def test_dedup_build_rebuilds_dropped_shards(tmp_path, repeating):
+    build.build_dataset(str(tmp_path), 'test', 6, shard_size=3, dedup=True)
+    os.remove(tmp_path / 'scenes' / 'shard_000000000_000000003.jsonl')
+
+    # The lost scenes are built again rather than dropped as duplicates of themselves
+    manifest = build.build_dataset(str(tmp_path), 'test', 6, shard_size=3, dedup=True)
+    assert scene_indices(str(tmp_path)) == [0, 1, 2]
+    assert manifest.num_scenes() == 3
+
+def test_dedup_build_keeps_node_fingerprints_apart(tmp_path, repeating):
+    for shard_index in range(2):
+        build.build_dataset(str(tmp_path), 'test', 6, shard_size=3, shard_index=shard_index, num_shards=2, dedup=True)
+    build.merge_manifests(str(tmp_path))
+
+    # Each node deduplicates its own scenes only
+    assert scene_indices(str(tmp_path)) == [0, 1, 2, 3, 4, 5]
+    assert os.path.exists(tmp_path / 'manifests' / 'node_0001_of_0002_scene_fingerprints.npy')
@@ -0,0 +1,78 @@
+import os
+import random
+
+import tmp
+from faron.dedup import FingerprintSet, SceneDeduplicator, scene_fingerprints
+from faron.synthetic_polygons import (
+    generate_scene, name_scene_geometries, sample_disjoint_pairs, scene_canvas, stage_relate,
+)
+
+def seeded_scene(seed):
+    random.seed(seed)
+    return generate_scene()
+
+def with_fresh_disjoint_sample(scene, disjoint_rate=0.5):
+    """The scene with its sampled 'disjoint' pairs drawn again, as a re-run of the generator would."""
+    _, _, _, all_named_geoms = name_scene_geometries(scene)
+    relationships = [r for r in scene["relationships"] if r[2] != "disjoint"]
+    return dict(scene, relationships=relationships + sample_disjoint_pairs(list(all_named_geoms), set(), disjoint_rate))
+
+def fingerprint(scene):
+    _, _, _, all_named_geoms = name_scene_geometries(scene)
+    return scene_fingerprints(all_named_geoms, scene["relationships"], None, scene_canvas(scene))[0]
+
+def record(scene, index=0):
+    return stage_relate({"index": index, "scene": scene, "question": None})
+
+def test_fingerprint_set_merges_and_reloads(tmp_path):
+    path = str(tmp_path / "fingerprints.npy")
+    fingerprints = FingerprintSet(path, flush_every=2)
+
+    assert fingerprints.add(2**64 - 1) and fingerprints.add(7)
+    # The second add flushed both into the sorted array on disk
+    assert not fingerprints.pending and os.path.exists(path)
+    assert fingerprints.add(3) and not fingerprints.add(7)
+
+    reloaded = FingerprintSet(path)
+    assert 2**64 - 1 in reloaded and 7 in reloaded
+    assert 3 not in reloaded and len(reloaded) == 2
+
+def test_fingerprint_ignores_disjoint_sampling():
+    scene = seeded_scene(0)
+    first, second = with_fresh_disjoint_sample(scene), with_fresh_disjoint_sample(scene)
+    assert first["relationships"] != second["relationships"]
+
+    assert fingerprint(first) == fingerprint(second)
+
+def test_fingerprint_ignores_relation_order():
+    scene = seeded_scene(1)
+    reordered = dict(scene, relationships=[(b, a, rel) if rel not in ("within", "contains") else (a, b, rel)
+                                           for a, b, rel in reversed(scene["relationships"])])
+
+    assert fingerprint(reordered) == fingerprint(scene)
+
+def test_fingerprint_separates_different_scenes():
+    assert fingerprint(seeded_scene(2)) != fingerprint(seeded_scene(3))
+
+def test_fingerprint_grid_follows_the_scene_canvas():
+    scene = seeded_scene(4)
+    grown = dict(scene, canvas_bounds=tmp.large_scene_canvas(10000))
+
+    checked = record(grown)
+    SceneDeduplicator().check(checked)
+
+    assert checked["fingerprints"]["scene"] == f"{fingerprint(grown):016x}"
+    assert fingerprint(grown) != fingerprint(scene)
+
+def test_pipeline_drops_repeated_scenes(tmp_path):
+    scene = seeded_scene(5)
+    repeats = lambda placement_budgets: with_fresh_disjoint_sample(scene)
+    dedup = SceneDeduplicator(str(tmp_path))
+
+    written = tmp.run_pipeline(4, str(tmp_path), render_workers=1, render_images=False, scene_fn=repeats, dedup=dedup)
+
+    assert len(written) == 1
+    assert dedup.summary()["duplicate_scenes"] == 3
+    # A later run into the same directory knows the scene
+    assert SceneDeduplicator(str(tmp_path)).check(record(with_fresh_disjoint_sample(scene))) == "scene"
+    assert os.path.exists(os.path.join(str(tmp_path), "scene_fingerprints.npy"))
@@ -0,0 +1,23 @@
+import pytest
+
+pytest.importorskip("torch")
+
+from faron import FARON
+from faron.build import build_dataset
+
+def test_map_scene_without_image_is_rasterized(tmp_path):
+    build_dataset(str(tmp_path), 'map', 2, shard_size=2)
+    dataset = FARON(save_dir=str(tmp_path), mode='map', img_count=2, resolution=64)
+
+    assert dataset.data[0]['image'] is None
+    image = dataset.get_image(0)
+    assert image.shape == (64, 64, 3)
+    # Served from the cache on the next read
+    assert dataset.get_image(0) is image
+
+def test_polygon_dataset_is_built_on_construction(tmp_path):
+    dataset = FARON(save_dir=str(tmp_path), mode='polygon', img_count=2, resolution=64)
+
+    assert len(dataset) == 2
+    assert dataset[1]['image'].shape == (64, 64, 3)
+    assert dataset[1]['relationships']
@@ -0,0 +1,62 @@
+import json
+import os
+
+import numpy as np
+import pytest
+import shapely
+
+import tmp
+from faron import stats
+from faron.synthetic_polygons import _config
+
+def read_chunks(output_dir, files, kind):
+    rows = []
+    for name in files:
+        with open(os.path.join(output_dir, name)) as chunk:
+            rows.extend(json.load(chunk)[kind])
+    return rows
+
+def test_large_scene_is_written_in_chunks(tmp_path):
+    tmp.random.seed(0)
+    manifest = tmp.generate_large_scene(900, str(tmp_path), chunk_size=50, workers=1, ram_budget_mb=None)
+
+    with open(tmp_path / "manifest.json") as stored:
+        assert json.load(stored)["geometry_chunks"] == manifest["geometry_chunks"]
+    assert len(manifest["geometry_chunks"]) > 1 and len(manifest["relationship_chunks"]) > 1
+
+    geometries = read_chunks(tmp_path, manifest["geometry_chunks"], "geometries")
+    relationships = read_chunks(tmp_path, manifest["relationship_chunks"], "relationships")
+    assert len(geometries) == sum(manifest["counts"].values())
+    assert len(relationships) == sum(manifest["relationship_counts"].values())
+
+    # The placed polygons are pairwise disjoint, and no relationship says otherwise
+    polygons = shapely.from_wkt([g["wkt"] for g in geometries if g["type"] == "Polygon"])
+    assert len(polygons) == manifest["counts"]["polygons"] > 0
+    left, right = shapely.STRtree(polygons).query(polygons, predicate="intersects")
+    assert (left == right).all()
+    assert not any(a.startswith("POLYGON_") and b.startswith("POLYGON_") for a, b, _ in relationships)
+
+def test_place_disjoint_array_never_places_intersecting_geometries():
+    rng = np.random.default_rng(1)
+    canvas_bounds = (0, 0, 200, 200)
+    placed = tmp.place_disjoint_array(
+        lambda n: tmp.generate_polygon_array(canvas_bounds, n, _config.VERTEX_RANGE, _config.RADIUS_RANGE, False, rng), 60, 10)
+
+    assert 0 < len(placed) <= 60
+    left, right = shapely.STRtree(placed).query(placed, predicate="intersects")
+    assert (left == right).all()
+
+def test_scene_over_the_ram_budget_is_refused_up_front(tmp_path):
+    with pytest.raises(MemoryError, match="RAM budget"):
+        tmp.generate_large_scene(10**6, str(tmp_path), ram_budget_mb=1)
+    assert not os.listdir(tmp_path)
+
+def test_growing_past_the_ram_budget_aborts(tmp_path, monkeypatch):
+    # Resident size as measured before and after placement
+    sizes = iter([100.0, 10_000.0])
+    fake_memory_mb = lambda: next(sizes)
+    monkeypatch.setattr(tmp, "current_memory_mb", fake_memory_mb)
+    monkeypatch.setattr(stats, "current_memory_mb", fake_memory_mb)
+    with pytest.raises(MemoryError, match="placing geometries"):
+        tmp.generate_large_scene(200, str(tmp_path), ram_budget_mb=500, workers=1)
+    assert not (tmp_path / "manifest.json").exists()
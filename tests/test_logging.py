@@ -0,0 +1,49 @@
+import io
+import json
+import logging
+
+import pytest
+
+from faron import logs
+
+@pytest.fixture
+def exit_hooks(monkeypatch):
+    """The atexit registry, without touching the interpreter's."""
+    hooks = []
+    monkeypatch.setattr(logs.atexit, "register", hooks.append)
+    monkeypatch.setattr(logs.atexit, "unregister", lambda fn: hooks.remove(fn) if fn in hooks else None)
+    monkeypatch.setattr(logs, "_exit_report", None)
+    yield hooks
+    for name in ("faron", "tmp"):
+        logging.getLogger(name).handlers[:] = []
+        logging.getLogger(name).propagate = True
+
+def test_reconfiguring_keeps_one_exit_report(exit_hooks):
+    logs.configure_logging(stream=io.StringIO())
+    rate_limit = logs.configure_logging(stream=io.StringIO())
+    assert len(exit_hooks) == 1
+    assert exit_hooks[0].args == (rate_limit,)
+
+def test_warnings_are_rate_limited_and_reported(exit_hooks):
+    stream = io.StringIO()
+    logs.configure_logging(fmt="json", warning_limit=2, stream=stream)
+    for i in range(5):
+        logging.getLogger("faron.synthetic_polygons").warning("Could not place object %d", i)
+    exit_hooks[0]()
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [r["level"] for r in records] == ["WARNING", "WARNING", "INFO"]
+    assert records[1]["message"].endswith("(further occurrences suppressed)")
+    assert records[2]["suppressed"] == 3
+    assert records[2]["template"] == "Could not place object %d"
+
+def test_script_loggers_share_the_handler_and_limit(exit_hooks):
+    stream = io.StringIO()
+    logs.configure_logging(fmt="json", warning_limit=1, stream=stream, names=("faron", "tmp"))
+    logging.getLogger("tmp.scene").info("Scene %d written", 0, extra={"fields": {"scene": 0}})
+    logging.getLogger("faron.build").warning("Shard %s is missing", "a")
+    logging.getLogger("faron.build").warning("Shard %s is missing", "b")
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [(r["logger"], r["level"]) for r in records] == [("tmp.scene", "INFO"), ("faron.build", "WARNING")]
+    assert records[0]["scene"] == 0
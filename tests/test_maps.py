@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+import shapely
+
+from faron.synthetic_maps import generate_map
+
+@pytest.fixture(scope="module", params=range(3))
+def scene_map(request):
+    return generate_map(seed=request.param)
+
+def test_same_seed_same_map():
+    first, second = generate_map(seed=11), generate_map(seed=11)
+    for key in ("parcels", "roads", "pois"):
+        assert shapely.equals_exact(first[key], second[key], tolerance=0).all()
+    assert first["relationships"] == second["relationships"]
+    assert not shapely.equals(first["parcels"], generate_map(seed=12)["parcels"]).all()
+
+def test_parcels_tile_without_overlaps(scene_map):
+    parcels = scene_map["parcels"]
+    union = shapely.union_all(parcels)
+
+    assert union.geom_type == "Polygon"
+    assert union.area == pytest.approx(shapely.area(parcels).sum())
+    assert shapely.box(*scene_map["canvas_bounds"]).contains(union)
+    # Neighbours meet along their borders only
+    tree = shapely.STRtree(parcels)
+    left, right = tree.query(parcels, predicate="intersects")
+    keep = left < right
+    assert not shapely.overlaps(parcels[left[keep]], parcels[right[keep]]).any()
+
+def test_roads_run_along_parcel_edges(scene_map):
+    borders = shapely.union_all(shapely.boundary(scene_map["parcels"]))
+    roads = scene_map["roads"]
+
+    assert len(roads) > 0
+    assert shapely.covered_by(roads, borders).all()
+    # Every road vertex is a parcel vertex
+    parcel_vertices = {tuple(xy) for xy in shapely.get_coordinates(scene_map["parcels"]).tolist()}
+    assert all(tuple(xy) in parcel_vertices for xy in shapely.get_coordinates(roads).tolist())
+
+def test_pois_lie_strictly_inside_their_parcel(scene_map):
+    geoms = dict(zip(scene_map["names"], np.concatenate([scene_map["parcels"], scene_map["roads"], scene_map["pois"]])))
+    within = {a: b for a, b, relation in scene_map["relationships"] if relation == "within"}
+
+    assert len(within) == len(scene_map["pois"])
+    for poi, parcel in within.items():
+        assert shapely.contains_properly(geoms[parcel], geoms[poi])
+        others = [g for name, g in geoms.items() if name.startswith("POLYGON_") and name != parcel]
+        assert not shapely.intersects(others, geoms[poi]).any()
@@ -0,0 +1,92 @@
+import numpy as np
+import shapely
+from shapely.geometry import Point
+
+from faron.synthetic_polygons import (
+    PlacementBudget, ScenePlacement, candidate_stream, place_in_free_space, sample_region,
+)
+from faron.synthetic_polygons import _config
+
+CANVAS_BOUNDS = (0, 0, 100, 100)
+
+def nothing_is_free(candidates):
+    return np.zeros(len(candidates), dtype=bool)
+
+def points(k):
+    return np.asarray([Point(50, 50)] * k, dtype=object)
+
+def test_budget_follows_the_acceptance_rate():
+    budget = PlacementBudget()
+    assert budget.rate() == 0.5
+    # 1 - 0.5^5 > 0.95: five attempts, the floor
+    assert budget.max_attempts() == _config.PLACEMENT_MIN_ATTEMPTS
+    assert budget.batch_size() == 2
+
+    for _ in range(50):
+        budget.record(20, 0)
+    assert budget.use_free_space()
+    assert budget.max_attempts() == _config.MAX_ATTEMPTS_PER_PLACEMENT
+    assert budget.batch_size() == _config.PLACEMENT_MAX_BATCH
+
+def test_fixed_budget_without_adaptive_placement(monkeypatch):
+    monkeypatch.setattr(_config, "ADAPTIVE_PLACEMENT", False)
+    budget = PlacementBudget()
+    assert budget.max_attempts() == _config.MAX_ATTEMPTS_PER_PLACEMENT
+    assert budget.batch_size() == 1
+    assert not budget.use_free_space()
+
+def test_search_counts_attempts_up_to_the_first_hit():
+    free_at = iter([False, False, False, True])
+    geom, attempts = PlacementBudget().search(
+        points, lambda candidates: np.array([next(free_at) for _ in candidates]), max_attempts=10
+    )
+    assert geom is not None
+    assert attempts == 4
+
+def test_candidate_stream_hands_out_the_initial_candidates_first():
+    make_candidates = candidate_stream(["a", "b", "c"], lambda k: ["new"] * k)
+    assert list(make_candidates(2)) == ["a", "b"]
+    assert list(make_candidates(3)) == ["c", "new", "new"]
+
+def test_sampled_points_lie_in_the_region():
+    region = shapely.box(0, 0, 10, 10).union(shapely.box(20, 0, 30, 10))
+    coords = sample_region(region, 200, np.random.default_rng(0))
+
+    assert shapely.covers(region, shapely.points(coords)).all()
+    assert sample_region(shapely.Polygon(), 5, np.random.default_rng(0)) is None
+
+def test_free_space_placement_shrinks_into_a_tight_gap():
+    occupied = [shapely.box(0, 0, 100, 45), shapely.box(0, 55, 100, 100)]
+    geom, shrinks = place_in_free_space(Point(50, 50).buffer(8), occupied, CANVAS_BOUNDS,
+                                        np.random.default_rng(0), max_shrinks=3)
+    assert geom is not None and shrinks > 0
+    assert not shapely.intersects(np.asarray(occupied, dtype=object), geom).any()
+
+def test_budgets_are_per_scene_unless_handed_over():
+    placement = ScenePlacement(CANVAS_BOUNDS)
+    placement.place("free_polygon", points, nothing_is_free, lambda: [])
+    rate = placement.budgets["free_polygon"].rate()
+    assert rate < PlacementBudget().rate()
+
+    # A new scene starts from the prior ...
+    assert ScenePlacement(CANVAS_BOUNDS).budgets["free_polygon"].rate() == PlacementBudget().rate()
+    # ... unless it is given the budgets of the earlier one
+    assert ScenePlacement(CANVAS_BOUNDS, placement.budgets).budgets["free_polygon"].rate() == rate
+
+def test_empty_candidate_generator_fails_the_placement():
+    placement = ScenePlacement(CANVAS_BOUNDS)
+    empty = lambda k: np.empty(0, dtype=object)
+
+    assert placement.place("free_polygon", empty, nothing_is_free, lambda: []) is None
+    assert placement.decisions["free_polygon"]["failed"] == 1
+
+def test_free_space_fallback_places_what_rejection_sampling_misses():
+    placement = ScenePlacement(CANVAS_BOUNDS)
+    occupied = [Point(50, 50).buffer(30)]
+    geom = placement.place("free_polygon", lambda k: np.asarray([Point(50, 50).buffer(5)] * k, dtype=object),
+                           nothing_is_free, lambda: occupied)
+
+    assert geom is not None
+    assert not geom.intersects(occupied[0])
+    assert placement.decisions["free_polygon"]["free_space"] == 1
+    assert placement.summary()["free_polygon"]["mode"] == "rejection"
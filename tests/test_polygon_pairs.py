@@ -0,0 +1,74 @@
+import pytest
+
+import random
+
+from faron.synthetic_polygons import (
+    _config, build_polygon_relations, generate_random_polygons, plan_polygon_relations, validate_polygon_relations,
+)
+from faron.synthetic_polygons._shapes import generate_one_line
+from faron.synthetic_polygons._pairs import POLYGON_PAIR_BUILDERS, create_aligned_edges
+from faron.synthetic_polygons._objects import create_crossing_lines, create_lines_on_poly_borders
+from faron.synthetic_polygons._force_topo import BORDER_MAX_SCALE
+
+def random_polygons(num_polygons, seed):
+    random.seed(seed)
+    return generate_random_polygons((0, 0, 1000, 1000), num_polygons, *_config.VERTEX_RANGE, *_config.RADIUS_RANGE)
+
+@pytest.mark.parametrize("relation", list(POLYGON_PAIR_BUILDERS))
+def test_pair_builders_force_their_relation(relation):
+    polygons = random_polygons(100, seed=1)
+    indices = list(range(len(polygons) - len(polygons) % 2))
+
+    built = POLYGON_PAIR_BUILDERS[relation](polygons, indices)
+
+    assert validate_polygon_relations(built, {relation: indices}) == {}
+    # The input list is left alone unless built in place
+    assert built is not polygons
+
+def test_planned_relations_hold_after_separation():
+    polygons = random_polygons(16, seed=2)
+    plan = plan_polygon_relations(len(polygons), {relation: 2 for relation in POLYGON_PAIR_BUILDERS})
+
+    built = build_polygon_relations(polygons, plan, (0, 0, 1000, 1000), _config.MAX_ATTEMPTS_PER_PLACEMENT)
+
+    assert validate_polygon_relations(built, plan) == {}
+
+def test_aligned_pairs_keep_their_size():
+    polygons = random_polygons(200, seed=5)
+    built = create_aligned_edges(polygons, list(range(len(polygons))))
+
+    for original, moved in zip(polygons, built):
+        assert 1 - 1e-9 <= moved.area / original.area <= BORDER_MAX_SCALE ** 2 + 1e-9
+
+def test_built_pairs_stay_on_the_canvas():
+    canvas_bounds = _config.CANVAS_BOUNDS
+    random.seed(6)
+    for _ in range(10):
+        polygons = generate_random_polygons(canvas_bounds, 8, *_config.VERTEX_RANGE, *_config.RADIUS_RANGE)
+        plan = plan_polygon_relations(len(polygons), {"aligned": 2, "touching": 1})
+        built = build_polygon_relations(polygons, plan, canvas_bounds, _config.MAX_ATTEMPTS_PER_PLACEMENT)
+
+        for idx in plan["aligned"] + plan["touching"]:
+            min_x, min_y, max_x, max_y = built[idx].bounds
+            assert canvas_bounds[0] <= min_x and max_x <= canvas_bounds[2]
+            assert canvas_bounds[1] <= min_y and max_y <= canvas_bounds[3]
+
+def test_crossing_lines_cross():
+    random.seed(3)
+    for _ in range(20):
+        line_a = generate_one_line(_config.CANVAS_BOUNDS, True, _config.LINE_LENGTH_RANGE, _config.LINE_SEGMENT_RANGE)
+        line_b = generate_one_line(_config.CANVAS_BOUNDS, True, _config.LINE_LENGTH_RANGE, _config.LINE_SEGMENT_RANGE)
+        line_a, line_b = create_crossing_lines(line_a, line_b)
+        assert line_a.crosses(line_b)
+
+def test_border_lines_lie_on_the_polygon_border():
+    polygons = random_polygons(200, seed=4)
+    lines = create_lines_on_poly_borders(polygons)
+
+    assert len(lines) == len(polygons)
+    for polygon, line in zip(polygons, lines):
+        assert line.covered_by(polygon.boundary)
+        assert line.touches(polygon)
+        # A stretch of the ring, not all of it
+        assert not line.is_closed
+        assert line.length < polygon.exterior.length
@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from faron.synthetic_polygons import generate_spatial_question_from_data_with_postgis
+from faron.synthetic_polygons._sql import GEOM_TYPE_VALUES, compile_templates
+
+# One chain only: POLYGON_1 -within-> POLYGON_2 -overlap-> LINE_1
+CHAIN = [
+    ["POLYGON_1", "POLYGON_2", "within"],
+    ["POLYGON_2", "LINE_1", "overlap"],
+]
+
+CHAINED_SQL = """WITH IntermediateSet AS (
+SELECT T1.geom
+FROM geometries AS T1, geometries AS T2
+WHERE
+T1.geom_type = 'Polygon'
+AND T2.name = 'LINE_1'
+AND ST_Overlaps(T1.geom, T2.geom)
+)
+SELECT DISTINCT T_Final.name
+FROM geometries AS T_Final, IntermediateSet
+WHERE
+T_Final.geom_type = 'Polygon'
+AND ST_Within(T_Final.geom, IntermediateSet.geom);"""
+
+def test_compile_templates_cached_per_table():
+    compiled = compile_templates("geometries", "name", "geom")
+    assert compile_templates("geometries", "name", "geom") is compiled
+    assert compile_templates("other", "name", "geom") is not compiled
+
+def test_chained_sql():
+    assert generate_spatial_question_from_data_with_postgis(CHAIN)["sql"] == CHAINED_SQL
+
+def test_table_and_columns_substituted():
+    sql = generate_spatial_question_from_data_with_postgis(
+        CHAIN, table_name="scene_7", name_col="label", geom_col="shape", type_col="kind"
+    )["sql"]
+    assert sql == (CHAINED_SQL.replace("geometries", "scene_7").replace(".name", ".label")
+                   .replace(".geom_type", ".kind").replace(".geom", ".shape"))
+    assert "{" not in sql and "$" not in sql
+
+def test_multiple_conditions_sql():
+    data = [["POINT_1", "POLYGON_1", "within"], ["POINT_1", "LINE_1", "disjoint"]]
+    random.seed(0)
+    generated = generate_spatial_question_from_data_with_postgis(data)
+    sql_lines = generated["sql"].split("\n")
+
+    assert sql_lines[3] == sql_lines[10] == "T1.geom_type = 'Point'"
+    assert {sql_lines[4], sql_lines[11]} == {"AND T2.name = 'POLYGON_1'", "AND T2.name = 'LINE_1'"}
+    assert {sql_lines[5], sql_lines[12]} == {"AND ST_Within(T1.geom, T2.geom)", "AND ST_Disjoint(T1.geom, T2.geom);"}
+    assert sql_lines[6] == "INTERSECT"
+
+@pytest.mark.parametrize("seed", range(5))
+def test_seeded_questions_repeat(seed):
+    data = CHAIN + [["POLYGON_1", "LINE_1", "intersect"], ["POINT_1", "POLYGON_2", "within"]]
+    runs = []
+    for _ in range(2):
+        random.seed(seed)
+        runs.append(generate_spatial_question_from_data_with_postgis(data))
+    assert runs[0] == runs[1]
+
+def test_sql_filters_on_geom_type_column():
+    for entity_type, geom_type in GEOM_TYPE_VALUES.items():
+        data = [[f"{entity_type}_1", "POLYGON_9", "within"], ["POLYGON_9", "LINE_9", "overlap"]]
+        sql = generate_spatial_question_from_data_with_postgis(data)["sql"]
+        assert f"T_Final.geom_type = '{geom_type}'" in sql
+        assert "LIKE" not in sql
+
+def test_entity_types_take_precedence_over_names():
+    entity_types = {"POLYGON_1": "POINT", "POLYGON_2": "LINE", "LINE_1": "POLYGON"}
+    generated = generate_spatial_question_from_data_with_postgis(CHAIN, entity_types=entity_types)
+
+    assert "T1.geom_type = 'LineString'" in generated["sql"]
+    assert "T_Final.geom_type = 'Point'" in generated["sql"]
+    assert generated["question"].startswith("Which POINTs in the database within the LINE ")
+
+def test_no_pattern():
+    generated = generate_spatial_question_from_data_with_postgis([["POLYGON_1", "POLYGON_2", "touches"]])
+    assert "error" in generated
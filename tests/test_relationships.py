@@ -0,0 +1,86 @@
+import random
+
+import numpy as np
+import pytest
+import shapely
+from shapely.geometry import Polygon, Point, LineString
+
+import tmp
+from faron.synthetic_polygons import (
+    _config, RelationTracker, find_all_relationships, find_all_relationships_tiled, generate_scene,
+    name_scene_geometries, relate_pair, relation_histogram, synthesize_scene, verify_relationships,
+)
+from faron.synthetic_polygons._relations import _normalize_relationships, relations_from_matrix
+
+SQUARE = Polygon([(0, 0), (2, 0), (2, 2), (0, 2)])
+
+def labels(relationships):
+    return sorted(relation for _, _, relation in relationships if relation != "disjoint")
+
+def tiled_labels(geom_a, geom_b):
+    return sorted(relation for _, _, relation in relations_from_matrix(geom_a.geom_type, geom_b.geom_type, geom_a.relate(geom_b)))
+
+# Interiors that meet are never 'touches', whatever relate() reports for the boundaries
+@pytest.mark.parametrize("other, expected", [
+    (LineString([(-1, 1), (3, 1)]), ["cross"]),
+    (Polygon([(1, 1), (3, 1), (3, 3), (1, 3)]), ["overlaps"]),
+    (Polygon([(2, 0), (4, 0), (4, 2), (2, 2)]), ["touches"]),
+    (LineString([(2, 0), (2, 2)]), ["touches"]),
+    (Point(2, 1), ["touches"]),
+])
+def test_touches_requires_disjoint_interiors(other, expected):
+    assert labels(relate_pair("A", SQUARE, "B", other)) == expected
+    assert tiled_labels(SQUARE, other) == expected
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_relationships_match_full_pass(seed):
+    random.seed(seed)
+    np.random.seed(seed)
+    scene = generate_scene()
+    _, _, _, all_named_geoms = name_scene_geometries(scene)
+
+    verify_relationships(all_named_geoms, scene["relationships"])
+
+def test_synthesized_relationships_match_full_pass():
+    random.seed(0)
+    np.random.seed(0)
+    target = {"within": 3, "touches": 2, "overlaps": 1, "cross": 2}
+    scene = synthesize_scene(target, num_free_polygons=2, num_free_lines=2, num_free_points=3, verify=True)
+
+    assert relation_histogram(scene["relationships"]) == target
+
+def test_intersecting_pairs_are_never_sampled_disjoint():
+    tracker = RelationTracker(_config.CANVAS_BOUNDS, cell_size=10)
+    for i in range(20):
+        tracker.commit(f"POLYGON_{i+1}", Polygon(SQUARE.exterior.coords))
+    tracker.commit("POINT_1", Point(50, 50))
+
+    # Equal polygons have no relation, but they are not disjoint either
+    relationships = tracker.finalize(disjoint_rate=1.0)
+    disjoint = [(a, b) for a, b, relation in relationships if relation == "disjoint"]
+    assert disjoint
+    assert all("POINT_1" in pair for pair in disjoint)
+
+def overlapping_scene(num_geometries, rng):
+    """Freely overlapping polygons, lines and points, so many pairs straddle tile edges."""
+    canvas_bounds = tmp.large_scene_canvas(num_geometries)
+    num_polygons, num_lines = num_geometries // 2, num_geometries // 4
+    polygons = tmp.generate_polygon_array(canvas_bounds, num_polygons, _config.VERTEX_RANGE, _config.RADIUS_RANGE, False, rng)
+    lines = tmp.generate_line_array(canvas_bounds, num_lines, False, _config.LINE_LENGTH_RANGE, _config.LINE_SEGMENT_RANGE, rng)
+    min_x, min_y, max_x, max_y = canvas_bounds
+    num_points = num_geometries - len(polygons) - len(lines)
+    points = shapely.points(rng.uniform(min_x, max_x, num_points), rng.uniform(min_y, max_y, num_points))
+
+    geoms = list(polygons) + list(lines) + list(points)
+    return canvas_bounds, {f"GEOM_{i}": geom for i, geom in enumerate(geoms)}
+
+@pytest.mark.parametrize("tiles_per_side, workers", [(1, 1), (3, 1), (7, 1), (3, 2)])
+def test_tiled_relationships_match_untiled(tiles_per_side, workers):
+    canvas_bounds, all_named_geoms = overlapping_scene(400, np.random.default_rng(tiles_per_side))
+    tile_size = (canvas_bounds[2] - canvas_bounds[0]) / tiles_per_side
+
+    untiled = find_all_relationships(all_named_geoms)["relationships"]
+    tiled = find_all_relationships_tiled(all_named_geoms, tile_size, workers=workers, canvas_bounds=canvas_bounds)["relationships"]
+
+    assert _normalize_relationships(untiled)
+    assert _normalize_relationships(tiled) == _normalize_relationships(untiled)
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from faron import stats
+
+@pytest.fixture
+def enabled():
+    yield stats.enable_stats()
+    stats.disable_stats()
+
+def test_disabled_instrumentation_records_nothing():
+    assert stats.STATS is None
+    with stats.stage_timer("generate"):
+        stats.count("scenes")
+    assert stats.stage_timer("relate") is stats.stage_timer("write")
+
+def test_stage_timer_counts_calls_and_failures(enabled):
+    with stats.stage_timer("relate"):
+        pass
+    with pytest.raises(ValueError):
+        with stats.stage_timer("relate"):
+            raise ValueError
+    stats.record_time("render", 0.5)
+
+    summary = enabled.to_dict()
+    assert summary["stages"]["relate"]["calls"] == 2
+    assert summary["stages"]["render"] == {"calls": 1, "seconds": 0.5, "mean_seconds": 0.5}
+    assert enabled.counter("failures", stage="relate") == 1
+
+def test_counters_sum_over_missing_labels(enabled):
+    stats.count("geos_calls", 3, op="intersects")
+    stats.count("geos_calls", 4, op="relate")
+    assert enabled.counter("geos_calls") == 7
+    assert enabled.counter("geos_calls", op="relate") == 4
+
+def test_placement_rejection_rates_and_per_scene_means(enabled):
+    stats.count_placement("free_line", attempts=8, placed=2, wanted=3)
+    stats.count("scenes", 2)
+
+    summary = enabled.to_dict()
+    assert summary["rejection_rates"] == {"free_line": 0.75}
+    assert enabled.counter("placement_failures", kind="free_line") == 1
+    per_scene = {c["name"]: c["value"] for c in summary["per_scene"]["counters"]}
+    assert per_scene["placement_attempts"] == 4
+
+def test_prometheus_text(enabled):
+    stats.record_time("write", 1.5)
+    stats.count_placement("free_point", attempts=4, placed=1, wanted=1)
+    lines = enabled.to_prometheus().splitlines()
+
+    assert 'faron_stage_seconds_total{stage="write"} 1.5' in lines
+    assert 'faron_placement_attempts_total{kind="free_point"} 4' in lines
+    assert 'faron_placement_rejection_ratio{kind="free_point"} 0.75' in lines
+
+def test_disable_returns_the_totals(enabled, tmp_path):
+    stats.count("scenes")
+    assert stats.disable_stats() is enabled
+    stats.count("scenes")
+
+    path = tmp_path / "stats.json"
+    enabled.save(str(path))
+    assert json.loads(path.read_text())["counters"] == [{"name": "scenes", "labels": {}, "value": 1}]
@@ -0,0 +1,80 @@
+import itertools
+
+import numpy as np
+import pytest
+import shapely
+
+from faron.synthetic_maps import PlanarTopology, decode_topojson, generate_map
+
+QUANTIZATION = 10**6
+
+def seeded_map(seed):
+    scene_map = generate_map(seed=seed)
+    return scene_map, np.concatenate([scene_map["parcels"], scene_map["roads"]])
+
+def shapely_pairs(features, predicate):
+    return {(i, j) for i, j in itertools.combinations(range(len(features)), 2) if predicate(features[i], features[j])}
+
+def test_two_squares_share_one_arc():
+    squares = [shapely.box(0, 0, 1, 1), shapely.box(1, 0, 2, 1)]
+    topology = PlanarTopology(squares)
+
+    assert len(topology.arcs) == 3
+    shared = [arc for arc, faces in enumerate(topology.arc_faces) if (faces >= 0).all()]
+    assert len(shared) == 1
+    assert sorted(map(tuple, topology.vertices[topology.arcs[shared[0]]].tolist())) == [(1.0, 0.0), (1.0, 1.0)]
+    # Both faces use the shared arc, in opposite directions
+    assert {shared[0], ~shared[0]} <= set(topology.face_arcs[0]) | set(topology.face_arcs[1])
+    assert topology.border_pairs().tolist() == [[0, 1]]
+
+@pytest.mark.parametrize("seed", range(4))
+def test_every_edge_is_stored_once(seed):
+    scene_map, _ = seeded_map(seed)
+    topology = scene_map["topology"]
+
+    arc_edges = np.concatenate([np.sort(np.column_stack([arc[:-1], arc[1:]]), axis=1) for arc in topology.arcs])
+    assert len(np.unique(arc_edges, axis=0)) == len(arc_edges) == len(topology.edges)
+
+    stored = topology.to_topojson(quantization=QUANTIZATION)
+    assert sum(len(arc) - 1 for arc in stored["arcs"]) == len(topology.edges)
+
+@pytest.mark.parametrize("seed", range(4))
+def test_quantized_round_trip(seed):
+    scene_map, features = seeded_map(seed)
+    stored = scene_map["topology"].to_topojson(points=scene_map["pois"], quantization=QUANTIZATION)
+    decoded, _ = decode_topojson(stored)
+
+    step = max(stored["transform"]["scale"])
+    originals = np.concatenate([features, scene_map["pois"]])
+    assert len(decoded) == len(originals)
+    assert (shapely.hausdorff_distance(originals, decoded) <= step).all()
+    assert shapely.is_valid(decoded).all()
+
+def test_unquantized_round_trip_is_exact():
+    scene_map, features = seeded_map(7)
+    decoded, _ = decode_topojson(scene_map["topology"].to_topojson())
+
+    assert shapely.equals(features, decoded).all()
+    # The shared vertices come back bit-identical, so decoded parcels still tile
+    assert shapely.equals(shapely.union_all(decoded[:len(scene_map["parcels"])]), shapely.union_all(scene_map["parcels"]))
+
+@pytest.mark.parametrize("seed", range(3))
+def test_pairs_match_shapely_predicates(seed):
+    scene_map, features = seeded_map(seed)
+    topology = scene_map["topology"]
+    faces = scene_map["parcels"]
+
+    assert set(map(tuple, topology.touch_pairs().tolist())) == shapely_pairs(features, shapely.touches)
+    assert set(map(tuple, topology.border_pairs().tolist())) == shapely_pairs(
+        faces, lambda a, b: shapely.relate_pattern(a, b, "F***1****"))
+
+@pytest.mark.parametrize("seed", range(3))
+def test_touch_labels_hold_after_decoding(seed):
+    scene_map, _ = seeded_map(seed)
+    decoded, properties = decode_topojson(scene_map["topology"].to_topojson(
+        [{"name": name} for name in scene_map["names"]], scene_map["pois"], quantization=QUANTIZATION))
+    by_name = {props["name"]: geom for geom, props in zip(decoded, properties)}
+
+    for name_a, name_b, relation in scene_map["relationships"]:
+        if relation == "touches":
+            assert by_name[name_a].touches(by_name[name_b])
@@ -0,0 +1,43 @@
+import numpy as np
+from shapely.geometry import LineString, Point, Polygon, box
+
+from faron.utils import LINE_STYLE_COLORS, POINT_STYLE_COLORS, rasterize_geometries
+
+CANVAS_BOUNDS = (0, 0, 100, 100)
+WHITE = (255, 255, 255)
+
+def pixel(image, x, y, canvas_bounds=CANVAS_BOUNDS):
+    """Pixel of canvas point (x, y); image rows run from the top (max y) down."""
+    min_x, min_y, max_x, max_y = canvas_bounds
+    resolution = image.shape[0]
+    col = int((x - min_x) / (max_x - min_x) * resolution)
+    row = int((max_y - y) / (max_y - min_y) * resolution)
+    return tuple(image[row, col])
+
+def test_rasterized_scene_shape():
+    image = rasterize_geometries([('polygon', box(10, 10, 20, 20))], CANVAS_BOUNDS, 48)
+    assert image.shape == (48, 48, 3)
+    assert image.dtype == np.uint8
+
+def test_geometries_are_drawn_where_they_are():
+    geometries = [
+        ('polygon', Polygon([(60, 60), (90, 60), (90, 90), (60, 90)])),
+        ('straight', LineString([(10, 30), (40, 30)])),
+        ('in_poly', Point(20, 80)),
+    ]
+    image = rasterize_geometries(geometries, CANVAS_BOUNDS, 200)
+
+    assert pixel(image, 75, 75) != WHITE
+    assert pixel(image, 25, 30) == LINE_STYLE_COLORS['straight']
+    assert pixel(image, 20, 80) == POINT_STYLE_COLORS['in_poly']
+    # Nothing anywhere else: the bottom right quarter is empty
+    assert (image[120:, 120:] == 255).all()
+
+def test_canvas_offset_and_seeded_colors():
+    canvas_bounds = (1000, 2000, 1100, 2100)
+    geometries = [('polygon', box(1010, 2010, 1030, 2030)), ('polygon', box(1060, 2060, 1090, 2090))]
+    image = rasterize_geometries(geometries, canvas_bounds, 100, seed=3)
+
+    assert pixel(image, 1020, 2020, canvas_bounds) != WHITE
+    assert pixel(image, 1050, 2050, canvas_bounds) == WHITE
+    assert (rasterize_geometries(geometries, canvas_bounds, 100, seed=3) == image).all()